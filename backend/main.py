@@ -2,7 +2,9 @@
 CarFin AI FastAPI Backend
 Academic Recommendation System + Gemini Multi-Agent Integration
 """
+import asyncio
 import os
+import time
 import pandas as pd
 import uuid
 import hashlib
@@ -14,6 +16,8 @@ import logging
 import sys
 sys.path.append('..')
 
+from services.model_registry import ModelRegistry
+
 # Academic Recommendation System Integration
 ACADEMIC_SYSTEM_AVAILABLE = True  # NCF 모델 통합 활성화
 
@@ -242,6 +246,94 @@ sample_vehicles = [
     }
 ]
 
+# Keras NCF 모델 레지스트리 - 프로세스당 한 번 로드·예열한 인스턴스를 모든 요청이 공유
+NCF_KERAS_MODEL_PATH = os.environ.get("NCF_KERAS_MODEL_PATH", "models/trained_ncf_model")
+NCF_VEHICLE_CATALOG = os.environ.get("NCF_VEHICLE_CATALOG", "data/ncf_vehicles.csv")
+NCF_VEHICLE_REFRESH_SECONDS = float(os.environ.get("NCF_VEHICLE_REFRESH_SECONDS", 0))  # > 0이면 vehicles 테이블 변경분 주기 반영
+
+# pre-fork 부모에서 구성한 NumPy 추론 상태 (모델 경로, 차량 피처 테이블, 차량 타워 캐시가 채워진 분해 추론기)
+_preloaded_ncf_state = None
+
+def preload_ncf_serving_state():
+    """
+    pre-fork 부모에서 TensorFlow 없이 분해 추론기 가중치 + 차량 피처 테이블 + 차량 타워 캐시를 미리 구성 (serve_prefork의 preload)
+    워커는 같은 경로면 Keras 모델을 만들지 않고 이 배열로만 서빙 (copy-on-write 공유, 워커 수와 무관하게 가중치 한 벌)
+    """
+    global _preloaded_ncf_state
+    import json
+    import numpy as np
+    from models.ncf_feature_encoder import VEHICLE_FEATURE_SPECS, FeatureEncoder
+    from models.ncf_two_tower import TwoTowerScorer
+    from models.vehicle_feature_table import VehicleFeatureTable
+
+    path = NCF_KERAS_MODEL_PATH
+    scorer_path = f"{path}_two_tower.npz"
+    if not ACADEMIC_SYSTEM_AVAILABLE or not all(
+            os.path.exists(p) for p in (f"{path}_metadata.json", scorer_path, NCF_VEHICLE_CATALOG)):
+        logger.info("NCF 사전 로드 생략 - 메타데이터/분해 추론기 가중치/카탈로그 없음 (워커별 로드)")
+        return
+
+    with open(f"{path}_metadata.json") as f:
+        metadata = json.load(f)
+    catalog = pd.read_csv(NCF_VEHICLE_CATALOG)
+    encoder = FeatureEncoder.from_state(VEHICLE_FEATURE_SPECS, metadata['feature_encoders'].get('vehicle'))
+    table = VehicleFeatureTable(encoder, capacity=len(catalog), vehicle_index=metadata.get('vehicle_index') or [])
+    table.refresh(catalog)
+
+    two_tower = TwoTowerScorer.load(scorer_path)
+    rows = np.arange(min(len(table), metadata['num_vehicles']))
+    two_tower.cache_vehicles(rows, table.features[rows], cache_key=table.version)
+
+    _preloaded_ncf_state = (path, table, two_tower)
+    logger.info(f"NCF 사전 로드 완료: 차량 {len(table)}대 (fork 전)")
+
+def _load_keras_ncf(version: Optional[str] = None):
+    """저장된 가중치가 있으면 load_model, 없으면 미훈련 인스턴스 (Mock 추천 모드)"""
+    from models.ncf_car_recommendation import CarRecommendationNCF
+
+    path = version or NCF_KERAS_MODEL_PATH
+    ncf_system = CarRecommendationNCF()
+
+    # 같은 모델을 부모가 사전 로드했으면 그 추론기/테이블만으로 서빙 (Keras 모델 미구성, warmup은 캐시를 다시 계산하지 않음)
+    if _preloaded_ncf_state is not None and _preloaded_ncf_state[0] == path:
+        _, table, two_tower = _preloaded_ncf_state
+        ncf_system.load_two_tower_model(path, two_tower)
+        ncf_system.vehicle_table = table
+        logger.info(f"사전 로드된 분해 추론기/차량 피처 테이블 사용: {len(table)}대")
+        return ncf_system
+
+    if os.path.exists(f"{path}_metadata.json"):
+        ncf_system.load_model(path)
+    else:
+        logger.warning(f"NCF 가중치 없음 ({path}) - Mock 모드로 서빙")
+
+    # 추론용 차량 피처 테이블 (카탈로그 전체를 훈련 인코더로 한 번 인코딩)
+    if os.path.exists(NCF_VEHICLE_CATALOG):
+        table = ncf_system.load_vehicle_catalog(pd.read_csv(NCF_VEHICLE_CATALOG))
+        logger.info(f"차량 피처 테이블 구성: {len(table)}대")
+    return ncf_system
+
+async def _refresh_vehicle_features():
+    """vehicles.updated_at 기준 변경분만 주기적으로 차량 피처 테이블에 반영 (DB 연결 실패 시 다음 주기에 재시도)"""
+    engine = None
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(NCF_VEHICLE_REFRESH_SECONDS)
+        ncf_system = keras_ncf_registry.current
+        if ncf_system is None or ncf_system.vehicle_table is None:
+            continue
+        try:
+            if engine is None:
+                from database.connection import DatabaseManager
+                engine = DatabaseManager().sync_engine
+            changed = await loop.run_in_executor(None, ncf_system.vehicle_table.refresh_from_db, engine)
+            if changed:
+                logger.info(f"차량 피처 갱신: {changed}대")
+        except Exception as e:
+            logger.warning(f"차량 피처 갱신 실패: {e}")
+
+keras_ncf_registry = ModelRegistry(_load_keras_ncf, warmup=lambda ncf_system: ncf_system.warmup())
+
 def get_agents():
     global _carfin_agents
     if _carfin_agents is None:
@@ -263,6 +355,26 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe - 첫 NCF 모델 로드·예열 시도가 끝나기 전에는 503 (로드밸런서가 트래픽을 보내지 않도록)
+    로드에 실패해도 폴백 추천은 서빙하므로 시도가 끝나면 ready, 실패 원인은 last_error로 노출
+    """
+    if ACADEMIC_SYSTEM_AVAILABLE and keras_ncf_registry.current is None and not keras_ncf_registry.load_attempted:
+        raise HTTPException(status_code=503, detail={"status": "warming_up", **keras_ncf_registry.status()})
+
+    degraded = ACADEMIC_SYSTEM_AVAILABLE and keras_ncf_registry.current is None
+    return {"status": "ready", "mode": "fallback" if degraded else "ncf", **keras_ncf_registry.status()}
+
+@app.on_event("startup")
+async def load_recommendation_models():
+    """워커 시작 시 NCF 모델을 백그라운드에서 로드·예열 (시도가 끝나기 전까지 /ready는 503)"""
+    if ACADEMIC_SYSTEM_AVAILABLE:
+        keras_ncf_registry.load_async()
+        if NCF_VEHICLE_REFRESH_SECONDS > 0:
+            asyncio.create_task(_refresh_vehicle_features())
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
@@ -1000,6 +1112,7 @@ class RecommendationResponse(BaseModel):
 @app.post("/api/recommendations", response_model=RecommendationResponse)
 async def get_academic_recommendations(request: RecommendationRequest):
     """Academic Paper-based Hybrid Recommendation API"""
+    started = time.perf_counter()
     try:
         if not ACADEMIC_SYSTEM_AVAILABLE:
             # Enhanced Mock Recommendation System
@@ -1077,15 +1190,16 @@ async def get_academic_recommendations(request: RecommendationRequest):
                     "user_preferences": user_preferences,
                     "budget_filter": f"~{budget_max}만원",
                     "total_candidates": len(filtered_vehicles),
-                    "processing_time_ms": 25
+                    "processing_time_ms": round((time.perf_counter() - started) * 1000.0, 1)
                 }
             )
 
-        # Load NCF system directly
-        try:
-            from models.ncf_car_recommendation import CarRecommendationNCF
-            ncf_system = CarRecommendationNCF()
+        # 예열된 NCF 인스턴스 사용 (요청마다 모델을 새로 만들지 않음)
+        model_version, ncf_system = keras_ncf_registry.snapshot()
+        if ncf_system is None and keras_ncf_registry.loading:
+            raise HTTPException(status_code=503, detail="NCF 모델 예열 중입니다", headers={"Retry-After": "5"})
 
+        if ncf_system is not None:
             # Convert user profile for NCF
             user_dict = {
                 "user_id": request.user_profile.user_id,
@@ -1095,10 +1209,9 @@ async def get_academic_recommendations(request: RecommendationRequest):
                 "budget_max": request.user_profile.budget_range.get("max", 5000) if request.user_profile.budget_range else 5000
             }
 
-            # Get NCF recommendations
-            ncf_results = ncf_system.get_recommendations(
-                user_dict,
-                n_recommendations=request.limit
+            # Get NCF recommendations (점수 계산은 스레드풀에서 - 이벤트 루프를 막지 않음)
+            ncf_results = await asyncio.get_running_loop().run_in_executor(
+                None, ncf_system.get_recommendations, user_dict, request.limit
             )
 
             # Format NCF response
@@ -1113,20 +1226,20 @@ async def get_academic_recommendations(request: RecommendationRequest):
                     algorithm='Neural Collaborative Filtering'
                 ))
 
-            return RecommendationResponse(
-                recommendations=recommendations,
-                metadata={
-                    "algorithm": "Neural Collaborative Filtering (NCF)",
-                    "paper": "He et al. 2017 - Neural Collaborative Filtering",
-                    "model_type": "GMF + MLP Hybrid (Mock Mode)",
-                    "processing_time_ms": 75,
-                    "note": "Running in mock mode - requires TensorFlow for full functionality"
-                }
-            )
+            metadata = {
+                "algorithm": "Neural Collaborative Filtering (NCF)",
+                "paper": "He et al. 2017 - Neural Collaborative Filtering",
+                "model_type": "GMF + MLP Hybrid" if ncf_system.is_loaded else "GMF + MLP Hybrid (Mock Mode)",
+                "total_candidates": len(ncf_system.vehicle_table) if ncf_system.vehicle_table is not None else None,
+                "processing_time_ms": round((time.perf_counter() - started) * 1000.0, 1),
+                "model_version": model_version
+            }
+            if not ncf_system.is_loaded:
+                metadata["note"] = "Running in mock mode - requires trained NCF weights for full functionality"
+
+            return RecommendationResponse(recommendations=recommendations, metadata=metadata)
 
-        except ImportError as e:
-            logger.error(f"NCF system not available: {e}")
-            # This will fall back to the enhanced mock system below
+        logger.error(f"NCF system not available: {keras_ncf_registry.last_error}")
 
         # Final fallback - this should not be reached but provides safety
         logger.warning("Falling back to basic mock recommendation system")
@@ -1135,10 +1248,12 @@ async def get_academic_recommendations(request: RecommendationRequest):
             metadata={
                 "algorithm": "Fallback System",
                 "error": "No recommendation systems available",
-                "processing_time_ms": 10
+                "processing_time_ms": round((time.perf_counter() - started) * 1000.0, 1)
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Academic recommendation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Academic recommendation failed: {str(e)}")
@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from collections import defaultdict
 import asyncpg
 from .connection import DatabaseManager, UserBehaviorTracker
+from models.ann_index import IVFIndex
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -48,6 +49,7 @@ class RealTimeLearningEngine:
         self.learning_queue = asyncio.Queue()
         self.user_embeddings = {}
         self.vehicle_embeddings = {}
+        self.vehicle_index: Optional[IVFIndex] = None  # 유사 차량 검색용 ANN 인덱스
         self.learning_active = False
 
         # 학습 매개변수
@@ -55,6 +57,8 @@ class RealTimeLearningEngine:
         self.learning_rate = 0.001
         self.embedding_dim = 64
         self.update_threshold = 10  # 최소 상호작용 수
+        self.similar_vehicle_count = 10
+        self.similar_vehicle_n_probe = 8  # recall/지연 트레이드오프
 
     async def start_learning_pipeline(self):
         """실시간 학습 파이프라인 시작"""
@@ -230,6 +234,34 @@ class RealTimeLearningEngine:
         except Exception as e:
             logger.error(f"❌ 즉시 추천 업데이트 실패: {e}")
 
+    async def _find_similar_vehicles(self, vehicle_id: str) -> List[str]:
+        """임베딩 공간에서 유사한 차량 찾기 (IVF 근사 최근접 이웃)"""
+        if vehicle_id not in self.vehicle_embeddings:
+            return []
+
+        index = self._get_vehicle_index()
+        similar_ids, _ = index.query(
+            np.asarray(self.vehicle_embeddings[vehicle_id], dtype=np.float32),
+            self.similar_vehicle_count,
+            self.similar_vehicle_n_probe,
+            exclude=[vehicle_id]
+        )
+        return list(similar_ids)
+
+    def _get_vehicle_index(self) -> IVFIndex:
+        """차량 임베딩 ANN 인덱스 (최초 사용 시 구축, 이후 증분 추가, 크게 늘어나면 중심점 재학습)"""
+        if self.vehicle_index is None:
+            vehicle_ids = list(self.vehicle_embeddings.keys())
+            vectors = np.stack([np.asarray(self.vehicle_embeddings[v], dtype=np.float32) for v in vehicle_ids])
+            self.vehicle_index = IVFIndex(n_probe=self.similar_vehicle_n_probe).build(
+                vectors, np.asarray(vehicle_ids, dtype=object)
+            )
+        elif self.vehicle_index.needs_retrain():
+            # 고정 중심점에 계속 추가하면 리스트가 불균형해져 같은 n_probe의 recall이 떨어짐
+            logger.info(f"🔄 차량 ANN 인덱스 재학습: {self.vehicle_index.trained_size} → {len(self.vehicle_index)}개")
+            self.vehicle_index.retrain()
+        return self.vehicle_index
+
     async def _collect_batch_data(self) -> List[UserInteraction]:
         """배치 학습을 위한 데이터 수집"""
         try:
@@ -335,6 +367,10 @@ class RealTimeLearningEngine:
                     embedding = await self._calculate_vehicle_embedding(vehicle_id)
                     self.vehicle_embeddings[vehicle_id] = embedding
 
+                    # ANN 인덱스에도 반영 (재구축 없이 증분 추가/갱신)
+                    if self.vehicle_index is not None:
+                        self.vehicle_index.add(np.asarray(embedding, dtype=np.float32)[None, :], [vehicle_id])
+
         except Exception as e:
             logger.error(f"❌ 차량 임베딩 업데이트 실패: {e}")
 
@@ -0,0 +1,340 @@
+"""
+IVF Approximate Nearest Neighbor Index
+차량 임베딩 근사 최근접 이웃 검색 (순수 NumPy 구현)
+
+Jégou, H., Douze, M., & Schmid, C. (2011).
+Product quantization for nearest neighbor search. IEEE TPAMI.
+(IVF: Inverted File 구조 부분)
+
+구조:
+1. 구면 k-means로 n_lists개 중심점 학습 (코사인 유사도)
+2. 각 벡터를 가장 가까운 중심점 리스트에 배정 (역색인)
+3. 질의 시 가까운 n_probe개 리스트의 벡터만 정확히 비교
+
+Recall/지연 트레이드오프:
+- n_lists ↑ : 리스트당 벡터 수 ↓ → 빠르지만 같은 n_probe에서 recall ↓
+- n_probe ↑ : 더 많은 리스트 탐색 → recall ↑, 지연 ↑ (n_probe = n_lists면 전수 검색)
+
+증분 추가(add)는 중심점을 고정하므로 인덱스가 커지면 리스트가 불균형해지고 같은 n_probe의 recall이 떨어짐
+→ needs_retrain()이 True면 retrain()으로 현재 벡터 전체에 k-means를 다시 실행
+
+quantize=True: 리스트 스캔은 차원별 스케일 int8 코드로 하고 상위 k × rerank_factor 후보만 정확한 벡터로 재순위
+- 인덱스는 정규화된 float32 사본 대신 int8 코드와 입력 벡터 참조만 보관 (mmap 아티팩트면 후보 행만 읽음)
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .quantization import Int8Embeddings, rerank
+except ImportError:  # models/ 디렉토리를 sys.path에 추가해 직접 import한 경우
+    from quantization import Int8Embeddings, rerank
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (영벡터는 0 유지)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class IVFIndex:
+    """
+    IVF 근사 최근접 이웃 인덱스 (코사인 유사도)
+    - build: k-means 중심점 학습 + 역색인 구성
+    - query / query_batch: n_probe개 리스트만 탐색하는 Top-k 검색
+    - add: 재학습 없이 벡터 추가/갱신 (가장 가까운 리스트에 배정)
+    - needs_retrain / retrain: 학습 시점보다 크게 늘어난 인덱스의 중심점 재학습
+    - quantize: int8 코드 스캔 + 정확한 벡터 재순위
+    """
+
+    def __init__(self,
+                 n_lists: Optional[int] = None,
+                 n_probe: int = 8,
+                 n_iter: int = 20,
+                 max_train_points: int = 100000,
+                 seed: int = 42,
+                 quantize: bool = False,
+                 rerank_factor: int = 4,
+                 retrain_growth: float = 2.0,
+                 min_list_ratio: float = 0.5):
+        self.requested_lists = n_lists  # None이면 구축할 때마다 sqrt(N)
+        self.n_lists = n_lists
+        self.retrain_growth = retrain_growth  # 학습 시점 크기의 이 배수를 넘으면 재학습
+        self.min_list_ratio = min_list_ratio  # 자동 리스트 수가 sqrt(N) × 이 값 미만이면 재학습
+        self.trained_size = 0                 # 마지막 k-means 학습 시점의 벡터 수
+        self.n_probe = n_probe
+        self.quantize = quantize
+        self.rerank_factor = rerank_factor  # 재순위할 근사 후보 수 = k × rerank_factor
+        self.n_iter = n_iter
+        self.max_train_points = max_train_points
+        self.seed = seed
+
+        self.centroids = None           # (n_lists, dim) 정규화된 중심점
+        self.vectors = None             # (capacity, dim) 정규화된 벡터 버퍼 (quantize면 None)
+        self.codes: Optional[Int8Embeddings] = None  # quantize: (capacity, dim) int8 코드
+        self.exact = None               # quantize: 재순위용 원본 벡터 (build 입력 참조, add 시 로컬 사본)
+        self._owns_exact = False
+        self.ids = None                 # (capacity,) 외부 ID
+        self.assignments = None         # (capacity,) 리스트 번호
+        self.lists: List[np.ndarray] = []
+        self.id_to_pos: Dict = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    # ===== 구축 =====
+    def _train_centroids(self, normalized: np.ndarray, n_lists: int) -> np.ndarray:
+        """구면 k-means (Lloyd 반복, 빈 리스트는 임의 점으로 재초기화)"""
+        rng = np.random.default_rng(self.seed)
+        n_points = normalized.shape[0]
+
+        if n_points > self.max_train_points:
+            normalized = normalized[rng.choice(n_points, self.max_train_points, replace=False)]
+            n_points = self.max_train_points
+
+        centroids = normalized[rng.choice(n_points, n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = np.argmax(normalized @ centroids.T, axis=1)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, normalized)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = normalized[rng.choice(n_points, int(empty.sum()), replace=False)]
+
+            centroids = _normalize(sums)
+
+        return centroids
+
+    def build(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> 'IVFIndex':
+        """벡터 집합으로 인덱스 구축 (ids 생략 시 0..N-1)"""
+        normalized = _normalize(vectors)
+        n_points = normalized.shape[0]
+        ids = np.arange(n_points) if ids is None else np.asarray(ids)
+        if ids.dtype.kind in ('U', 'S'):
+            ids = ids.astype(object)  # 고정폭 문자열은 이후 add()에서 잘릴 수 있음
+
+        n_lists = self.requested_lists or max(1, int(np.sqrt(n_points)))
+        n_lists = max(1, min(n_lists, n_points))
+        self.n_lists = n_lists
+
+        self.centroids = self._train_centroids(normalized, n_lists)
+        if self.quantize:
+            self.codes = Int8Embeddings.quantize(normalized)
+            self.vectors = None
+            self.exact = np.asarray(vectors)
+            self._owns_exact = False
+        else:
+            self.vectors = normalized
+        self.ids = ids.copy()
+        self.assignments = np.argmax(normalized @ self.centroids.T, axis=1)
+        self.size = n_points
+        self.trained_size = n_points
+        self.id_to_pos = {item_id: pos for pos, item_id in enumerate(self.ids.tolist())}
+
+        order = np.argsort(self.assignments, kind='stable')
+        boundaries = np.searchsorted(self.assignments[order], np.arange(n_lists + 1))
+        self.lists = [order[boundaries[i]:boundaries[i + 1]] for i in range(n_lists)]
+
+        return self
+
+    def _exact_rows(self, positions: np.ndarray) -> np.ndarray:
+        """내부 위치의 정확한 정규화 벡터"""
+        if self.codes is None:
+            return self.vectors[positions]
+        return _normalize(self.exact[positions])
+
+    def needs_retrain(self) -> bool:
+        """add()로 학습 시점 크기의 retrain_growth배를 넘었거나 (자동 리스트 수) sqrt(N) 대비 리스트가 너무 적으면 True"""
+        if self.centroids is None:
+            return False
+        if self.size > self.retrain_growth * self.trained_size:
+            return True
+        return self.requested_lists is None and self.n_lists < self.min_list_ratio * np.sqrt(self.size)
+
+    def retrain(self) -> 'IVFIndex':
+        """현재 벡터 전체로 k-means 재학습 + 역색인 재구성 (ID 유지)"""
+        vectors = self.vectors[:self.size] if self.codes is None else self.exact[:self.size]
+        return self.build(vectors, self.ids[:self.size])
+
+    # ===== 증분 추가 =====
+    def _grow(self, extra: int):
+        """벡터 버퍼 용량 확장 (2배씩 증가)"""
+        needed = self.size + extra
+        capacity = len(self.ids)
+        if self.codes is not None and not self._owns_exact:
+            # 입력 벡터 참조(읽기 전용 mmap일 수 있음)는 수정하지 않도록 로컬 사본으로 전환
+            exact = np.zeros((max(needed, capacity), self.exact.shape[1]), dtype=np.float32)
+            exact[:self.size] = self.exact[:self.size]
+            self.exact, self._owns_exact = exact, True
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2)
+        if self.codes is None:
+            vectors = np.zeros((new_capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[:self.size] = self.vectors[:self.size]
+            self.vectors = vectors
+        else:
+            self.codes.resize(new_capacity)
+            exact = np.zeros((new_capacity, self.exact.shape[1]), dtype=np.float32)
+            exact[:self.size] = self.exact[:self.size]
+            self.exact = exact
+        ids = np.empty(new_capacity, dtype=self.ids.dtype)
+        ids[:self.size] = self.ids[:self.size]
+        assignments = np.zeros(new_capacity, dtype=self.assignments.dtype)
+        assignments[:self.size] = self.assignments[:self.size]
+
+        self.ids, self.assignments = ids, assignments
+
+    def _set_vector(self, pos: int, vector: np.ndarray, normalized: np.ndarray):
+        if self.codes is None:
+            self.vectors[pos] = normalized
+        else:
+            self.codes.codes[pos] = self.codes.encode(normalized)
+            self.exact[pos] = vector
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        """
+        벡터 추가 또는 갱신 (중심점은 고정, 가장 가까운 리스트에 배정)
+        - 이미 있는 ID는 벡터를 교체하고 필요하면 리스트를 옮김
+        """
+        if self.centroids is None:
+            raise ValueError("인덱스가 구축되지 않았습니다. build()를 먼저 호출하세요.")
+
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        normalized = _normalize(vectors)
+        ids = np.asarray(ids)
+        if ids.dtype.kind in ('U', 'S'):
+            ids = ids.astype(object)
+        assignments = np.argmax(normalized @ self.centroids.T, axis=1)
+
+        new_rows = [i for i, item_id in enumerate(ids.tolist()) if item_id not in self.id_to_pos]
+        self._grow(len(new_rows))
+
+        for i, item_id in enumerate(ids.tolist()):
+            pos = self.id_to_pos.get(item_id)
+            if pos is None:
+                pos = self.size
+                self.size += 1
+                self.ids[pos] = item_id
+                self.id_to_pos[item_id] = pos
+            else:
+                old_list = self.assignments[pos]
+                if old_list == assignments[i]:
+                    self._set_vector(pos, vectors[i], normalized[i])
+                    continue
+                self.lists[old_list] = self.lists[old_list][self.lists[old_list] != pos]
+
+            self._set_vector(pos, vectors[i], normalized[i])
+            self.assignments[pos] = assignments[i]
+            self.lists[assignments[i]] = np.append(self.lists[assignments[i]], pos)
+
+    # ===== 질의 =====
+    def _probe(self, normalized: np.ndarray, n_probe: int) -> np.ndarray:
+        """질의별로 가장 가까운 n_probe개 리스트 번호"""
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_sims = normalized @ self.centroids.T
+        if n_probe == self.n_lists:
+            return np.tile(np.arange(self.n_lists), (normalized.shape[0], 1))
+        return np.argpartition(-centroid_sims, n_probe - 1, axis=1)[:, :n_probe]
+
+    def query(self, vector: np.ndarray, k: int = 10, n_probe: Optional[int] = None,
+              exclude: Optional[List] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        단일 벡터 Top-k 검색
+        Returns: (ids, 코사인 유사도) 유사도 내림차순, exclude에 있는 ID는 제외
+        """
+        normalized = _normalize(vector)
+        probe = self._probe(normalized, n_probe or self.n_probe)[0]
+        candidates = np.concatenate([self.lists[i] for i in probe])
+
+        if exclude:
+            excluded = [self.id_to_pos[item_id] for item_id in exclude if item_id in self.id_to_pos]
+            candidates = candidates[~np.isin(candidates, excluded)]
+        if len(candidates) == 0:
+            return self.ids[:0], np.empty(0, dtype=np.float32)
+
+        if self.codes is not None:
+            # int8 근사 점수로 후보를 줄인 뒤 정확한 벡터로 재순위
+            approx = self.codes.scores(normalized, candidates)[0]
+            n_rerank = min(k * self.rerank_factor, len(candidates))
+            shortlist = candidates[np.argpartition(-approx, n_rerank - 1)[:n_rerank]]
+            positions, sims = rerank(normalized, shortlist[None, :], self._exact_rows, k)
+            return self.ids[positions[0]], sims[0]
+
+        sims = self.vectors[candidates] @ normalized[0]
+        k = min(k, len(candidates))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+
+        return self.ids[candidates[top]], sims[top]
+
+    def query_batch(self, vectors: np.ndarray, k: int = 10, n_probe: Optional[int] = None,
+                    exclude_self: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        다수 벡터 Top-k 검색 (리스트 단위로 묶어서 행렬곱)
+        - exclude_self: 질의별로 제외할 인덱스 내부 위치 (예: 자기 자신), -1이면 제외 없음
+        Returns: (positions, sims) 각 (Q, k), 후보가 부족한 칸은 위치 -1 / 유사도 -inf
+        """
+        normalized = _normalize(vectors)
+        n_queries = normalized.shape[0]
+        probe = self._probe(normalized, n_probe or self.n_probe)
+        width = k * self.rerank_factor if self.codes is not None else k
+
+        best_pos = np.full((n_queries, width), -1, dtype=np.int64)
+        best_sims = np.full((n_queries, width), -np.inf, dtype=np.float32)
+
+        probes_list = np.zeros((n_queries, self.n_lists), dtype=bool)
+        probes_list[np.arange(n_queries)[:, None], probe] = True
+
+        for list_no in range(self.n_lists):
+            members = self.lists[list_no]
+            queries = np.flatnonzero(probes_list[:, list_no])
+            if len(members) == 0 or len(queries) == 0:
+                continue
+
+            if self.codes is None:
+                sims = normalized[queries] @ self.vectors[members].T
+            else:
+                sims = self.codes.scores(normalized[queries], members)
+            if exclude_self is not None:
+                sims[members[None, :] == exclude_self[queries][:, None]] = -np.inf
+
+            # 기존 Top-k와 병합
+            merged_pos = np.concatenate([best_pos[queries], np.broadcast_to(members, sims.shape)], axis=1)
+            merged_sims = np.concatenate([best_sims[queries], sims], axis=1)
+            top = np.argpartition(-merged_sims, width - 1, axis=1)[:, :width]
+            best_pos[queries] = np.take_along_axis(merged_pos, top, axis=1)
+            best_sims[queries] = np.take_along_axis(merged_sims, top, axis=1)
+
+        if self.codes is not None:
+            best_pos[~np.isfinite(best_sims)] = -1
+            return rerank(normalized, best_pos, self._exact_rows, k)
+
+        order = np.argsort(-best_sims, axis=1, kind='stable')
+        best_pos = np.take_along_axis(best_pos, order, axis=1)
+        best_sims = np.take_along_axis(best_sims, order, axis=1)
+        best_pos[~np.isfinite(best_sims)] = -1
+
+        return best_pos, best_sims
+
+    def estimate_recall(self, k: int = 10, n_probe: Optional[int] = None,
+                        n_samples: int = 200) -> float:
+        """샘플 질의로 전수 검색 대비 recall@k 추정 (n_probe 튜닝용)"""
+        rng = np.random.default_rng(self.seed)
+        sample = rng.choice(self.size, min(n_samples, self.size), replace=False)
+        vectors = self._exact_rows(np.arange(self.size))
+
+        approx, _ = self.query_batch(vectors[sample], k, n_probe, exclude_self=sample)
+
+        exact_sims = vectors[sample] @ vectors.T
+        exact_sims[np.arange(len(sample)), sample] = -np.inf
+        exact = np.argpartition(-exact_sims, k - 1, axis=1)[:, :k]
+
+        hits = sum(len(np.intersect1d(a[a >= 0], e)) for a, e in zip(approx, exact))
+        return hits / (len(sample) * k)
@@ -0,0 +1,167 @@
+"""
+NCF Dataset Binary Cache
+ncf_*.csv 파일을 컬럼형 바이너리(.npy)로 캐시해 재시작 시 CSV 파싱 생략
+
+캐시 구조 ({cache_dir}/{csv 파일명}/):
+- manifest.json : 원본 파일 크기/수정시각/SHA-256, 컬럼 스키마
+- {column}.npy          : 숫자 컬럼 (고정폭 int64/float64)
+- {column}.codes.npy    : 범주형 컬럼 정수 코드 (int32, 결측 -1)
+- {column}.categories.npy : 범주형 컬럼 카테고리 (고정폭 유니코드)
+- {column}.ns.npy       : 날짜 컬럼 (int64 나노초, 결측 NaT)
+
+모든 배열은 np.load(mmap_mode='r')로 매핑되므로 로드 시간은 디스크 대역폭에 비례.
+원본 CSV의 체크섬이 바뀐 경우에만 캐시를 다시 만든다.
+"""
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 캐시 포맷 버전 (구조가 바뀌면 올려서 이전 캐시를 무효화)
+CACHE_FORMAT_VERSION = 1
+
+
+def _file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 SHA-256 (스트리밍)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_stat(path: str) -> Dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _cache_is_valid(manifest: Dict, csv_path: str, parse_dates: List[str], manifest_path: str) -> bool:
+    """
+    크기/수정시각이 같으면 바로 유효, 다르면 체크섬으로 내용 변경 여부 확인
+    - 수정시각만 바뀌고 내용이 같으면 manifest의 크기/수정시각을 갱신해 다음 시작부터는 체크섬 생략
+    """
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return False
+    if sorted(manifest.get('parse_dates', [])) != sorted(parse_dates):
+        return False
+
+    source = manifest.get('source', {})
+    stat = _source_stat(csv_path)
+    if stat['size'] != source.get('size'):
+        return False
+    if stat['mtime_ns'] == source.get('mtime_ns'):
+        return True
+    if _file_checksum(csv_path) != source.get('sha256'):
+        return False
+
+    manifest['source'] = dict(source, **stat)
+    try:
+        _write_manifest(manifest, manifest_path)
+    except OSError as e:
+        print(f"데이터 캐시 manifest 갱신 실패: {e}")
+    return True
+
+
+def _write_manifest(manifest: Dict, manifest_path: str):
+    """manifest.json 원자적 교체"""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _write_cache(df: pd.DataFrame, csv_path: str, cache_dir: str, parse_dates: List[str]):
+    """DataFrame을 컬럼별 .npy로 저장 (임시 디렉토리에 쓴 뒤 교체)"""
+    tmp_dir = cache_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if name in parse_dates:
+            values = pd.to_datetime(series, errors='coerce').to_numpy(dtype='datetime64[ns]')
+            np.save(os.path.join(tmp_dir, f'{name}.ns.npy'), values.view(np.int64))
+            columns.append({'name': name, 'kind': 'datetime'})
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), series.to_numpy())
+            columns.append({'name': name, 'kind': 'numeric'})
+        else:
+            codes, categories = pd.factorize(series, sort=True)
+            np.save(os.path.join(tmp_dir, f'{name}.codes.npy'), codes.astype(np.int32))
+            np.save(os.path.join(tmp_dir, f'{name}.categories.npy'), np.asarray(categories, dtype=str))
+            columns.append({'name': name, 'kind': 'categorical'})
+
+    manifest = {
+        'format_version': CACHE_FORMAT_VERSION,
+        'source': dict(_source_stat(csv_path), sha256=_file_checksum(csv_path)),
+        'parse_dates': list(parse_dates),
+        'n_rows': len(df),
+        'columns': columns
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.rename(tmp_dir, cache_dir)
+
+
+def _read_cache(cache_dir: str, manifest: Dict) -> pd.DataFrame:
+    """캐시 배열을 mmap으로 읽어 DataFrame 구성 (범주형은 pd.Categorical)"""
+    def load(filename):
+        return np.load(os.path.join(cache_dir, filename), mmap_mode='r')
+
+    data = {}
+    for column in manifest['columns']:
+        name, kind = column['name'], column['kind']
+        if kind == 'numeric':
+            data[name] = load(f'{name}.npy')
+        elif kind == 'datetime':
+            data[name] = np.asarray(load(f'{name}.ns.npy')).view('datetime64[ns]')
+        else:
+            data[name] = pd.Categorical.from_codes(
+                np.asarray(load(f'{name}.codes.npy')),
+                categories=pd.Index(np.asarray(load(f'{name}.categories.npy')), dtype=object)
+            )
+
+    return pd.DataFrame(data, columns=[column['name'] for column in manifest['columns']])
+
+
+def load_csv_cached(csv_path: str, cache_root: Optional[str] = None,
+                    parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    CSV를 바이너리 캐시를 거쳐 로드
+    - 캐시가 유효하면 CSV 파싱 없이 mmap으로 로드
+    - 원본이 바뀌었거나 캐시가 없으면 read_csv 후 캐시 재생성
+    - 캐시 디렉토리에 쓸 수 없으면 그냥 read_csv 결과 반환
+    """
+    parse_dates = list(parse_dates or [])
+    cache_root = cache_root or os.path.join(os.path.dirname(csv_path), '.ncf_cache')
+    cache_dir = os.path.join(cache_root, os.path.basename(csv_path))
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+
+    manifest = None
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:  # 손상된 manifest는 캐시 없음으로 처리
+            print(f"데이터 캐시 manifest를 읽을 수 없어 다시 만듭니다: {e}")
+    if isinstance(manifest, dict) and _cache_is_valid(manifest, csv_path, parse_dates, manifest_path):
+        return _read_cache(cache_dir, manifest)
+
+    df = pd.read_csv(csv_path)
+    try:
+        os.makedirs(cache_root, exist_ok=True)
+        _write_cache(df, csv_path, cache_dir, parse_dates)
+        with open(manifest_path) as f:
+            return _read_cache(cache_dir, json.load(f))
+    except OSError as e:
+        print(f"데이터 캐시 생성 실패 (CSV 직접 사용): {e}")
+        for name in parse_dates:
+            df[name] = pd.to_datetime(df[name], errors='coerce')
+        return df
@@ -13,6 +13,24 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 import json
+import time
+
+try:
+    from .ncf_feature_encoder import (
+        CONTEXT_FEATURE_SPECS, USER_FEATURE_SPECS, VEHICLE_FEATURE_SPECS, FeatureEncoder,
+        catalog_to_vehicle_features
+    )
+    from .negative_sampling import NegativeSampler
+    from .ncf_two_tower import TwoTowerScorer
+    from .vehicle_feature_table import VehicleFeatureTable
+except ImportError:  # models/ 디렉토리를 sys.path에 추가해 직접 import한 경우
+    from ncf_feature_encoder import (
+        CONTEXT_FEATURE_SPECS, USER_FEATURE_SPECS, VEHICLE_FEATURE_SPECS, FeatureEncoder,
+        catalog_to_vehicle_features
+    )
+    from negative_sampling import NegativeSampler
+    from ncf_two_tower import TwoTowerScorer
+    from vehicle_feature_table import VehicleFeatureTable
 
 class CarRecommendationNCF:
     """
@@ -31,7 +49,9 @@ class CarRecommendationNCF:
                  embedding_dim: int = 64,
                  mlp_layers: List[int] = [128, 64, 32],
                  dropout_rate: float = 0.2,
-                 l2_reg: float = 1e-6):
+                 l2_reg: float = 1e-6,
+                 feature_encoders: Optional[Dict] = None,
+                 vehicle_index: Optional[List] = None):
 
         self.num_users = num_users
         self.num_vehicles = num_vehicles
@@ -39,14 +59,29 @@ class CarRecommendationNCF:
         self.mlp_layers = mlp_layers
         self.dropout_rate = dropout_rate
         self.l2_reg = l2_reg
+        self.vehicle_index = vehicle_index  # 임베딩 인덱스별 카탈로그 차량 ID (훈련 시 결정, 메타데이터로 저장)
+
+        # 피처 인코더 (훈련 시 fit, 저장된 통계가 있으면 복원해 추론에 재사용)
+        feature_encoders = feature_encoders or {}
+        self.user_encoder = FeatureEncoder.from_state(USER_FEATURE_SPECS, feature_encoders.get('user'))
+        self.vehicle_encoder = FeatureEncoder.from_state(VEHICLE_FEATURE_SPECS, feature_encoders.get('vehicle'))
+        self.context_encoder = FeatureEncoder.from_state(CONTEXT_FEATURE_SPECS, feature_encoders.get('context'))
 
         # 차량 특성 차원 정의
-        self.user_feature_dim = 10  # 나이, 소득, 지역 등
-        self.vehicle_feature_dim = 15  # 가격, 연식, 브랜드 등
-        self.context_feature_dim = 5   # 계절, 시간, 시장상황 등
+        self.user_feature_dim = self.user_encoder.dim        # 나이, 소득, 지역 등 (10)
+        self.vehicle_feature_dim = self.vehicle_encoder.dim  # 가격, 연식, 브랜드 등 (15)
+        self.context_feature_dim = self.context_encoder.dim  # 계절, 시간, 시장상황 등 (5)
 
         self.model = None
         self.training_history = None
+        self.serving_fn = None  # 고정 시그니처로 트레이싱된 추론 함수 (warmup에서 생성)
+        self.vehicle_table: Optional[VehicleFeatureTable] = None  # 추론용 차량 피처 테이블 (행 = 차량 임베딩 인덱스)
+        self.two_tower: Optional[TwoTowerScorer] = None  # 차량 타워 캐시 기반 분해 추론 (warmup에서 생성)
+
+    @property
+    def is_loaded(self) -> bool:
+        """추론 가능한 가중치 보유 여부 (Keras 모델 또는 분해 추론기)"""
+        return self.model is not None or self.two_tower is not None
 
     def build_model(self):
         """NCF 모델 구축 - CarFinanceAI 특화"""
@@ -152,8 +187,15 @@ class CarRecommendationNCF:
 
         return self.model
 
-    def prepare_training_data(self, interaction_df: pd.DataFrame) -> Dict:
-        """훈련 데이터 준비"""
+    def prepare_training_data(self, interaction_df: pd.DataFrame,
+                              popularity_alpha: Optional[float] = None,
+                              vehicle_catalog: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        훈련 데이터 준비
+        - popularity_alpha: 지정 시 부정 샘플을 (차량 상호작용 수 + 1)^alpha 비례로 추출 (예: 0.75), 생략 시 균등
+        - vehicle_catalog: 지정 시 차량 피처를 카탈로그에서 조인 (추론용 차량 피처 테이블과 같은 변환·어휘)
+        """
+        interaction_df = self._index_vehicles(interaction_df)
 
         # 긍정적 상호작용 (평점 4+ 또는 구매/문의)
         positive_interactions = interaction_df[
@@ -161,17 +203,29 @@ class CarRecommendationNCF:
             (interaction_df['interaction_type'].isin(['purchase', 'inquiry', 'favorite']))
         ]
 
-        # 부정적 샘플링 (랜덤 샘플링)
+        # 부정적 샘플링 (균등 또는 인기도 비례)
+        vehicle_weights = None
+        if popularity_alpha is not None:
+            counts = np.bincount(interaction_df['vehicle_id'].to_numpy(dtype=np.int64), minlength=self.num_vehicles)
+            vehicle_weights = (counts[:self.num_vehicles] + 1.0) ** popularity_alpha
+
         negative_samples = self._negative_sampling(
             positive_interactions,
-            ratio=4  # 긍정:부정 = 1:4
+            ratio=4,  # 긍정:부정 = 1:4
+            vehicle_weights=vehicle_weights
         )
 
         # 훈련 데이터 결합
         train_data = pd.concat([positive_interactions, negative_samples])
         train_data = train_data.sample(frac=1).reset_index(drop=True)  # 셞플
+        if vehicle_catalog is not None:
+            # 부정 샘플은 긍정 행을 복사하므로 차량 피처는 샘플링 이후 차량 인덱스 기준으로 조인
+            train_data = self._join_vehicle_catalog(train_data, vehicle_catalog)
+
+        # 피처 추출 (인코더 통계는 훈련 데이터로 학습)
+        for encoder in (self.user_encoder, self.vehicle_encoder, self.context_encoder):
+            encoder.fit(train_data)
 
-        # 피처 추출
         training_data = {
             'user_ids': train_data['user_id'].values,
             'vehicle_ids': train_data['vehicle_id'].values,
@@ -183,105 +237,87 @@ class CarRecommendationNCF:
 
         return training_data
 
-    def _negative_sampling(self, positive_df: pd.DataFrame, ratio: int = 4) -> pd.DataFrame:
-        """부정적 샘플 생성"""
-        negative_samples = []
-
-        for _, pos_sample in positive_df.iterrows():
-            user_id = pos_sample['user_id']
-
-            # 해당 사용자가 상호작용하지 않은 차량들 중 랜덤 선택
-            user_vehicles = set(positive_df[positive_df['user_id'] == user_id]['vehicle_id'])
-            all_vehicles = set(range(self.num_vehicles))
-            uninteracted_vehicles = list(all_vehicles - user_vehicles)
+    def _join_vehicle_catalog(self, train_data: pd.DataFrame, vehicle_catalog: pd.DataFrame) -> pd.DataFrame:
+        """
+        훈련 행(vehicle_id = 임베딩 인덱스)에 카탈로그 차량 피처 컬럼 조인
+        - catalog_to_vehicle_features + vehicle_index 순서 = 차량 피처 테이블과 같은 행 구성, 같은 이름 컬럼은 대체
+        - 카탈로그에 없는 차량은 결측 (인코더 기본값)
+        """
+        vehicle_catalog = vehicle_catalog.drop_duplicates('vehicle_id', keep='last')
+        features = catalog_to_vehicle_features(vehicle_catalog).set_axis(vehicle_catalog['vehicle_id'].to_numpy())
+        features = features.reindex(self.vehicle_index).iloc[train_data['vehicle_id'].to_numpy(dtype=np.int64)]
 
-            # 랜덤 샘플링
-            if len(uninteracted_vehicles) >= ratio:
-                sampled_vehicles = np.random.choice(uninteracted_vehicles, ratio, replace=False)
+        return train_data.drop(columns=[column for column in features.columns if column in train_data]).assign(
+            **{column: features[column].to_numpy() for column in features.columns}
+        )
 
-                for vehicle_id in sampled_vehicles:
-                    negative_sample = pos_sample.copy()
-                    negative_sample['vehicle_id'] = vehicle_id
-                    negative_sample['preference_score'] = 0  # 부정적 레이블
-                    negative_samples.append(negative_sample)
+    def _index_vehicles(self, interaction_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        차량 ID → 임베딩 인덱스 (정수 ID는 그대로, 그 외는 정렬된 ID 순번)
+        매핑은 vehicle_index로 보관해 추론 시 카탈로그 차량을 같은 임베딩 행에 연결
+        """
+        vehicle_ids = interaction_df['vehicle_id']
+        if pd.api.types.is_integer_dtype(vehicle_ids):
+            self.vehicle_index = list(range(self.num_vehicles))
+            return interaction_df
+
+        codes, uniques = pd.factorize(vehicle_ids, sort=True)
+        if len(uniques) > self.num_vehicles:
+            raise ValueError(f"차량 수({len(uniques)})가 num_vehicles({self.num_vehicles})보다 많습니다.")
+        self.vehicle_index = uniques.tolist()
+        return interaction_df.assign(vehicle_id=codes)
+
+    def _negative_sampling(self, positive_df: pd.DataFrame, ratio: int = 4,
+                           vehicle_weights: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        부정적 샘플 생성
+        - 긍정 행마다 해당 사용자가 상호작용하지 않은 차량 ratio개 (일괄 추출 + 충돌만 재추출)
+        - vehicle_weights: 차량별 추출 가중치 (alias 테이블), 생략 시 균등
+        """
+        user_codes = pd.factorize(positive_df['user_id'])[0]
+        sampler = NegativeSampler(
+            user_codes, positive_df['vehicle_id'].to_numpy(dtype=np.int64), self.num_vehicles, vehicle_weights
+        )
+        rows, vehicles = sampler.sample(user_codes, ratio)
 
-        return pd.DataFrame(negative_samples)
+        negative_samples = positive_df.iloc[rows].copy()
+        negative_samples['vehicle_id'] = vehicles
+        negative_samples['preference_score'] = 0  # 부정적 레이블
+        return negative_samples.reset_index(drop=True)
 
     def _extract_user_features(self, df: pd.DataFrame) -> np.ndarray:
-        """사용자 특성 피처 추출"""
-        # 사용자 인구통계학적 정보
-        user_features = []
-
-        for _, row in df.iterrows():
-            features = [
-                row.get('user_age', 30) / 100.0,           # 나이 정규화
-                row.get('user_income', 5000) / 10000.0,    # 소득 정규화
-                row.get('user_family_size', 2) / 10.0,     # 가족 수
-                row.get('user_driving_exp', 5) / 50.0,     # 운전 경력
-                row.get('user_location_code', 0) / 100.0,  # 지역 코드
-                row.get('user_education', 3) / 5.0,        # 학력 수준
-                row.get('user_occupation_code', 0) / 20.0, # 직업 코드
-                row.get('user_gender', 0),                 # 성별 (0/1)
-                row.get('user_married', 0),                # 결혼 여부
-                row.get('user_car_ownership', 0)           # 차량 보유 여부
-            ]
-            user_features.append(features)
-
-        return np.array(user_features, dtype=np.float32)
+        """사용자 특성 피처 추출 (나이/소득 표준화, 지역/직업 라벨 인코딩 등)"""
+        return self.user_encoder.transform(df)
 
     def _extract_vehicle_features(self, df: pd.DataFrame) -> np.ndarray:
-        """차량 특성 피처 추출"""
-        vehicle_features = []
-
-        for _, row in df.iterrows():
-            features = [
-                row.get('vehicle_price', 3000) / 10000.0,     # 가격 정규화
-                row.get('vehicle_year', 2020) / 2025.0,       # 연식 정규화
-                row.get('vehicle_mileage', 50000) / 200000.0, # 주행거리
-                row.get('vehicle_engine_size', 2.0) / 5.0,    # 배기량
-                row.get('vehicle_fuel_efficiency', 12) / 30.0, # 연비
-                row.get('vehicle_safety_rating', 4) / 5.0,    # 안전등급
-                row.get('vehicle_brand_rank', 5) / 20.0,      # 브랜드 순위
-                row.get('vehicle_body_type_code', 0) / 10.0,  # 차종 코드
-                row.get('vehicle_fuel_type_code', 0) / 5.0,   # 연료 타입
-                row.get('vehicle_transmission_auto', 1),      # 자동변속기 여부
-                row.get('vehicle_accident_history', 0),      # 사고 이력
-                row.get('vehicle_owner_count', 1) / 5.0,     # 이전 소유자 수
-                row.get('vehicle_maintenance_score', 3) / 5.0, # 정비 상태
-                row.get('vehicle_popularity_score', 0.5),     # 인기도
-                row.get('vehicle_resale_value', 0.7)          # 리세일 가치
-            ]
-            vehicle_features.append(features)
-
-        return np.array(vehicle_features, dtype=np.float32)
+        """차량 특성 피처 추출 (가격/연식/주행거리 표준화, 차종/연료 라벨 인코딩 등)"""
+        return self.vehicle_encoder.transform(df)
 
     def _extract_context_features(self, df: pd.DataFrame) -> np.ndarray:
-        """상황 정보 피처 추출"""
-        context_features = []
-
-        for _, row in df.iterrows():
-            features = [
-                row.get('season_code', 0) / 4.0,        # 계절 (0-3)
-                row.get('hour_of_day', 12) / 24.0,      # 시간대
-                row.get('day_of_week', 3) / 7.0,        # 요일
-                row.get('market_condition', 0.5),       # 시장 상황 지수
-                row.get('oil_price_index', 0.5)         # 유가 지수
-            ]
-            context_features.append(features)
-
-        return np.array(context_features, dtype=np.float32)
+        """상황 정보 피처 추출 (시간대 구간화, 계절/요일 라벨 인코딩 등)"""
+        return self.context_encoder.transform(df)
+
+    def feature_encoder_state(self) -> Dict:
+        """추론 시 같은 변환을 쓰기 위한 인코더 통계 (메타데이터로 저장)"""
+        return {
+            'user': self.user_encoder.state(),
+            'vehicle': self.vehicle_encoder.state(),
+            'context': self.context_encoder.state()
+        }
 
     def train(self,
               interaction_df: pd.DataFrame,
               validation_split: float = 0.2,
               epochs: int = 50,
               batch_size: int = 256,
-              early_stopping_patience: int = 10):
-        """모델 훈련"""
+              early_stopping_patience: int = 10,
+              popularity_alpha: Optional[float] = None,
+              vehicle_catalog: Optional[pd.DataFrame] = None):
+        """모델 훈련 (vehicle_catalog: 차량 피처를 카탈로그에서 조인, 서빙 시 load_vehicle_catalog와 같은 카탈로그 권장)"""
 
         # 데이터 준비
         print("📊 훈련 데이터 준비 중...")
-        training_data = self.prepare_training_data(interaction_df)
+        training_data = self.prepare_training_data(interaction_df, popularity_alpha, vehicle_catalog)
 
         # 모델 컴파일
         if self.model is None:
@@ -320,9 +356,99 @@ class CarRecommendationNCF:
             verbose=1
         )
 
+        self.serving_fn = None
+        self.two_tower = None  # 가중치가 바뀌었으므로 추론 함수/차량 타워 캐시는 다시 생성
+
         print("✅ 훈련 완료!")
         return self.training_history
 
+    def load_vehicle_catalog(self, catalog: pd.DataFrame) -> VehicleFeatureTable:
+        """
+        vehicles 카탈로그로 추론용 차량 피처 테이블 구성 (훈련과 같은 차량 인코더, 훈련 시 차량 인덱스 매핑)
+        - 이후 변경분은 vehicle_table.refresh / refresh_from_db로 증분 반영
+        """
+        vehicle_index = self.vehicle_index
+        if self.is_loaded and vehicle_index is None:
+            print("⚠️ 차량 인덱스 매핑이 없는 모델입니다 - 카탈로그 차량을 임베딩에 연결하지 않습니다 (재훈련 필요)")
+            vehicle_index = []
+        self.vehicle_table = VehicleFeatureTable(self.vehicle_encoder, capacity=len(catalog), vehicle_index=vehicle_index)
+        self.vehicle_table.refresh(catalog)
+        return self.vehicle_table
+
+    def build_serving_function(self):
+        """
+        고정 입력 시그니처 추론 함수 (배치 크기만 가변)
+        - 한 번 트레이싱한 그래프를 모든 요청이 재사용 (model.predict의 호출당 설정/재트레이싱 비용 제거)
+        """
+        if self.model is None:
+            raise ValueError("모델이 구축되지 않았습니다.")
+
+        model = self.model
+        signature = {
+            'user_id': tf.TensorSpec([None], tf.int32, name='user_id'),
+            'vehicle_id': tf.TensorSpec([None], tf.int32, name='vehicle_id'),
+            'user_features': tf.TensorSpec([None, self.user_feature_dim], tf.float32, name='user_features'),
+            'vehicle_features': tf.TensorSpec([None, self.vehicle_feature_dim], tf.float32, name='vehicle_features'),
+            'context_features': tf.TensorSpec([None, self.context_feature_dim], tf.float32, name='context_features')
+        }
+
+        @tf.function(input_signature=[signature])
+        def serve(inputs):
+            return model(inputs, training=False)
+
+        return serve
+
+    def build_two_tower(self) -> TwoTowerScorer:
+        """현재 가중치로 사용자/차량 타워 분해 추론기 구성 (모델 버전당 1회)"""
+        if self.model is None:
+            raise ValueError("모델이 구축되지 않았습니다.")
+
+        layer = self.model.get_layer
+        self.two_tower = TwoTowerScorer(
+            user_gmf=layer('user_embedding_gmf').get_weights()[0],
+            vehicle_gmf=layer('vehicle_embedding_gmf').get_weights()[0],
+            user_mlp=layer('user_embedding_mlp').get_weights()[0],
+            vehicle_mlp=layer('vehicle_embedding_mlp').get_weights()[0],
+            mlp_layers=[tuple(layer(f'mlp_layer_{i+1}').get_weights()) for i in range(len(self.mlp_layers))],
+            prediction=tuple(layer('prediction').get_weights()),
+            user_feature_dim=self.user_feature_dim,
+            vehicle_feature_dim=self.vehicle_feature_dim
+        )
+        return self.two_tower
+
+    def _vehicle_tower(self) -> TwoTowerScorer:
+        """차량 피처 테이블이 바뀌었으면 차량 타워 캐시 재계산 (행 = 테이블 행 = 차량 임베딩 인덱스)"""
+        table = self.vehicle_table
+        if self.two_tower.cache_key != table.version:
+            # refresh와 겹치지 않게 잠근 상태에서 피처와 버전을 함께 읽음 (반쯤 갱신된 행이 새 버전으로 캐시되지 않도록)
+            with table.lock:
+                rows = np.arange(min(len(table), self.num_vehicles))
+                self.two_tower.cache_vehicles(rows, table.features[rows], cache_key=table.version)
+        return self.two_tower
+
+    def warmup(self, batch_size: int = 64) -> float:
+        """추론 함수 트레이싱 + 더미 배치 1회 실행 (서빙 전 호출). Returns: 소요 시간(ms)"""
+        if not self.is_loaded:
+            return 0.0
+
+        started = time.perf_counter()
+        if self.model is not None:
+            self.serving_fn = self.build_serving_function()
+            self.serving_fn({
+                'user_id': np.zeros(batch_size, dtype=np.int32),
+                'vehicle_id': np.zeros(batch_size, dtype=np.int32),
+                'user_features': np.zeros((batch_size, self.user_feature_dim), dtype=np.float32),
+                'vehicle_features': np.zeros((batch_size, self.vehicle_feature_dim), dtype=np.float32),
+                'context_features': np.zeros((batch_size, self.context_feature_dim), dtype=np.float32)
+            })
+            if self.two_tower is None:
+                self.build_two_tower()
+
+        # 차량 타워 캐시 (카탈로그가 있으면 요청은 사용자 타워 + 결합 층만 계산, pre-fork 부모에서 받은 추론기는 재사용)
+        if self.vehicle_table is not None:
+            self._vehicle_tower()
+        return (time.perf_counter() - started) * 1000.0
+
     def predict_user_preferences(self,
                                 user_id: int,
                                 vehicle_ids: List[int],
@@ -330,22 +456,34 @@ class CarRecommendationNCF:
                                 context_features: np.ndarray) -> np.ndarray:
         """사용자-차량 선호도 예측"""
 
-        if self.model is None:
+        if not self.is_loaded:
             raise ValueError("모델이 훈련되지 않았습니다.")
 
-        # 차량 특성 추출 (실제로는 DB에서 가져옴)
+        # 분해 추론: 캐시된 차량 타워 출력에 대해 결합 층만 행렬 연산으로 계산
+        if self.two_tower is not None and self.vehicle_table is not None:
+            return self._vehicle_tower().score(
+                user_id, user_features, context_features, np.asarray(vehicle_ids, dtype=np.int64)
+            )
+
+        if self.model is None:
+            raise ValueError("분해 추론기만 로드된 모델은 차량 피처 테이블이 있어야 추론할 수 있습니다.")
+
+        # 차량 특성 (차량 피처 테이블 행)
         vehicle_features = self._get_vehicle_features_batch(vehicle_ids)
 
-        # 배치 예측
+        # 배치 예측 (예열된 추론 함수가 있으면 사용)
         batch_size = len(vehicle_ids)
-        predictions = self.model.predict({
-            'user_id': np.array([user_id] * batch_size),
-            'vehicle_id': np.array(vehicle_ids),
-            'user_features': np.tile(user_features, (batch_size, 1)),
-            'vehicle_features': vehicle_features,
-            'context_features': np.tile(context_features, (batch_size, 1))
-        })
+        inputs = {
+            'user_id': np.full(batch_size, user_id, dtype=np.int32),
+            'vehicle_id': np.asarray(vehicle_ids, dtype=np.int32),
+            'user_features': np.tile(np.asarray(user_features, dtype=np.float32), (batch_size, 1)),
+            'vehicle_features': np.asarray(vehicle_features, dtype=np.float32),
+            'context_features': np.tile(np.asarray(context_features, dtype=np.float32), (batch_size, 1))
+        }
+        if self.serving_fn is not None:
+            return self.serving_fn(inputs).numpy().flatten()
 
+        predictions = self.model.predict(inputs, verbose=0)
         return predictions.flatten()
 
     def get_top_recommendations(self,
@@ -382,40 +520,34 @@ class CarRecommendationNCF:
         FastAPI 통합을 위한 간소화된 추천 인터페이스
         """
         try:
-            # Mock 사용자 특성 생성 (실제로는 user_dict에서 추출)
-            user_features = np.array([[
-                user_dict.get('age', 30) / 100.0,
-                user_dict.get('income', 5000) / 10000.0,
-                2.0 / 10.0,  # family_size
-                5.0 / 50.0,  # driving_exp
-                0.0 / 100.0, # location_code
-                3.0 / 5.0,   # education
-                0.0 / 20.0,  # occupation_code
-                0.0,         # gender
-                0.0,         # married
-                0.0          # car_ownership
-            ]], dtype=np.float32)
-
-            # Mock 컨텍스트 특성
-            context_features = np.array([[
-                1.0 / 4.0,   # season
-                12.0 / 24.0, # hour
-                3.0 / 7.0,   # day_of_week
-                0.5,         # market_condition
-                0.5          # oil_price_index
-            ]], dtype=np.float32)
-
-            # Mock 후보 차량 목록 (실제로는 데이터베이스에서 가져옴)
+            # 사용자 특성 (훈련과 같은 인코더, 없는 항목은 기본값)
+            user_features = self.user_encoder.transform_records([{
+                'user_age': user_dict.get('age', 30),
+                'user_income': user_dict.get('income', 5000)
+            }])
+
+            # 컨텍스트 특성 (현재 시각 기준)
+            now = pd.Timestamp.now()
+            context_features = self.context_encoder.transform_records([{
+                'season_code': (now.month % 12) // 3,
+                'hour_of_day': now.hour,
+                'day_of_week': now.dayofweek
+            }])
+
+            # 후보 차량: 차량 피처 테이블의 판매 중 차량 전체 (예산 이하, 임베딩이 있는 행)
             budget_max = user_dict.get('budget_max', 5000)
-            candidate_vehicles = list(range(min(50, self.num_vehicles)))
+            if self.vehicle_table is not None:
+                candidate_vehicles = self.vehicle_table.candidate_rows(budget_max, max_row=self.num_vehicles).tolist()
+            else:
+                candidate_vehicles = list(range(min(50, self.num_vehicles)))
 
             # Mock 추천 결과 생성 (모델이 훈련되지 않은 경우)
-            if self.model is None:
+            if not self.is_loaded:
                 recommendations = []
                 for i, vehicle_id in enumerate(candidate_vehicles[:n_recommendations]):
                     score = 0.9 - (i * 0.05)  # 점진적 감소
                     recommendations.append({
-                        'vehicle_id': f"ncf_{vehicle_id}",
+                        'vehicle_id': self._catalog_vehicle_id(vehicle_id, default=f"ncf_{vehicle_id}"),
                         'score': max(0.3, score),
                         'confidence': 0.85,
                         'reasons': [f'NCF Algorithm - 차량 {vehicle_id}', '딥러닝 기반 협업 필터링'],
@@ -438,7 +570,7 @@ class CarRecommendationNCF:
             recommendations = []
             for i, rec in enumerate(detailed_recs):
                 recommendations.append({
-                    'vehicle_id': str(rec['vehicle_id']),
+                    'vehicle_id': self._catalog_vehicle_id(rec['vehicle_id'], default=str(rec['vehicle_id'])),
                     'score': rec['preference_score'],
                     'confidence': 0.88,
                     'reasons': [rec['reasoning'], 'Neural Collaborative Filtering'],
@@ -462,31 +594,17 @@ class CarRecommendationNCF:
             return mock_recommendations
 
     def _get_vehicle_features_batch(self, vehicle_ids: List[int]) -> np.ndarray:
-        """차량 특성 배치 조회 (실제로는 DB 쿼리)"""
-        # 임시 구현 - 실제로는 데이터베이스에서 조회
-        batch_features = []
-        for vehicle_id in vehicle_ids:
-            # Mock 차량 특성
-            features = [
-                0.3,   # 가격
-                0.8,   # 연식
-                0.4,   # 주행거리
-                0.6,   # 배기량
-                0.7,   # 연비
-                0.9,   # 안전등급
-                0.6,   # 브랜드
-                0.5,   # 차종
-                0.3,   # 연료타입
-                1.0,   # 자동변속기
-                0.0,   # 사고이력
-                0.2,   # 소유자수
-                0.8,   # 정비상태
-                0.6,   # 인기도
-                0.7    # 리세일가치
-            ]
-            batch_features.append(features)
-
-        return np.array(batch_features, dtype=np.float32)
+        """차량 특성 배치 조회 (차량 피처 테이블 행, 테이블이 없으면 인코더 기본값)"""
+        if self.vehicle_table is not None:
+            with self.vehicle_table.lock:
+                return self.vehicle_table.features[np.asarray(vehicle_ids, dtype=np.int64)]
+        return self.vehicle_encoder.transform(pd.DataFrame(index=range(len(vehicle_ids))))
+
+    def _catalog_vehicle_id(self, row: int, default: str) -> str:
+        """차량 임베딩 인덱스 → 카탈로그 차량 ID"""
+        if self.vehicle_table is not None and 0 <= row < len(self.vehicle_table):
+            return str(self.vehicle_table.vehicle_ids[row])
+        return default
 
     def _explain_recommendation(self, user_id: int, vehicle_id: int) -> str:
         """추천 이유 설명 생성"""
@@ -508,12 +626,17 @@ class CarRecommendationNCF:
                 'num_users': self.num_users,
                 'num_vehicles': self.num_vehicles,
                 'embedding_dim': self.embedding_dim,
-                'mlp_layers': self.mlp_layers
+                'mlp_layers': self.mlp_layers,
+                'feature_encoders': self.feature_encoder_state(),
+                'vehicle_index': self.vehicle_index
             }
 
             with open(f"{filepath}_metadata.json", 'w') as f:
                 json.dump(metadata, f)
 
+            # 분해 추론기 가중치 (TensorFlow 없이 로드 가능 - pre-fork 부모에서 차량 타워 캐시를 미리 구성)
+            (self.two_tower or self.build_two_tower()).save(f"{filepath}_two_tower.npz")
+
         print(f"✅ 모델 저장 완료: {filepath}")
 
     def load_model(self, filepath: str):
@@ -531,6 +654,19 @@ class CarRecommendationNCF:
         self.model.load_weights(filepath)
         print(f"✅ 모델 로드 완료: {filepath}")
 
+    def load_two_tower_model(self, filepath: str, two_tower: Optional[TwoTowerScorer] = None):
+        """
+        분해 추론기 가중치(save_model의 _two_tower.npz)만으로 서빙 준비 - Keras 모델을 만들지 않음
+        - two_tower: pre-fork 부모가 이미 로드한 추론기 (워커는 TensorFlow 가중치를 따로 보유하지 않음)
+        - 추론에는 차량 피처 테이블이 필요 (load_vehicle_catalog 또는 공유 테이블 지정)
+        """
+        with open(f"{filepath}_metadata.json", 'r') as f:
+            metadata = json.load(f)
+
+        self.__init__(**metadata)
+        self.two_tower = two_tower or TwoTowerScorer.load(f"{filepath}_two_tower.npz")
+        print(f"✅ 분해 추론기 로드 완료: {filepath}")
+
 # NCF 통합을 위한 유틸리티 함수들
 def create_mock_interaction_data(num_users: int = 1000, num_vehicles: int = 500) -> pd.DataFrame:
     """Mock 상호작용 데이터 생성"""
@@ -0,0 +1,193 @@
+"""
+NCF Feature Encoders
+CarRecommendationNCF 입력 피처(사용자/차량/컨텍스트)를 컬럼 단위로 인코딩
+
+- 행 단위 iterrows/dict 대신 컬럼별로 한 번에 변환해 (N, dim) float32 연속 배열에 채움
+- 인코딩 종류
+  - numeric : 표준화 (훈련 데이터 평균/표준편차)
+  - label   : 라벨 인코딩 (훈련 데이터 어휘, 미등록 값 0 → 등록 값 (순번+1)/어휘 수)
+  - bucket  : 구간화 (고정 경계, 구간 번호 / 구간 수)
+  - binary / passthrough : 값 그대로 (0/1 플래그, 이미 0~1인 지수)
+- fit으로 얻은 통계는 state()로 저장하고 추론 시 from_state()로 복원해 같은 변환 사용
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """피처 하나의 컬럼명, 결측 기본값, 인코딩 종류 (bucket은 경계 포함)"""
+    column: str
+    default: float
+    kind: str = 'numeric'
+    edges: Optional[Sequence[float]] = None
+
+
+# 사용자 인구통계학적 정보 (10차원)
+USER_FEATURE_SPECS = [
+    FeatureSpec('user_age', 30),
+    FeatureSpec('user_income', 5000),
+    FeatureSpec('user_family_size', 2),
+    FeatureSpec('user_driving_exp', 5),
+    FeatureSpec('user_location_code', 0, 'label'),
+    FeatureSpec('user_education', 3),
+    FeatureSpec('user_occupation_code', 0, 'label'),
+    FeatureSpec('user_gender', 0, 'binary'),
+    FeatureSpec('user_married', 0, 'binary'),
+    FeatureSpec('user_car_ownership', 0, 'binary'),
+]
+
+# 차량 세부 특성 (15차원)
+VEHICLE_FEATURE_SPECS = [
+    FeatureSpec('vehicle_price', 3000),
+    FeatureSpec('vehicle_year', 2020),
+    FeatureSpec('vehicle_mileage', 50000),
+    FeatureSpec('vehicle_engine_size', 2.0),
+    FeatureSpec('vehicle_fuel_efficiency', 12),
+    FeatureSpec('vehicle_safety_rating', 4),
+    FeatureSpec('vehicle_brand_rank', 5),
+    FeatureSpec('vehicle_body_type_code', 0, 'label'),
+    FeatureSpec('vehicle_fuel_type_code', 0, 'label'),
+    FeatureSpec('vehicle_transmission_auto', 1, 'binary'),
+    FeatureSpec('vehicle_accident_history', 0, 'binary'),
+    FeatureSpec('vehicle_owner_count', 1),
+    FeatureSpec('vehicle_maintenance_score', 3),
+    FeatureSpec('vehicle_popularity_score', 0.5, 'passthrough'),
+    FeatureSpec('vehicle_resale_value', 0.7, 'passthrough'),
+]
+
+# 상황 정보 (5차원)
+CONTEXT_FEATURE_SPECS = [
+    FeatureSpec('season_code', 0, 'label'),
+    FeatureSpec('hour_of_day', 12, 'bucket', edges=(6, 10, 14, 18, 22)),  # 새벽/오전/점심/오후/저녁/심야
+    FeatureSpec('day_of_week', 3, 'label'),
+    FeatureSpec('market_condition', 0.5, 'passthrough'),
+    FeatureSpec('oil_price_index', 0.5, 'passthrough'),
+]
+
+
+# vehicles 카탈로그 컬럼 → 차량 피처 컬럼 (없는 피처는 인코더 기본값)
+VEHICLE_CATALOG_COLUMNS = {
+    'price': 'vehicle_price',
+    'year': 'vehicle_year',
+    'mileage': 'vehicle_mileage',
+    'engine_size': 'vehicle_engine_size',
+    'fuel_efficiency': 'vehicle_fuel_efficiency',
+    'safety_rating': 'vehicle_safety_rating',
+    'body_type': 'vehicle_body_type_code',
+    'fuel_type': 'vehicle_fuel_type_code',
+    'accident_history': 'vehicle_accident_history',
+    'owner_count': 'vehicle_owner_count',
+}
+
+AUTOMATIC_TRANSMISSIONS = ('auto', 'automatic', 'cvt', 'dct')
+
+
+def catalog_to_vehicle_features(catalog: pd.DataFrame) -> pd.DataFrame:
+    """
+    vehicles 테이블/ncf_vehicles.csv 행을 차량 피처 컬럼 DataFrame으로 변환
+    - 추론(VehicleFeatureTable)과 훈련(prepare_training_data의 vehicle_catalog 조인)이 같은 변환을 써서
+      label 어휘가 카탈로그 값('suv' 등)으로 일치
+    """
+    features = catalog[[column for column in VEHICLE_CATALOG_COLUMNS if column in catalog]].rename(
+        columns=VEHICLE_CATALOG_COLUMNS
+    )
+    if 'vehicle_accident_history' in features:
+        features['vehicle_accident_history'] = features['vehicle_accident_history'].astype(float)
+    if 'transmission' in catalog:
+        transmission = catalog['transmission'].astype(str).str.lower()
+        features['vehicle_transmission_auto'] = transmission.isin(AUTOMATIC_TRANSMISSIONS).astype(np.float32)
+    return features
+
+
+class FeatureEncoder:
+    """
+    컬럼 단위 피처 인코더
+    - fit(df): numeric 평균/표준편차, label 어휘 학습
+    - transform(df): (len(df), dim) float32 C-연속 배열 (없는 컬럼/결측은 기본값)
+    - state() / from_state(): 통계 저장·복원 (JSON 직렬화 가능)
+    """
+
+    def __init__(self, specs: List[FeatureSpec]):
+        self.specs = list(specs)
+        self.stats: Dict[str, Dict] = {}
+        self.fitted = False
+
+    @property
+    def dim(self) -> int:
+        return len(self.specs)
+
+    @staticmethod
+    def _column(df: pd.DataFrame, spec: FeatureSpec) -> pd.Series:
+        if spec.column not in df:
+            return pd.Series(spec.default, index=df.index)
+        return df[spec.column].fillna(spec.default)
+
+    def fit(self, df: pd.DataFrame) -> 'FeatureEncoder':
+        stats = {}
+        for spec in self.specs:
+            if spec.kind == 'numeric':
+                values = pd.to_numeric(self._column(df, spec), errors='coerce').fillna(spec.default).to_numpy(dtype=np.float64)
+                std = float(values.std()) if len(values) > 1 else 0.0
+                stats[spec.column] = {'mean': float(values.mean()) if len(values) else float(spec.default),
+                                      'std': std if std > 0 else 1.0}
+            elif spec.kind == 'label':
+                vocabulary = pd.unique(self._column(df, spec)).tolist()
+                stats[spec.column] = {'vocabulary': sorted(vocabulary, key=str)}
+
+        self.stats = stats
+        self.fitted = True
+        return self
+
+    def _params(self, spec: FeatureSpec) -> Dict:
+        """학습된 통계 (fit 전이면 기본값 기준 스케일, 빈 어휘)"""
+        if spec.column in self.stats:
+            return self.stats[spec.column]
+        if spec.kind == 'numeric':
+            return {'mean': float(spec.default), 'std': max(abs(float(spec.default)), 1.0)}
+        return {'vocabulary': []}
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        out = np.empty((len(df), self.dim), dtype=np.float32)
+
+        for j, spec in enumerate(self.specs):
+            column = self._column(df, spec)
+
+            if spec.kind == 'label':
+                vocabulary = self._params(spec)['vocabulary']
+                codes = pd.Index(vocabulary).get_indexer(column)
+                out[:, j] = (codes + 1) / max(len(vocabulary), 1)  # 미등록 값(-1) → 0
+                continue
+
+            values = pd.to_numeric(column, errors='coerce').fillna(spec.default).to_numpy(dtype=np.float32)
+            if spec.kind == 'numeric':
+                params = self._params(spec)
+                out[:, j] = (values - params['mean']) / params['std']
+            elif spec.kind == 'bucket':
+                out[:, j] = np.digitize(values, spec.edges) / len(spec.edges)
+            else:
+                out[:, j] = values
+
+        return out
+
+    def fit_transform(self, df: pd.DataFrame) -> np.ndarray:
+        return self.fit(df).transform(df)
+
+    def transform_records(self, records: List[Dict]) -> np.ndarray:
+        """추론 시 dict 목록 인코딩"""
+        return self.transform(pd.DataFrame.from_records(records))
+
+    def state(self) -> Dict:
+        return {'columns': [spec.column for spec in self.specs], 'stats': self.stats}
+
+    @classmethod
+    def from_state(cls, specs: List[FeatureSpec], state: Optional[Dict]) -> 'FeatureEncoder':
+        """저장된 통계로 인코더 복원 (컬럼 구성이 다르면 fit 전 상태)"""
+        encoder = cls(specs)
+        if state and state.get('columns') == [spec.column for spec in specs]:
+            encoder.stats = state['stats']
+            encoder.fitted = True
+        return encoder
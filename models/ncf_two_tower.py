@@ -0,0 +1,119 @@
+"""
+Two-Tower NCF Inference
+CarRecommendationNCF(GMF + MLP) 추론을 사용자 쪽/차량 쪽으로 분해해 차량 쪽 결과를 캐시
+
+첫 MLP 층은 입력 concat에 대해 선형이므로
+    W1·[u_mlp; v_mlp; user_f; vehicle_f; context] + b1
+  = (W_u·u_mlp + W_uf·user_f + W_c·context + b1)  ← 사용자 타워 (요청당 1회)
+  + (W_v·v_mlp + W_vf·vehicle_f)                   ← 차량 타워 (모델 버전·카탈로그당 1회, 캐시)
+GMF 출력 (u_gmf ⊙ v_gmf)·w_gmf = v_gmf · (u_gmf ⊙ w_gmf) 도 같은 방식으로 분해.
+요청 시에는 캐시된 차량 행렬 전체에 대해 덧셈 + 나머지 Dense 층을 행렬 연산으로 한 번에 계산
+(추론 시 Dropout은 비활성이므로 결과는 Keras 모델과 동일).
+가중치는 save/load(.npz)로 TensorFlow 없이 복원 가능 (pre-fork 부모 프로세스에서 미리 구성).
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+class TwoTowerScorer:
+    """
+    NCF 가중치로 구성한 분해 추론기 (NumPy, float32)
+    - cache_vehicles: 차량 타워 출력 (GMF 임베딩, 첫 MLP 층 차량 기여분) 계산·보관
+    - score: 사용자 타워 + 결합 층을 캐시된 차량 전체(또는 일부 행)에 대해 계산
+    """
+
+    def __init__(self,
+                 user_gmf: np.ndarray, vehicle_gmf: np.ndarray,
+                 user_mlp: np.ndarray, vehicle_mlp: np.ndarray,
+                 mlp_layers: List[Tuple[np.ndarray, np.ndarray]],
+                 prediction: Tuple[np.ndarray, np.ndarray],
+                 user_feature_dim: int, vehicle_feature_dim: int):
+        def as32(array):
+            return np.asarray(array, dtype=np.float32)
+
+        self.user_gmf, self.vehicle_gmf = as32(user_gmf), as32(vehicle_gmf)
+        self.user_mlp, self.vehicle_mlp = as32(user_mlp), as32(vehicle_mlp)
+        self.mlp_layers = [(as32(w), as32(b)) for w, b in mlp_layers]  # save()용 원본 (아래 분할은 이 배열의 뷰)
+        self.prediction = (as32(prediction[0]), as32(prediction[1]))
+        self.user_feature_dim, self.vehicle_feature_dim = user_feature_dim, vehicle_feature_dim
+
+        # 첫 MLP 층 가중치를 concat 순서(사용자 임베딩, 차량 임베딩, 사용자 피처, 차량 피처, 컨텍스트)대로 분할
+        embedding_dim = self.user_mlp.shape[1]
+        kernel, self.first_bias = self.mlp_layers[0]
+        splits = np.cumsum([embedding_dim, embedding_dim, user_feature_dim, vehicle_feature_dim])
+        (self.w_user_embedding, self.w_vehicle_embedding, self.w_user_features,
+         self.w_vehicle_features, self.w_context) = np.split(kernel, splits, axis=0)
+        self.hidden_layers = self.mlp_layers[1:]
+
+        # 최종 층 가중치를 [GMF 출력; MLP 출력]으로 분할
+        prediction_kernel = self.prediction[0][:, 0]
+        gmf_dim = self.user_gmf.shape[1]
+        self.w_gmf, self.w_mlp = prediction_kernel[:gmf_dim], prediction_kernel[gmf_dim:]
+        self.prediction_bias = float(self.prediction[1].ravel()[0])
+
+        # (캐시 키, GMF 차량 임베딩 (N, gmf_dim), 첫 MLP 층 차량 기여분 (N, h1)) - 튜플 하나로 교체해 요청 중 일관성 유지
+        self.cache: Optional[Tuple[object, np.ndarray, np.ndarray]] = None
+
+    def save(self, path: str):
+        """생성자 입력 가중치를 .npz 하나로 저장 (차량 타워 캐시는 제외)"""
+        arrays = {
+            'user_gmf': self.user_gmf, 'vehicle_gmf': self.vehicle_gmf,
+            'user_mlp': self.user_mlp, 'vehicle_mlp': self.vehicle_mlp,
+            'prediction_kernel': self.prediction[0], 'prediction_bias': self.prediction[1],
+            'feature_dims': np.array([self.user_feature_dim, self.vehicle_feature_dim])
+        }
+        for i, (kernel, bias) in enumerate(self.mlp_layers):
+            arrays[f'mlp_kernel_{i}'], arrays[f'mlp_bias_{i}'] = kernel, bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'TwoTowerScorer':
+        """save()로 저장한 가중치로 복원 (TensorFlow 불필요)"""
+        with np.load(path) as data:
+            n_layers = sum(1 for name in data.files if name.startswith('mlp_kernel_'))
+            user_feature_dim, vehicle_feature_dim = (int(dim) for dim in data['feature_dims'])
+            return cls(
+                user_gmf=data['user_gmf'], vehicle_gmf=data['vehicle_gmf'],
+                user_mlp=data['user_mlp'], vehicle_mlp=data['vehicle_mlp'],
+                mlp_layers=[(data[f'mlp_kernel_{i}'], data[f'mlp_bias_{i}']) for i in range(n_layers)],
+                prediction=(data['prediction_kernel'], data['prediction_bias']),
+                user_feature_dim=user_feature_dim, vehicle_feature_dim=vehicle_feature_dim
+            )
+
+    @property
+    def cache_key(self):
+        return self.cache[0] if self.cache is not None else None
+
+    def cache_vehicles(self, vehicle_idx: np.ndarray, vehicle_features: np.ndarray, cache_key=None):
+        """차량 타워 출력 계산 (캐시 행 순서 = vehicle_idx 순서)"""
+        vehicle_idx = np.asarray(vehicle_idx, dtype=np.int64)
+        cached_mlp = (self.vehicle_mlp[vehicle_idx] @ self.w_vehicle_embedding
+                      + np.asarray(vehicle_features, dtype=np.float32) @ self.w_vehicle_features)
+        self.cache = (cache_key, self.vehicle_gmf[vehicle_idx], cached_mlp)
+
+    def score(self, user_id: int, user_features: np.ndarray, context_features: np.ndarray,
+              positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """캐시 행(positions 생략 시 전체)에 대한 선호도 (0~1)"""
+        cache = self.cache
+        if cache is None:
+            raise ValueError("차량 타워 캐시가 없습니다. cache_vehicles()를 먼저 호출하세요.")
+        _, cached_gmf, cached_mlp = cache
+
+        user_part = (self.user_mlp[user_id] @ self.w_user_embedding
+                     + np.asarray(user_features, dtype=np.float32).ravel() @ self.w_user_features
+                     + np.asarray(context_features, dtype=np.float32).ravel() @ self.w_context
+                     + self.first_bias)
+        vehicle_mlp = cached_mlp if positions is None else cached_mlp[positions]
+        vehicle_gmf = cached_gmf if positions is None else cached_gmf[positions]
+
+        hidden = _relu(vehicle_mlp + user_part)
+        for kernel, bias in self.hidden_layers:
+            hidden = _relu(hidden @ kernel + bias)
+
+        logits = vehicle_gmf @ (self.user_gmf[user_id] * self.w_gmf) + hidden @ self.w_mlp + self.prediction_bias
+        return 1.0 / (1.0 + np.exp(-logits))
@@ -0,0 +1,112 @@
+"""
+Vectorized Negative Sampling
+암시적 피드백 학습용 부정 샘플 일괄 추출
+
+- 사용자별 긍정 차량을 정렬된 키 배열(user × n_items + item)로 보관 → 사용자 구간이 연속된 정렬 배열
+- 후보는 np.random.randint로 한 번에 뽑고 searchsorted 멤버십 검사로 충돌(긍정 차량, 같은 행 중복)만 다시 추출
+- 인기도 비례 추출은 alias 테이블 (Walker/Vose, 추출당 O(1))
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 재추출 최대 반복 (이후 남은 행은 여집합에서 직접 추출)
+MAX_REJECTION_ROUNDS = 20
+
+
+def build_alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vose alias 테이블 (prob, alias) - weights에 비례한 이산 분포"""
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+    prob = np.ones(n, dtype=np.float64)
+    alias = np.arange(n, dtype=np.int64)
+
+    small = list(np.flatnonzero(scaled < 1.0))
+    large = list(np.flatnonzero(scaled >= 1.0))
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+
+    return prob, alias
+
+
+class NegativeSampler:
+    """
+    사용자별 긍정 차량을 피하는 부정 샘플 추출기
+    - user_idx, item_idx: 긍정 상호작용 (정수 ID, 차량은 0..n_items-1)
+    - item_weights: 지정 시 가중치 비례 추출 (예: 인기도^0.75), 생략 시 균등
+    """
+
+    def __init__(self, user_idx: np.ndarray, item_idx: np.ndarray, n_items: int,
+                 item_weights: Optional[np.ndarray] = None):
+        self.n_items = n_items
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        item_idx = np.asarray(item_idx, dtype=np.int64)
+
+        self.positive_keys = np.unique(user_idx * n_items + item_idx)
+        users, counts = np.unique(self.positive_keys // n_items, return_counts=True)
+        self.users, self.positive_counts = users, counts
+
+        self.alias_prob, self.alias = build_alias_table(item_weights) if item_weights is not None else (None, None)
+
+    def _draw(self, size) -> np.ndarray:
+        if self.alias is None:
+            return np.random.randint(0, self.n_items, size=size)
+        idx = np.random.randint(0, self.n_items, size=size)
+        return np.where(np.random.random(size) < self.alias_prob[idx], idx, self.alias[idx])
+
+    def _collisions(self, user_idx: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """긍정 차량이거나 같은 행에서 이미 뽑힌 후보 (행별 첫 번째는 유지)"""
+        keys = user_idx[:, None] * self.n_items + candidates
+        if len(self.positive_keys) > 0:
+            pos = np.minimum(np.searchsorted(self.positive_keys, keys), len(self.positive_keys) - 1)
+            rejected = self.positive_keys[pos] == keys
+        else:
+            rejected = np.zeros(keys.shape, dtype=bool)
+
+        order = np.argsort(candidates, axis=1, kind='stable')
+        sorted_candidates = np.take_along_axis(candidates, order, axis=1)
+        duplicate = np.zeros_like(rejected)
+        duplicate[:, 1:] = sorted_candidates[:, 1:] == sorted_candidates[:, :-1]
+        np.put_along_axis(rejected, order, np.take_along_axis(rejected, order, axis=1) | duplicate, axis=1)
+        return rejected
+
+    def sample(self, user_idx: np.ndarray, ratio: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행마다 ratio개 서로 다른 부정 차량 추출
+        - 긍정 차량을 빼면 ratio개가 안 되는 사용자 행은 제외
+        Returns: (rows, items) rows는 user_idx 내 행 번호 (행당 ratio번 반복)
+        """
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        n_positive = np.zeros(len(user_idx), dtype=np.int64)
+        if len(self.users) > 0:
+            found = np.searchsorted(self.users, user_idx)
+            known = (found < len(self.users)) & (self.users[np.minimum(found, len(self.users) - 1)] == user_idx)
+            n_positive[known] = self.positive_counts[found[known]]
+        rows = np.flatnonzero(self.n_items - n_positive >= ratio)
+
+        users = user_idx[rows]
+        candidates = self._draw((len(rows), ratio))
+        pending = np.arange(len(rows))
+        for _ in range(MAX_REJECTION_ROUNDS):
+            rejected = self._collisions(users[pending], candidates[pending])
+            pending_rows = rejected.any(axis=1)
+            pending, rejected = pending[pending_rows], rejected[pending_rows]
+            if len(pending) == 0:
+                break
+            block = candidates[pending]
+            block[rejected] = self._draw(int(rejected.sum()))
+            candidates[pending] = block
+
+        # 남은 행 (긍정 차량이 대부분인 사용자): 여집합에서 직접 추출
+        for row in pending:
+            user = users[row]
+            start, end = np.searchsorted(self.positive_keys, [user * self.n_items, (user + 1) * self.n_items])
+            complement = np.setdiff1d(np.arange(self.n_items), self.positive_keys[start:end] - user * self.n_items)
+            candidates[row] = np.random.choice(complement, ratio, replace=False)
+
+        return np.repeat(rows, ratio), candidates.ravel()
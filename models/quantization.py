@@ -0,0 +1,109 @@
+"""
+Int8 Embedding Quantization
+차원별 스케일 int8 양자화 임베딩 (유사도 스캔용) + 정확한 벡터로 재순위
+
+- 코드: x / scale 반올림 → int8, scale = 차원별 최대 절댓값 / 127
+- 스캔: 질의에 scale을 곱해 두고 int8 코드 블록만 float32로 풀어 내적 (캐시 크기 블록 단위)
+  → float64 임베딩 대비 스캔 버퍼 메모리 1/8
+- 재순위: 근사 상위 k × rerank_factor 후보만 정확한 벡터로 다시 계산해 최종 Top-k 결정
+"""
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+INT8_MAX = 127
+
+# 스캔 시 한 번에 float32로 풀어 쓰는 코드 행 수
+SCAN_BLOCK_ROWS = 8192
+
+
+class Int8Embeddings:
+    """
+    차원별 스케일 int8 임베딩
+    - quantize: 벡터 집합으로 스케일 결정 + 인코딩
+    - quantize_rows: 행 접근자로 블록 단위 양자화 (전체 float32 사본을 만들지 않음)
+    - encode: 고정된 스케일로 새 벡터 인코딩 (범위 밖 값은 클리핑)
+    - scores: 근사 내적 (질의 × 지정 행)
+    """
+
+    def __init__(self, codes: np.ndarray, scale: np.ndarray):
+        self.codes = codes      # (N, dim) int8
+        self.scale = scale      # (dim,) float32
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray) -> 'Int8Embeddings':
+        vectors = np.asarray(vectors, dtype=np.float32)
+        max_abs = np.abs(vectors).max(axis=0) if len(vectors) > 0 else np.zeros(vectors.shape[1], dtype=np.float32)
+        scale = np.where(max_abs > 0, max_abs / INT8_MAX, 1.0).astype(np.float32)
+        quantized = cls(np.empty(vectors.shape, dtype=np.int8), scale)
+        quantized.codes[:] = quantized.encode(vectors)
+        return quantized
+
+    @classmethod
+    def quantize_rows(cls, rows: Callable[[np.ndarray], np.ndarray], n_rows: int, dim: int,
+                      block_rows: int = SCAN_BLOCK_ROWS) -> 'Int8Embeddings':
+        """rows(행 번호) → float32 벡터를 블록 단위로 두 번 읽어 스케일 결정 후 인코딩 (quantize와 같은 코드)"""
+        blocks = [np.arange(start, min(start + block_rows, n_rows)) for start in range(0, n_rows, block_rows)]
+        max_abs = np.zeros(dim, dtype=np.float32)
+        for block in blocks:
+            max_abs = np.maximum(max_abs, np.abs(rows(block)).max(axis=0))
+        scale = np.where(max_abs > 0, max_abs / INT8_MAX, 1.0).astype(np.float32)
+
+        quantized = cls(np.empty((n_rows, dim), dtype=np.int8), scale)
+        for block in blocks:
+            quantized.codes[block] = quantized.encode(rows(block))
+        return quantized
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scale.nbytes
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        scaled = np.rint(np.asarray(vectors, dtype=np.float32) / self.scale)
+        return np.clip(scaled, -INT8_MAX, INT8_MAX).astype(np.int8)
+
+    def resize(self, n_rows: int):
+        """코드 버퍼 행 수 변경 (늘어난 행은 0)"""
+        codes = np.zeros((n_rows, self.codes.shape[1]), dtype=np.int8)
+        n_keep = min(n_rows, len(self))
+        codes[:n_keep] = self.codes[:n_keep]
+        self.codes = codes
+
+    def scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """근사 내적 (Q, R) - rows 생략 시 전체 행"""
+        scaled = np.atleast_2d(np.asarray(queries, dtype=np.float32)) * self.scale
+        codes = self.codes if rows is None else self.codes[rows]
+
+        out = np.empty((scaled.shape[0], codes.shape[0]), dtype=np.float32)
+        for start in range(0, codes.shape[0], SCAN_BLOCK_ROWS):
+            block = codes[start:start + SCAN_BLOCK_ROWS].astype(np.float32)
+            out[:, start:start + len(block)] = scaled @ block.T
+        return out
+
+
+def rerank(queries: np.ndarray, candidates: np.ndarray, exact: Callable[[np.ndarray], np.ndarray],
+           k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    근사 후보를 정확한 벡터로 재계산해 질의별 Top-k
+    - candidates: (Q, m) 후보 행 번호 (-1은 빈 칸)
+    - exact(rows): 행 번호 → 정확한 벡터 (질의와 같은 정규화), 후보 행만 읽음
+    Returns: (positions, sims) 각 (Q, k) 유사도 내림차순, 빈 칸은 -1 / -inf
+    """
+    queries = np.atleast_2d(queries)
+    valid = candidates >= 0
+    gathered = np.asarray(exact(np.where(valid, candidates, 0).ravel()), dtype=np.float32)
+    sims = np.einsum('qd,qmd->qm', queries, gathered.reshape(candidates.shape + (-1,)))
+    sims[~valid] = -np.inf
+
+    k = min(k, candidates.shape[1])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k] if k < candidates.shape[1] else np.tile(np.arange(k), (len(sims), 1))
+    top_sims = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_sims, axis=1, kind='stable')
+
+    positions = np.take_along_axis(np.take_along_axis(candidates, top, axis=1), order, axis=1)
+    sims = np.take_along_axis(top_sims, order, axis=1)
+    positions[~np.isfinite(sims)] = -1
+    return positions, sims
@@ -15,12 +15,431 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
+import ast
+import json
 import os
+import shutil
+from scipy.linalg import cholesky, solve_triangular
+from scipy.optimize import nnls
 from scipy.sparse import csr_matrix
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import NMF
 import pickle
 
+try:
+    from .ann_index import IVFIndex
+    from .dataset_cache import load_csv_cached
+    from .implicit_als import ImplicitALS
+    from .quantization import Int8Embeddings, rerank
+    from .session_cooccurrence import SessionCooccurrenceModel
+    from .topn_store import TopNStore
+except ImportError:  # models/ 디렉토리를 sys.path에 추가해 직접 import한 경우
+    from ann_index import IVFIndex
+    from dataset_cache import load_csv_cached
+    from implicit_als import ImplicitALS
+    from quantization import Int8Embeddings, rerank
+    from session_cooccurrence import SessionCooccurrenceModel
+    from topn_store import TopNStore
+
+# 암시적 피드백 점수 (상호작용 타입별 가중치)
+INTERACTION_SCORES = {
+    'view': 1,
+    'like': 2,
+    'inquiry': 3,
+    'favorite': 4,
+    'purchase': 5
+}
+
+# 사용자 기반 CF에서 점수 합산에 사용하는 유사 사용자 수
+N_SIMILAR_USERS = 10
+
+# 알고리즘 키 → 추천 결과 표기 이름
+ALGORITHM_NAMES = {'hybrid': 'Hybrid NCF', 'user_based': 'User-Based CF', 'item_based': 'Item-Based CF'}
+
+# 후보 풀(방법별 상위 2n)이 n에 따라 달라지는 알고리즘 - 사전 계산 테이블은 n이 테이블 폭과 같을 때만 사용
+N_DEPENDENT_ALGORITHMS = ('hybrid',)
+
+# 사용자 선호도 키워드 → 비트 플래그 (ncf_users.csv preferences 컬럼)
+PREFERENCE_FLAGS = {
+    keyword: 1 << bit for bit, keyword in enumerate([
+        '연비', '안전성', '브랜드', '가격', '디자인', '신뢰성',
+        '성능', '편의성', '공간', '럭셔리', '가족용'
+    ])
+}
+
+# 브랜드/연료 그룹 (개인화 점수 및 추천 이유)
+DOMESTIC_BRANDS = ['현대', '기아']
+PREMIUM_BRANDS = ['BMW', '벤츠', '아우디']
+ECO_FUEL_TYPES = ['hybrid', 'electric']
+
+
+# 저장 아티팩트 포맷 버전 (구조가 바뀌면 올려서 이전 아티팩트를 무효화)
+ARTIFACT_FORMAT_VERSION = 1
+
+# 시간 감쇠: 행렬에는 감쇠 기준 시점(epoch) 값으로 부풀린 점수를 저장하고 전역 감쇠 계수 하나로 현재 값 계산
+# 부풀림 배수가 이 값을 넘으면 전체 값을 한 번 재조정하고 epoch를 현재로 이동 (float32 정밀도 유지)
+DECAY_RESCALE_THRESHOLD = 1e4
+
+
+def _map_values(series: pd.Series, mapping: Dict, default: float = np.nan) -> np.ndarray:
+    """
+    컬럼 값을 dict로 매핑한 float64 배열 (매핑 없으면 default)
+    - 범주형 컬럼(바이너리 캐시)은 카테고리만 매핑한 뒤 정수 코드로 take
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        lookup = np.array([mapping.get(c, default) for c in series.cat.categories] + [default], dtype=np.float64)
+        return lookup[series.cat.codes.to_numpy()]  # 코드 -1(결측)은 마지막 default
+    return series.map(mapping).to_numpy(dtype=np.float64, na_value=default)
+
+
+def _parse_preference_mask(preferences) -> int:
+    """선호도 리스트(또는 문자열로 저장된 리스트)를 비트마스크로 변환"""
+    if isinstance(preferences, str):
+        try:
+            preferences = ast.literal_eval(preferences)
+        except (ValueError, SyntaxError):
+            preferences = [preferences]
+    if not isinstance(preferences, (list, tuple, set)):
+        return 0
+
+    mask = 0
+    for keyword in preferences:
+        mask |= PREFERENCE_FLAGS.get(keyword, 0)
+    return mask
+
+class TopKNeighborIndex:
+    """
+    코사인 유사도 Top-k 이웃 인덱스
+    - 전체 N×N 유사도 행렬 대신 행별 상위 k개 이웃만 CSR로 저장
+    - 메모리 예산 안에서 블록 단위로 유사도 계산
+    - quantize: int8 코드로 근사 스캔 후 상위 k × rerank_factor 후보만 정확한 벡터로 재순위
+      (정규화 float32 전체 사본 없이 원본 임베딩에서 필요한 행만 정규화해 읽음)
+    """
+
+    def __init__(self, k: int = 50, memory_budget_mb: float = 256.0, quantize: bool = False, rerank_factor: int = 4):
+        self.k = k
+        self.memory_budget_mb = memory_budget_mb
+        self.quantize = quantize
+        self.rerank_factor = rerank_factor
+        self.matrix = None
+
+    @classmethod
+    def from_matrix(cls, matrix: csr_matrix, k: int) -> 'TopKNeighborIndex':
+        """이미 계산된 이웃 CSR 행렬로 인덱스 복원"""
+        index = cls(k)
+        index.matrix = matrix
+        return index
+
+    def _block_size(self, n_items: int) -> int:
+        """블록당 유사도 행렬(float32)이 메모리 예산을 넘지 않는 행 수"""
+        budget_bytes = self.memory_budget_mb * 1024 * 1024
+        return max(1, int(budget_bytes // (max(n_items, 1) * 4)))
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """행 단위 L2 정규화 (영벡터는 0 유지)"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def _query(self, normalized: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """지정한 행들의 Top-k 이웃 (블록 단위 계산, 유사도 내림차순)"""
+        n_items = normalized.shape[0]
+        k = min(self.k, max(n_items - 1, 0))
+        indices = np.empty((len(rows), k), dtype=np.int32)
+        similarities = np.empty((len(rows), k), dtype=np.float32)
+        if k == 0:
+            return indices, similarities
+
+        block_size = self._block_size(n_items)
+        for start in range(0, len(rows), block_size):
+            block_rows = rows[start:start + block_size]
+            block = normalized[block_rows] @ normalized.T
+
+            # 자기 자신은 이웃에서 제외
+            block[np.arange(len(block_rows)), block_rows] = -np.inf
+
+            top = np.argpartition(block, -k, axis=1)[:, -k:]
+            top_sims = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_sims, axis=1)
+
+            indices[start:start + len(block_rows)] = np.take_along_axis(top, order, axis=1)
+            similarities[start:start + len(block_rows)] = np.take_along_axis(top_sims, order, axis=1)
+
+        return indices, similarities
+
+    def _query_quantized(self, embeddings: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _query의 int8 버전: 근사 유사도 상위 k × rerank_factor 후보를 정확한 벡터로 재순위
+        - 메모리: int8 코드(N × 차원 바이트) + 블록 버퍼만 사용, 정확한 벡터는 질의/후보 행만 정규화해 읽음
+        """
+        n_items, dim = embeddings.shape
+        k = min(self.k, max(n_items - 1, 0))
+        indices = np.empty((len(rows), k), dtype=np.int32)
+        similarities = np.empty((len(rows), k), dtype=np.float32)
+        if k == 0:
+            return indices, similarities
+
+        def exact(positions):
+            return self._normalize(embeddings[positions])
+
+        n_shortlist = min(k * self.rerank_factor, n_items - 1)
+        codes = Int8Embeddings.quantize_rows(exact, n_items, dim)
+
+        # 블록당 근사 유사도 (행 × N) + 재순위 후보 벡터 (행 × 후보 수 × 차원)
+        block_size = self._block_size(n_items + n_shortlist * dim)
+        for start in range(0, len(rows), block_size):
+            block_rows = rows[start:start + block_size]
+            queries = exact(block_rows)
+            approx = codes.scores(queries)
+            approx[np.arange(len(block_rows)), block_rows] = -np.inf  # 자기 자신 제외
+
+            shortlist = np.argpartition(-approx, n_shortlist - 1, axis=1)[:, :n_shortlist]
+            positions, sims = rerank(queries, shortlist, exact, k)
+
+            indices[start:start + len(block_rows)] = positions
+            similarities[start:start + len(block_rows)] = sims
+
+        return indices, similarities
+
+    def _query_rows(self, embeddings: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """quantize 설정에 따라 정확한 블록 계산 또는 int8 스캔 + 재순위"""
+        if self.quantize:
+            return self._query_quantized(embeddings, rows)
+        return self._query(self._normalize(embeddings), rows)
+
+    def build(self, embeddings: np.ndarray) -> 'TopKNeighborIndex':
+        """임베딩으로부터 Top-k 이웃 리스트 계산"""
+        embeddings = np.asarray(embeddings)
+        n_items = embeddings.shape[0]
+
+        indices, similarities = self._query_rows(embeddings, np.arange(n_items))
+        k = indices.shape[1]
+
+        indptr = np.arange(0, n_items * k + 1, k, dtype=np.int64) if k > 0 else np.zeros(n_items + 1, dtype=np.int64)
+        self.matrix = csr_matrix(
+            (similarities.ravel(), indices.ravel(), indptr),
+            shape=(n_items, n_items)
+        )
+        return self
+
+    def build_approximate(self, embeddings: np.ndarray, ann: IVFIndex, n_probe: Optional[int] = None) -> 'TopKNeighborIndex':
+        """
+        IVF 근사 검색으로 Top-k 이웃 리스트 계산 (대규모 카탈로그용)
+        - ann은 같은 임베딩으로 ids=0..N-1 구축된 인덱스여야 함
+        - 블록 크기는 메모리 예산 기준 (질의 블록 × 리스트 크기)
+        """
+        n_items = np.asarray(embeddings).shape[0]
+        k = min(self.k, max(n_items - 1, 0))
+        block_size = self._block_size(max(len(members) for members in ann.lists))
+
+        counts = np.zeros(n_items, dtype=np.int64)
+        row_indices, row_similarities = [], []
+        for start in range(0, n_items, block_size):
+            rows = np.arange(start, min(start + block_size, n_items))
+            positions, similarities = ann.query_batch(embeddings[rows], k, n_probe, exclude_self=rows)
+
+            found = positions >= 0
+            counts[rows] = found.sum(axis=1)
+            row_indices.append(positions[found])
+            row_similarities.append(similarities[found])
+
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        self.matrix = csr_matrix(
+            (np.concatenate(row_similarities).astype(np.float32),
+             np.concatenate(row_indices).astype(np.int32), indptr),
+            shape=(n_items, n_items)
+        )
+        return self
+
+    def update_rows(self, embeddings: np.ndarray, rows: np.ndarray) -> 'TopKNeighborIndex':
+        """
+        지정한 행들의 이웃 리스트만 재계산 (임베딩 행 수가 늘었으면 인덱스도 확장)
+        - 다른 행의 이웃 리스트는 그대로 유지
+        """
+        embeddings = np.asarray(embeddings)
+        n_items = embeddings.shape[0]
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        new_indices, new_similarities = self._query_rows(embeddings, rows)
+
+        old = self.matrix
+        n_old = old.shape[0]
+        old_counts = np.diff(old.indptr)
+
+        counts = np.zeros(n_items, dtype=np.int64)
+        counts[:n_old] = old_counts
+        counts[rows] = new_indices.shape[1]
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+
+        data = np.empty(indptr[-1], dtype=np.float32)
+        indices = np.empty(indptr[-1], dtype=np.int32)
+
+        # 유지되는 행: 기존 세그먼트를 새 위치로 복사
+        keep_row = np.ones(n_old, dtype=bool)
+        keep_row[rows[rows < n_old]] = False
+        entry_row = np.repeat(np.arange(n_old), old_counts)
+        entry_keep = keep_row[entry_row]
+        offset = np.arange(old.nnz) - old.indptr[entry_row]
+        dest = indptr[entry_row[entry_keep]] + offset[entry_keep]
+        data[dest] = old.data[entry_keep]
+        indices[dest] = old.indices[entry_keep]
+
+        # 재계산된 행
+        dest = indptr[rows][:, None] + np.arange(new_indices.shape[1])
+        data[dest] = new_similarities
+        indices[dest] = new_indices
+
+        self.matrix = csr_matrix((data, indices, indptr), shape=(n_items, n_items))
+        return self
+
+    def neighbors(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """행 idx의 이웃 인덱스와 유사도 (유사도 내림차순)"""
+        start, end = self.matrix.indptr[idx], self.matrix.indptr[idx + 1]
+        return self.matrix.indices[start:end], self.matrix.data[start:end]
+
+    def truncated(self, k: int) -> csr_matrix:
+        """행별 상위 k개 이웃만 남긴 CSR 행렬"""
+        counts = np.diff(self.matrix.indptr)
+        positions = np.arange(self.matrix.nnz) - np.repeat(self.matrix.indptr[:-1], counts)
+        keep = positions < k
+
+        indptr = np.concatenate([[0], np.cumsum(np.minimum(counts, k))])
+        return csr_matrix(
+            (self.matrix.data[keep], self.matrix.indices[keep], indptr),
+            shape=self.matrix.shape
+        )
+
+
+class ColumnarAttributeStore:
+    """
+    ID 인덱스 정렬 컬럼형 속성 저장소
+    - 엔진의 id→index 매핑 순서대로 행을 정렬하고 속성별 NumPy 배열로 보관
+    - 매핑에 없는 ID(카탈로그에만 있는 차량 등)는 뒤에 이어 붙임
+    - 정수 인덱스로 O(1) 조회
+    """
+
+    def __init__(self, df: pd.DataFrame, id_column: str, ids: np.ndarray):
+        unique_df = df.drop_duplicates(id_column)
+        known = set(ids)
+        extra = unique_df[id_column][~unique_df[id_column].isin(known)].to_numpy(dtype=object)
+
+        self.ids = np.concatenate([np.asarray(ids, dtype=object), extra])
+        self.index = {item_id: idx for idx, item_id in enumerate(self.ids)}
+
+        aligned = unique_df.set_index(id_column).reindex(self.ids)
+        self.present = np.asarray(pd.Index(self.ids).isin(unique_df[id_column]))
+        self.columns = {column: aligned[column].to_numpy() for column in aligned.columns}
+        self.id_column = id_column
+
+    def __len__(self):
+        return len(self.ids)
+
+    def column(self, name: str) -> np.ndarray:
+        """속성 컬럼 배열 (행 인덱스 정렬)"""
+        return self.columns[name]
+
+    def lookup(self, item_id) -> int:
+        """ID → 행 인덱스 (없으면 -1)"""
+        return self.index.get(item_id, -1)
+
+    def row(self, idx: int) -> Optional[Dict]:
+        """행 인덱스의 속성 딕셔너리 (없으면 None)"""
+        if idx < 0 or not self.present[idx]:
+            return None
+
+        values = {self.id_column: self.ids[idx]}
+        for name, column in self.columns.items():
+            value = column[idx]
+            values[name] = value.item() if isinstance(value, np.generic) else value
+        return values
+
+
+class CandidateIndex:
+    """
+    가격 정렬 후보 생성 인덱스
+    - 점수 계산 전에 예산/연료/차종 조건으로 후보 차량 집합을 제한
+    - 예산 범위는 가격 정렬 배열에서 searchsorted로 O(log N) 슬라이스
+    - 연료/차종 조건은 잘린 슬라이스에만 적용
+    """
+
+    def __init__(self, price: np.ndarray, fuel_type: np.ndarray, body_type: np.ndarray, valid: np.ndarray):
+        price = np.asarray(price, dtype=np.float64)
+        self.valid_rows = np.flatnonzero(valid)
+
+        # 가격이 없는 차량은 예산 조건이 있으면 제외
+        priced = self.valid_rows[~np.isnan(price[self.valid_rows])]
+        self.price_order = priced[np.argsort(price[priced], kind='stable')]
+        self.sorted_prices = price[self.price_order]
+
+        self.fuel_type = np.asarray(fuel_type, dtype=object)
+        self.body_type = np.asarray(body_type, dtype=object)
+
+    def select(self, budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+               fuel_types: Optional[List[str]] = None, body_types: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """조건을 만족하는 차량 인덱스 (오름차순), 조건이 하나도 없으면 None (전체 카탈로그)"""
+        if budget_min is None and budget_max is None and not fuel_types and not body_types:
+            return None
+
+        if budget_min is None and budget_max is None:
+            candidates = self.valid_rows
+        else:
+            lo = 0 if budget_min is None else np.searchsorted(self.sorted_prices, budget_min, side='left')
+            hi = len(self.sorted_prices) if budget_max is None else np.searchsorted(self.sorted_prices, budget_max, side='right')
+            candidates = np.sort(self.price_order[lo:hi])
+
+        if fuel_types:
+            candidates = candidates[np.isin(self.fuel_type[candidates], list(fuel_types))]
+        if body_types:
+            candidates = candidates[np.isin(self.body_type[candidates], list(body_types))]
+
+        return candidates
+
+
+def _positions_in(sorted_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """오름차순 정렬된 sorted_ids 안에서 values의 위치 (없으면 -1) - 후보 길이 기준 이진 탐색"""
+    values = np.asarray(values, dtype=np.int64)
+    if len(sorted_ids) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    positions = np.searchsorted(sorted_ids, values)
+    clipped = np.minimum(positions, len(sorted_ids) - 1)
+    return np.where((positions < len(sorted_ids)) & (sorted_ids[clipped] == values), positions, -1)
+
+
+def _top_k_rows(scores: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    행별 Top-K 열 (점수 내림차순, 동점은 열 번호 오름차순, 후보가 부족한 칸은 인덱스 -1 / 점수 NaN)
+    - argpartition은 경계 동점 중 어느 열을 남길지 정해져 있지 않으므로
+      경계값(n번째 점수)과 동점인 열이 남는 자리보다 많은 행만 열 번호가 작은 순으로 다시 고름
+    - 단건/배치/사전 계산 경로가 모두 이 규칙을 사용
+    """
+    n_rows, n_cols = scores.shape
+    n = min(n, n_cols)
+    if n <= 0:
+        return np.empty((n_rows, 0), dtype=np.int64), np.empty((n_rows, 0), dtype=np.float32)
+
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    kth = top_scores.min(axis=1)
+
+    # 경계 동점 열이 top에 들어간 개수보다 많은 행 (경계값이 -inf인 행은 어차피 빈 칸)
+    at_boundary = (scores == kth[:, None]).sum(axis=1)
+    overflow = np.flatnonzero((at_boundary > (top_scores == kth[:, None]).sum(axis=1)) & np.isfinite(kth))
+    for row in overflow:
+        row_scores = scores[row]
+        above = np.flatnonzero(row_scores > kth[row])
+        ties = np.flatnonzero(row_scores == kth[row])[:n - len(above)]
+        top[row] = np.concatenate([above, ties])
+        top_scores[row] = row_scores[top[row]]
+
+    order = np.lexsort((top, -top_scores), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    missing = ~np.isfinite(top_scores)
+    top[missing] = -1
+    top_scores[missing] = np.nan
+    return top, top_scores.astype(np.float32)
+
+
 class RealNCFEngine:
     """
     실제 데이터 기반 NCF 추천 엔진
@@ -29,8 +448,28 @@ class RealNCFEngine:
     - 실시간 추천 생성
     """
 
-    def __init__(self, data_path: str = "data/"):
+    def __init__(self, data_path: str = "data/", n_neighbors: int = 50,
+                 similarity_memory_mb: float = 256.0, artifact_path: Optional[str] = None,
+                 ann_threshold: int = 50000, ann_n_probe: int = 8, use_dataset_cache: bool = True,
+                 factorization: str = 'nmf', precompute_top_n: int = 0,
+                 artifact_version: Optional[str] = None, decay_half_life_days: Optional[float] = None,
+                 quantize_embeddings: bool = False):
         self.data_path = data_path
+        self.factorization = factorization  # 'nmf' (sklearn NMF) 또는 'als' (희소 Implicit ALS-CG)
+        self.als_model = None
+        self.use_dataset_cache = use_dataset_cache  # CSV를 바이너리 컬럼 캐시로 로드
+        self.ann_threshold = ann_threshold  # 차량 수가 이 이상이면 차량 이웃을 IVF 근사 검색으로 계산
+        self.ann_n_probe = ann_n_probe
+        self.quantize_embeddings = quantize_embeddings  # 차량 유사도 검색을 int8 코드 스캔 + 정확한 벡터 재순위로 수행
+        self.artifact_path = artifact_path
+        self.precompute_top_n = precompute_top_n  # > 0이면 훈련 후 사용자별 Top-N을 미리 계산해 서빙
+        # 상호작용 점수 시간 감쇠 (반감기, None이면 감쇠 없음)
+        self.decay_half_life_days = decay_half_life_days
+        self.decay_rate = np.log(2) / (decay_half_life_days * 86400.0) if decay_half_life_days else 0.0
+        self.decay_epoch = None   # 행렬 저장값이 정확한 기준 시각 (epoch 초)
+        self.decay_clock = None   # 현재 기준 시각 = 지금까지 본 가장 최근 상호작용 시각
+        self.n_neighbors = n_neighbors
+        self.similarity_memory_mb = similarity_memory_mb
         self.vehicles_df = None
         self.users_df = None
         self.interactions_df = None
@@ -39,28 +478,65 @@ class RealNCFEngine:
         self.user_item_matrix = None
         self.user_embeddings = None
         self.item_embeddings = None
-        self.user_similarity = None
-        self.item_similarity = None
+        self.user_neighbors = None
+        self.item_neighbors = None
+        self.item_ann = None
+        self.topn_store = None  # 사전 계산 Top-N 테이블
+        self.session_model = None  # 세션 동시 출현 모델 (함께 본 차량, 훈련/아티팩트 로드 시 구축)
+
+        # 인기도 (콜드 스타트용, 훈련 시 계산)
+        self.vehicle_popularity = None
+        self.popularity_order = None
 
         # ID 매핑
         self.user_to_idx = {}
         self.idx_to_user = {}
         self.vehicle_to_idx = {}
         self.idx_to_vehicle = {}
+        self.user_ids = None
+        self.vehicle_ids = None
+
+        # 속성 저장소 (인덱스 기반 조회)
+        self.user_store = None
+        self.vehicle_store = None
+        self.vehicle_flags = {}
+        self.candidate_index = None  # 예산/연료/차종 후보 생성 인덱스
 
         self.is_trained = False
+        self.artifact_version = None
 
-        # 모델 로드
+        # 모델 로드 (데이터가 바뀌지 않았으면 저장된 아티팩트 사용, 아니면 훈련 후 저장)
         self.load_data()
-        if self._check_data_available():
-            self.train_model()
+        if artifact_path and artifact_version:
+            # 버전을 지정한 경우 (모델 레지스트리 승격/롤백) - 명시적 선택이므로 데이터 지문은 확인하지 않음
+            if not self.load_artifacts(artifact_path, artifact_version, check_fingerprint=False):
+                raise ValueError(f"아티팩트 버전을 로드할 수 없습니다: {artifact_version}")
+            if precompute_top_n and self.topn_store is None:
+                self.precompute_recommendations(precompute_top_n)
+        elif self._check_data_available():
+            if not (artifact_path and self.load_artifacts(artifact_path)):
+                self.train_model()
+                if precompute_top_n:
+                    self.precompute_recommendations(precompute_top_n)
+                if artifact_path:
+                    self.save_artifacts(artifact_path)
+            elif precompute_top_n and self.topn_store is None:
+                self.precompute_recommendations(precompute_top_n)
 
     def load_data(self):
         """실제 생성된 데이터 로드"""
         try:
-            self.vehicles_df = pd.read_csv(f"{self.data_path}/ncf_vehicles.csv")
-            self.users_df = pd.read_csv(f"{self.data_path}/ncf_users.csv")
-            self.interactions_df = pd.read_csv(f"{self.data_path}/ncf_interactions.csv")
+            if self.use_dataset_cache:
+                self.vehicles_df = load_csv_cached(f"{self.data_path}/ncf_vehicles.csv")
+                self.users_df = load_csv_cached(f"{self.data_path}/ncf_users.csv")
+                self.interactions_df = load_csv_cached(f"{self.data_path}/ncf_interactions.csv", parse_dates=['timestamp'])
+            else:
+                self.vehicles_df = pd.read_csv(f"{self.data_path}/ncf_vehicles.csv")
+                self.users_df = pd.read_csv(f"{self.data_path}/ncf_users.csv")
+                self.interactions_df = pd.read_csv(f"{self.data_path}/ncf_interactions.csv", parse_dates=['timestamp'])
+
+            # 선호도는 로드 시 한 번만 파싱해 비트마스크로 보관
+            self.users_df['preference_mask'] = self.users_df['preferences'].map(_parse_preference_mask).astype(np.int64)
 
             print(f"데이터 로드 완료:")
             print(f"- 차량: {len(self.vehicles_df)}")
@@ -80,266 +556,731 @@ class RealNCFEngine:
 
     def _create_mappings(self):
         """사용자와 차량 ID 매핑 생성"""
-        users = self.interactions_df['user_id'].unique()
-        vehicles = self.interactions_df['vehicle_id'].unique()
+        self._set_mappings(
+            self.interactions_df['user_id'].unique(),
+            self.interactions_df['vehicle_id'].unique()
+        )
 
+    def _set_mappings(self, users: np.ndarray, vehicles: np.ndarray):
+        """인덱스 순서의 ID 배열로 양방향 매핑 설정"""
         self.user_to_idx = {user: idx for idx, user in enumerate(users)}
         self.idx_to_user = {idx: user for user, idx in self.user_to_idx.items()}
 
         self.vehicle_to_idx = {vehicle: idx for idx, vehicle in enumerate(vehicles)}
         self.idx_to_vehicle = {idx: vehicle for vehicle, idx in self.vehicle_to_idx.items()}
 
-    def _create_interaction_matrix(self):
-        """사용자-차량 상호작용 매트릭스 생성"""
-        n_users = len(self.user_to_idx)
-        n_vehicles = len(self.vehicle_to_idx)
-
-        # 암시적 피드백 점수 매핑 (NCF 논문 아이디어)
-        interaction_scores = {
-            'view': 1,
-            'like': 2,
-            'inquiry': 3,
-            'favorite': 4,
-            'purchase': 5
+        # 인덱스 → ID 벡터 조회용 배열
+        self.user_ids = np.asarray(users, dtype=object)
+        self.vehicle_ids = np.asarray(vehicles, dtype=object)
+
+    def _build_attribute_stores(self):
+        """ID 매핑 순서로 정렬된 사용자/차량 컬럼형 속성 저장소 생성"""
+        self.user_store = ColumnarAttributeStore(self.users_df, 'user_id', self.user_ids)
+        self.vehicle_store = ColumnarAttributeStore(self.vehicles_df, 'vehicle_id', self.vehicle_ids)
+
+        # 개인화/추천 이유에 쓰는 차량 그룹 플래그 (행 인덱스 정렬)
+        present = self.vehicle_store.present
+        brand = self.vehicle_store.column('brand')
+        self.vehicle_flags = {
+            'domestic': present & np.isin(brand, DOMESTIC_BRANDS),
+            'premium': present & np.isin(brand, PREMIUM_BRANDS),
+            'eco_fuel': present & np.isin(self.vehicle_store.column('fuel_type'), ECO_FUEL_TYPES),
+            'high_safety': present & (np.nan_to_num(self.vehicle_store.column('safety_rating').astype(np.float64)) >= 4.5)
         }
 
-        # 상호작용 매트릭스 생성
-        matrix = np.zeros((n_users, n_vehicles))
-
-        for _, interaction in self.interactions_df.iterrows():
-            user_idx = self.user_to_idx.get(interaction['user_id'])
-            vehicle_idx = self.vehicle_to_idx.get(interaction['vehicle_id'])
+        # 후보 생성 인덱스 (상호작용 행렬 열에 해당하는 차량만)
+        n_vehicles = len(self.vehicle_to_idx)
+        self.candidate_index = CandidateIndex(
+            self.vehicle_store.column('price')[:n_vehicles],
+            self.vehicle_store.column('fuel_type')[:n_vehicles],
+            self.vehicle_store.column('body_type')[:n_vehicles],
+            present[:n_vehicles]
+        )
 
-            if user_idx is not None and vehicle_idx is not None:
-                score = interaction_scores.get(interaction['interaction_type'], 1)
-                # 같은 사용자-차량 쌍에 여러 상호작용이 있으면 더 높은 점수 사용
-                matrix[user_idx, vehicle_idx] = max(matrix[user_idx, vehicle_idx], score)
+    def _create_interaction_matrix(self):
+        """사용자-차량 상호작용 매트릭스 생성 (CSR 희소 행렬)
 
-        return matrix
+        상호작용 타입을 점수로 벡터화 매핑한 뒤, (사용자, 차량) 쌍별 최대 점수를
+        groupby 한 번으로 구해 CSR 행렬을 바로 구성한다. 밀집 행렬을 만들지 않으므로
+        메모리는 상호작용 수에 비례한다.
+        """
+        n_users = len(self.user_to_idx)
+        n_vehicles = len(self.vehicle_to_idx)
 
-    def train_model(self):
-        """NCF 스타일 모델 훈련"""
+        user_idx = _map_values(self.interactions_df['user_id'], self.user_to_idx)
+        vehicle_idx = _map_values(self.interactions_df['vehicle_id'], self.vehicle_to_idx)
+        # 암시적 피드백 점수 매핑 (NCF 논문 아이디어), 알 수 없는 타입은 1점
+        scores = _map_values(self.interactions_df['interaction_type'], INTERACTION_SCORES, default=1)
+
+        valid = ~np.isnan(user_idx) & ~np.isnan(vehicle_idx)
+        if self.decay_rate:
+            # 가장 최근 상호작용 시각을 기준(epoch)으로 감쇠 - 이 시점의 전역 감쇠 계수는 1
+            seconds = self._event_seconds(self.interactions_df['timestamp'])[valid]
+            self.decay_clock = self.decay_epoch = float(seconds.max()) if len(seconds) else 0.0
+            scores[valid] = self._decayed_weights(scores[valid], seconds)
+
+        pairs = pd.DataFrame({
+            'user_idx': user_idx[valid].astype(np.int64),
+            'vehicle_idx': vehicle_idx[valid].astype(np.int64),
+            'score': scores[valid].astype(np.float32)
+        })
+
+        # 같은 사용자-차량 쌍에 여러 상호작용이 있으면 더 높은 점수 사용 (감쇠 적용 시 감쇠 후 점수 기준)
+        pair_scores = pairs.groupby(['user_idx', 'vehicle_idx'], sort=True)['score'].max()
+
+        rows = pair_scores.index.get_level_values('user_idx').to_numpy()
+        cols = pair_scores.index.get_level_values('vehicle_idx').to_numpy()
+
+        return csr_matrix(
+            (pair_scores.to_numpy(dtype=np.float32), (rows, cols)),
+            shape=(n_users, n_vehicles)
+        )
+
+    @property
+    def decay_factor(self) -> float:
+        """행렬 저장값 → 현재 기준 시각의 값 배수 exp(-λ(clock - epoch)) (감쇠 미사용 시 1.0)"""
+        if not self.decay_rate or self.decay_epoch is None:
+            return 1.0
+        return float(np.exp(-self.decay_rate * (self.decay_clock - self.decay_epoch)))
+
+    @staticmethod
+    def _event_seconds(timestamps) -> np.ndarray:
+        """timestamp 값 → epoch 초 (float64, 결측/파싱 실패는 현재 시각)"""
+        values = pd.to_datetime(pd.Series(timestamps), errors='coerce').to_numpy(dtype='datetime64[ns]')
+        values = np.where(np.isnat(values), np.datetime64(datetime.now(), 'ns'), values)
+        return values.astype(np.int64) / 1e9
+
+    def _decayed_weights(self, scores: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+        """점수 → 현재 epoch 기준 저장값 score · exp(λ(t - epoch))"""
+        return scores * np.exp(self.decay_rate * (seconds - self.decay_epoch))
+
+    def _advance_decay_clock(self, latest: float):
+        """
+        기준 시각을 앞으로 이동 (전역 감쇠 계수만 바뀌고 저장값은 그대로)
+        - 부풀림 배수가 DECAY_RESCALE_THRESHOLD를 넘으면 저장값 전체를 한 번 재조정 (epoch 이동)
+        """
+        self.decay_clock = max(self.decay_clock, latest)
+        if np.exp(self.decay_rate * (self.decay_clock - self.decay_epoch)) > DECAY_RESCALE_THRESHOLD:
+            matrix = self.user_item_matrix
+            self.user_item_matrix = csr_matrix(
+                ((matrix.data * self.decay_factor).astype(np.float32), matrix.indices, matrix.indptr),
+                shape=matrix.shape
+            )
+            self.decay_epoch = self.decay_clock
+
+    def _user_interactions(self, user_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR 행에서 사용자가 상호작용한 차량 인덱스와 점수 반환"""
+        start, end = self.user_item_matrix.indptr[user_idx], self.user_item_matrix.indptr[user_idx + 1]
+        return self.user_item_matrix.indices[start:end], self.user_item_matrix.data[start:end]
+
+    def train_model(self, factorization: Optional[str] = None):
+        """
+        NCF 스타일 모델 훈련
+        - factorization: 'nmf' 또는 'als' (생략 시 생성자 설정 사용)
+        """
         if not self._check_data_available():
             print("데이터가 없어서 모델 훈련을 건너뜁니다.")
             return False
 
         print("NCF 기반 추천 모델 훈련 시작...")
+        self.topn_store = None  # 이전 모델 기준 사전 계산 결과 폐기
 
-        # 1. ID 매핑 생성
+        # 1. ID 매핑 및 속성 저장소 생성
         self._create_mappings()
+        self._build_attribute_stores()
 
         # 2. 상호작용 매트릭스 생성
         self.user_item_matrix = self._create_interaction_matrix()
 
         # 3. Matrix Factorization (NCF의 GMF 컴포넌트)
         n_factors = 50
-        nmf = NMF(n_components=n_factors, random_state=42, max_iter=200)
+        self.factorization = factorization or self.factorization
+
+        if self.factorization == 'als':
+            # 희소 행렬 위에서 신뢰도 가중 ALS-CG로 임베딩 생성
+            self.als_model = ImplicitALS(n_factors=n_factors).fit(self.user_item_matrix)
+            user_factors = self.als_model.user_factors
+            item_factors = self.als_model.item_factors
+        else:
+            nmf = NMF(n_components=n_factors, random_state=42, max_iter=200)
 
-        # NMF로 사용자와 아이템 임베딩 생성
-        user_factors = nmf.fit_transform(self.user_item_matrix)
-        item_factors = nmf.components_.T
+            # NMF로 사용자와 아이템 임베딩 생성
+            user_factors = nmf.fit_transform(self.user_item_matrix)
+            item_factors = nmf.components_.T
 
         self.user_embeddings = user_factors
         self.item_embeddings = item_factors
 
-        # 4. 사용자 및 아이템 유사도 계산 (협업 필터링)
-        self.user_similarity = cosine_similarity(user_factors)
-        self.item_similarity = cosine_similarity(item_factors)
+        # 4. 사용자 및 아이템 Top-k 이웃 계산 (협업 필터링)
+        self.user_neighbors = TopKNeighborIndex(self.n_neighbors, self.similarity_memory_mb).build(user_factors)
+        self.item_ann = None
+        item_neighbors = TopKNeighborIndex(self.n_neighbors, self.similarity_memory_mb, quantize=self.quantize_embeddings)
+        if len(self.vehicle_to_idx) >= self.ann_threshold:
+            self.item_neighbors = item_neighbors.build_approximate(item_factors, self._get_item_ann())
+        else:
+            self.item_neighbors = item_neighbors.build(item_factors)
+
+        # 5. 인기도 랭킹 사전 계산 (콜드 스타트)
+        self._compute_popularity()
+
+        # 6. 세션 동시 출현 모델 (함께 본 차량)
+        self._build_session_model()
 
         self.is_trained = True
 
         print("NCF 기반 모델 훈련 완료!")
         print(f"- 사용자 임베딩: {self.user_embeddings.shape}")
         print(f"- 차량 임베딩: {self.item_embeddings.shape}")
-        print(f"- 매트릭스 밀도: {np.count_nonzero(self.user_item_matrix) / self.user_item_matrix.size:.3f}")
+        print(f"- 이웃 수 (k): {self.user_neighbors.k}")
+        n_cells = self.user_item_matrix.shape[0] * self.user_item_matrix.shape[1]
+        print(f"- 매트릭스 밀도: {self.user_item_matrix.nnz / max(n_cells, 1):.3f}")
 
         return True
 
-    def get_user_based_recommendations(self, target_user_id: str, n_recommendations: int = 10):
-        """사용자 기반 협업 필터링 추천"""
+    def apply_interactions(self, batch) -> Dict:
+        """
+        새 상호작용을 재훈련 없이 반영 (fold-in)
+        - batch: user_id, vehicle_id, interaction_type 컬럼의 DataFrame 또는 dict 리스트
+        - 사용자-차량 행렬을 갱신하고, 영향받은 사용자 임베딩만 고정된 차량 임베딩에 대해 재계산
+        - 해당 사용자들의 이웃 리스트와 인기도만 갱신
+        - 학습된 적 없는 차량은 임베딩이 없으므로 건너뜀 (다음 train_model에서 반영)
+        """
+        batch = pd.DataFrame(batch)
+        if not self.is_trained or batch.empty:
+            return {'applied': 0, 'skipped': 0, 'new_users': 0, 'updated_users': 0}
+
+        known_vehicle = batch['vehicle_id'].isin(self.vehicle_to_idx)
+        skipped = int((~known_vehicle).sum())
+        batch = batch[known_vehicle]
+
+        # 신규 사용자 매핑 추가
+        new_users = pd.unique(batch.loc[~batch['user_id'].isin(self.user_to_idx), 'user_id'])
+        if len(new_users) > 0:
+            self._set_mappings(np.concatenate([self.user_ids, np.asarray(new_users, dtype=object)]), self.vehicle_ids)
+            # 사용자 속성 저장소도 새 매핑 순서로 재구성 (users_df에 프로필이 없으면 present=False)
+            self.user_store = ColumnarAttributeStore(self.users_df, 'user_id', self.user_ids)
+
+        n_users, n_vehicles = len(self.user_ids), len(self.vehicle_ids)
+        user_idx = _map_values(batch['user_id'], self.user_to_idx).astype(np.int64)
+        vehicle_idx = _map_values(batch['vehicle_id'], self.vehicle_to_idx).astype(np.int64)
+        scores = _map_values(batch['interaction_type'], INTERACTION_SCORES, default=1).astype(np.float32)
+
+        # 시간 감쇠 - 기준 시각만 이동하고 새 이벤트만 epoch 기준 값으로 변환 (기존 항목은 그대로)
+        if self.decay_rate and self.decay_epoch is not None and len(batch) > 0:
+            seconds = self._event_seconds(batch['timestamp'] if 'timestamp' in batch else [None] * len(batch))
+            self._advance_decay_clock(float(seconds.max()))
+            scores = self._decayed_weights(scores, seconds).astype(np.float32)
+
+        # 1. 상호작용 행렬 갱신 (같은 쌍은 최대 점수 유지)
+        delta = pd.DataFrame({'u': user_idx, 'v': vehicle_idx, 's': scores}).groupby(['u', 'v'])['s'].max()
+        delta_matrix = csr_matrix(
+            (delta.to_numpy(), (delta.index.get_level_values('u'), delta.index.get_level_values('v'))),
+            shape=(n_users, n_vehicles)
+        )
+        matrix = self.user_item_matrix
+        if matrix.shape[0] < n_users:
+            matrix = csr_matrix(
+                (matrix.data, matrix.indices, np.concatenate([matrix.indptr, np.full(n_users - matrix.shape[0], matrix.nnz)])),
+                shape=(n_users, n_vehicles)
+            )
+        self.user_item_matrix = matrix.maximum(delta_matrix).tocsr().astype(np.float32)
+
+        # 2. 영향받은 사용자 임베딩 재계산 (차량 임베딩 고정)
+        affected = np.unique(user_idx)
+        user_embeddings = np.zeros((n_users, self.item_embeddings.shape[1]), dtype=self.user_embeddings.dtype)
+        user_embeddings[:self.user_embeddings.shape[0]] = self.user_embeddings
+        user_embeddings[affected] = self._fold_in_users(affected)
+        self.user_embeddings = user_embeddings
+
+        # 3. 해당 사용자 이웃 리스트와 인기도 갱신, 사전 계산 Top-N은 stale 처리
+        self.user_neighbors.update_rows(self.user_embeddings, affected)
+        self.update_popularity(batch)
+        if self.topn_store is not None:
+            self.topn_store.invalidate(affected)
+        if 'session_id' in batch and len(batch) > 0:
+            self.session_model.update(batch)
+
+        return {
+            'applied': len(batch),
+            'skipped': skipped,
+            'new_users': len(new_users),
+            'updated_users': len(affected)
+        }
+
+    def _fold_in_users(self, user_idx: np.ndarray) -> np.ndarray:
+        """
+        고정된 차량 임베딩에 대해 사용자 임베딩 재계산
+        - ALS: 신뢰도 가중 정규방정식을 CG로 풀이
+        - NMF: 아래 NNLS
+        """
+        if self.factorization == 'als':
+            als = self.als_model or ImplicitALS(n_factors=self.item_embeddings.shape[1])
+            return als.recalculate_users(self.user_item_matrix[user_idx] * self.decay_factor, self.item_embeddings)
+
+        return self._fold_in_users_nnls(user_idx)
+
+    def _fold_in_users_nnls(self, user_idx: np.ndarray) -> np.ndarray:
+        """
+        고정된 차량 임베딩 H에 대해 사용자 임베딩 w ≥ 0 재계산
+        min ||r - wHᵀ||² = min ||Lᵀw - L⁻¹(Hᵀr)||² (G = HᵀH = LLᵀ) → 요인 수 차원의 NNLS
+        """
+        item_factors = np.asarray(self.item_embeddings, dtype=np.float64)
+        gram = item_factors.T @ item_factors
+        gram[np.diag_indices_from(gram)] += 1e-8  # 수치 안정성
+        lower = cholesky(gram, lower=True)
+
+        rhs = np.asarray(self.user_item_matrix[user_idx] @ item_factors) * self.decay_factor
+        embeddings = np.empty((len(user_idx), item_factors.shape[1]), dtype=np.float64)
+        for i, b in enumerate(rhs):
+            embeddings[i], _ = nnls(lower.T, solve_triangular(lower, b, lower=True))
+
+        return embeddings
+
+    def _data_fingerprint(self) -> Dict:
+        """원본 CSV 파일 크기/수정시각 (아티팩트가 현재 데이터로 훈련됐는지 확인용)"""
+        fingerprint = {}
+        for name in ['ncf_vehicles.csv', 'ncf_users.csv', 'ncf_interactions.csv']:
+            stat = os.stat(os.path.join(self.data_path, name))
+            fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+        return fingerprint
+
+    def _training_config(self) -> Dict:
+        """아티팩트 내용에 영향을 주는 훈련 설정 (현재 설정과 다르면 저장된 아티팩트를 쓰지 않고 재훈련)"""
+        return {'factorization': self.factorization, 'decay_half_life_days': self.decay_half_life_days,
+                'n_neighbors': self.n_neighbors, 'quantize_embeddings': self.quantize_embeddings}
+
+    def save_artifacts(self, artifact_path: str) -> Optional[str]:
+        """
+        훈련된 상태를 버전 디렉토리로 저장
+        - {artifact_path}/{version}/*.npy + manifest.json
+        - 임시 디렉토리에 쓴 뒤 rename, LATEST 포인터도 원자적으로 교체
+        Returns: 저장된 버전 이름 (훈련 전이면 None)
+        """
         if not self.is_trained:
-            return self._fallback_recommendations(n_recommendations)
+            return None
 
-        if target_user_id not in self.user_to_idx:
-            # 새로운 사용자 - 인기도 기반 추천
-            return self._popularity_based_recommendations(n_recommendations)
+        version = datetime.now().strftime('v%Y%m%d%H%M%S%f')
+        version_dir = os.path.join(artifact_path, version)
+        tmp_dir = version_dir + '.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        arrays = {
+            'user_embeddings': self.user_embeddings,
+            'item_embeddings': self.item_embeddings,
+            'user_ids': np.asarray(self.user_ids, dtype=str),
+            'vehicle_ids': np.asarray(self.vehicle_ids, dtype=str),
+            'vehicle_popularity': self.vehicle_popularity,
+            'popularity_order': self.popularity_order
+        }
+        for prefix, matrix in [('interactions', self.user_item_matrix),
+                               ('user_neighbors', self.user_neighbors.matrix),
+                               ('item_neighbors', self.item_neighbors.matrix)]:
+            arrays[f'{prefix}_data'] = matrix.data
+            arrays[f'{prefix}_indices'] = matrix.indices
+            arrays[f'{prefix}_indptr'] = matrix.indptr
+
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), np.asarray(array))
+        if self.topn_store is not None:
+            self.topn_store.save(os.path.join(tmp_dir, 'topn'))
+
+        manifest = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'data_fingerprint': self._data_fingerprint(),
+            'training_config': self._training_config(),
+            'n_neighbors': self.user_neighbors.k,
+            'factorization': self.factorization,
+            'decay': {'half_life_days': self.decay_half_life_days, 'epoch': self.decay_epoch, 'clock': self.decay_clock},
+            'n_users': len(self.user_ids),
+            'n_vehicles': len(self.vehicle_ids)
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.rename(tmp_dir, version_dir)
+
+        latest_tmp = os.path.join(artifact_path, 'LATEST.tmp')
+        with open(latest_tmp, 'w') as f:
+            f.write(version)
+        os.replace(latest_tmp, os.path.join(artifact_path, 'LATEST'))
+        self.artifact_version = version
+
+        print(f"모델 아티팩트 저장 완료: {version_dir}")
+        return version
+
+    def load_artifacts(self, artifact_path: str, version: Optional[str] = None,
+                       check_fingerprint: bool = True) -> bool:
+        """
+        저장된 아티팩트 로드 (재훈련 없이 서빙)
+        - 배열은 np.load(mmap_mode='r')로 매핑해 즉시 로드, fork된 워커는 페이지 공유
+        - 포맷 버전, 데이터 지문 또는 훈련 설정이 다르면 False 반환
+        - check_fingerprint=False (버전 명시)이면 지문/설정을 확인하지 않고 저장 당시 설정으로 서빙
+        - 아티팩트가 없거나 손상됐으면(잘린 manifest, 누락/잘린 .npy, 누락된 키) False 반환 → 재훈련
+        """
+        try:
+            return self._load_artifacts(artifact_path, version, check_fingerprint)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError) as e:  # json.JSONDecodeError는 ValueError
+            print(f"아티팩트가 손상되어 사용하지 않습니다 ({type(e).__name__}): {e}")
+            return False
 
-        user_idx = self.user_to_idx[target_user_id]
+    def _load_artifacts(self, artifact_path: str, version: Optional[str], check_fingerprint: bool) -> bool:
+        """load_artifacts 본체 - 모든 배열을 읽은 뒤에만 엔진 상태를 교체 (도중 실패 시 기존 상태 유지)"""
+        if version is None:
+            with open(os.path.join(artifact_path, 'LATEST')) as f:
+                version = f.read().strip()
+        version_dir = os.path.join(artifact_path, version)
 
-        # 유사한 사용자 찾기
-        user_similarities = self.user_similarity[user_idx]
-        similar_users = np.argsort(user_similarities)[::-1][1:11]  # Top 10 similar users
+        with open(os.path.join(version_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
 
-        # 유사한 사용자들이 선호하는 차량 추천
-        recommendations = []
-        target_user_interactions = set(np.where(self.user_item_matrix[user_idx] > 0)[0])
+        if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            print(f"아티팩트 포맷 버전 불일치: {manifest.get('format_version')}")
+            return False
+        if check_fingerprint and manifest.get('data_fingerprint') != self._data_fingerprint():
+            print("데이터가 변경되어 저장된 아티팩트를 사용하지 않습니다.")
+            return False
+        if check_fingerprint and manifest.get('training_config') != self._training_config():
+            print(f"훈련 설정이 아티팩트와 달라 저장된 아티팩트를 사용하지 않습니다: {manifest.get('training_config')}")
+            return False
 
-        vehicle_scores = {}
+        def load(name):
+            return np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode='r')
+
+        def load_csr(prefix, shape):
+            return csr_matrix((load(f'{prefix}_data'), load(f'{prefix}_indices'), load(f'{prefix}_indptr')), shape=shape)
+
+        user_ids = load('user_ids').astype(object)
+        vehicle_ids = load('vehicle_ids').astype(object)
+        n_users, n_vehicles = len(user_ids), len(vehicle_ids)
+        n_neighbors = manifest['n_neighbors']
+        arrays = {
+            'user_embeddings': load('user_embeddings'),
+            'item_embeddings': load('item_embeddings'),
+            'user_item_matrix': load_csr('interactions', (n_users, n_vehicles)),
+            'user_neighbors': TopKNeighborIndex.from_matrix(load_csr('user_neighbors', (n_users, n_users)), n_neighbors),
+            'item_neighbors': TopKNeighborIndex.from_matrix(load_csr('item_neighbors', (n_vehicles, n_vehicles)), n_neighbors),
+            'vehicle_popularity': load('vehicle_popularity'),
+            'popularity_order': load('popularity_order'),
+            'topn_store': TopNStore.load(os.path.join(version_dir, 'topn'))
+        }
 
-        for similar_user_idx in similar_users:
-            similarity_score = user_similarities[similar_user_idx]
-            user_interactions = np.where(self.user_item_matrix[similar_user_idx] > 0)[0]
+        self._set_mappings(user_ids, vehicle_ids)
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self.factorization = manifest.get('factorization', 'nmf')
+        decay = manifest.get('decay', {})
+        if decay.get('half_life_days') != self.decay_half_life_days:
+            print("버전을 지정해 로드하므로 아티팩트의 시간 감쇠 설정을 사용합니다.")
+            self.decay_half_life_days = decay.get('half_life_days')
+            self.decay_rate = np.log(2) / (self.decay_half_life_days * 86400.0) if self.decay_half_life_days else 0.0
+        self.decay_epoch, self.decay_clock = decay.get('epoch'), decay.get('clock')
+        if n_neighbors != self.n_neighbors:
+            print("버전을 지정해 로드하므로 아티팩트의 이웃 수(k) 설정을 사용합니다.")
+            self.n_neighbors = n_neighbors
+        self.item_ann = None
+
+        self._build_attribute_stores()
+        self._build_session_model()
+        self.artifact_version = version
+        self.is_trained = True
 
-            for vehicle_idx in user_interactions:
-                if vehicle_idx not in target_user_interactions:
-                    vehicle_id = self.idx_to_vehicle[vehicle_idx]
-                    interaction_score = self.user_item_matrix[similar_user_idx, vehicle_idx]
+        print(f"모델 아티팩트 로드 완료: {version_dir}")
+        return True
 
-                    if vehicle_id not in vehicle_scores:
-                        vehicle_scores[vehicle_id] = 0
+    def prune_artifacts(self, artifact_path: str, keep: int = 3):
+        """최근 keep개 버전만 남기고 오래된 아티팩트 삭제 (LATEST 버전은 항상 유지)"""
+        with open(os.path.join(artifact_path, 'LATEST')) as f:
+            latest = f.read().strip()
+
+        versions = sorted(
+            name for name in os.listdir(artifact_path)
+            if name.startswith('v') and os.path.isdir(os.path.join(artifact_path, name))
+        )
+        for name in versions[:-keep]:
+            if name != latest:
+                shutil.rmtree(os.path.join(artifact_path, name))
+
+    def select_candidates(self, budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+                          fuel_types: Optional[List[str]] = None,
+                          body_types: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """
+        후보 생성 단계: 조건을 만족하는 차량 인덱스 (None이면 전체 카탈로그)
+        - 추천 함수의 eligible 인자로 넘기면 이 후보만 점수 계산/정렬
+        """
+        if self.candidate_index is None:
+            return None
+        return self.candidate_index.select(budget_min, budget_max, fuel_types, body_types)
+
+    def _select_for_request(self, user_dict: Dict) -> Optional[np.ndarray]:
+        """요청 dict의 budget_min/budget_max/fuel_types/body_types로 후보 선택"""
+        return self.select_candidates(
+            user_dict.get('budget_min'), user_dict.get('budget_max'),
+            user_dict.get('fuel_types'), user_dict.get('body_types')
+        )
+
+    def get_user_based_recommendations(self, target_user_id: str, n_recommendations: int = 10,
+                                       eligible: Optional[np.ndarray] = None):
+        """사용자 기반 협업 필터링 추천 (eligible: select_candidates 결과로 후보 제한)"""
+        if not self.is_trained:
+            return self._fallback_recommendations(n_recommendations)
 
-                    vehicle_scores[vehicle_id] += similarity_score * interaction_score
+        if target_user_id not in self.user_to_idx:
+            # 새로운 사용자 - 인기도 기반 추천
+            return self._popularity_based_recommendations(n_recommendations, eligible)
 
-        # 점수별 정렬
-        sorted_recommendations = sorted(vehicle_scores.items(), key=lambda x: x[1], reverse=True)
+        user_idx = self.user_to_idx[target_user_id]
+        candidates, scores = self._user_based_scores(user_idx, eligible)
 
-        return self._format_recommendations(sorted_recommendations[:n_recommendations], "User-Based CF")
+        return self._format_recommendations(
+            *self._top_k(candidates, scores, n_recommendations), "User-Based CF"
+        )
 
-    def get_item_based_recommendations(self, target_user_id: str, n_recommendations: int = 10):
-        """아이템 기반 협업 필터링 추천"""
+    def get_item_based_recommendations(self, target_user_id: str, n_recommendations: int = 10,
+                                       eligible: Optional[np.ndarray] = None):
+        """아이템 기반 협업 필터링 추천 (eligible: select_candidates 결과로 후보 제한)"""
         if not self.is_trained:
             return self._fallback_recommendations(n_recommendations)
 
         if target_user_id not in self.user_to_idx:
-            return self._popularity_based_recommendations(n_recommendations)
+            return self._popularity_based_recommendations(n_recommendations, eligible)
 
         user_idx = self.user_to_idx[target_user_id]
-        user_interactions = np.where(self.user_item_matrix[user_idx] > 0)[0]
+        user_interactions, _ = self._user_interactions(user_idx)
 
         if len(user_interactions) == 0:
+            return self._popularity_based_recommendations(n_recommendations, eligible)
+
+        candidates, scores = self._item_based_scores(user_idx, eligible)
+
+        return self._format_recommendations(
+            *self._top_k(candidates, scores, n_recommendations), "Item-Based CF"
+        )
+
+    def _get_item_ann(self) -> IVFIndex:
+        """차량 임베딩 IVF 인덱스 (최초 사용 시 구축, ids = 차량 인덱스)"""
+        if self.item_ann is None:
+            self.item_ann = IVFIndex(n_probe=self.ann_n_probe, quantize=self.quantize_embeddings).build(
+                np.asarray(self.item_embeddings)
+            )
+        return self.item_ann
+
+    def get_similar_vehicles(self, vehicle_id: str, n_recommendations: int = 10,
+                             n_probe: Optional[int] = None):
+        """임베딩 공간에서 가장 가까운 차량 (차량 상세 페이지 '비슷한 차량')"""
+        if not self.is_trained or vehicle_id not in self.vehicle_to_idx:
             return self._popularity_based_recommendations(n_recommendations)
 
-        # 사용자가 상호작용한 차량과 유사한 차량 추천
-        vehicle_scores = {}
+        vehicle_idx = self.vehicle_to_idx[vehicle_id]
+        similar, similarities = self._get_item_ann().query(
+            self.item_embeddings[vehicle_idx], n_recommendations, n_probe, exclude=[vehicle_idx]
+        )
 
-        for interacted_vehicle_idx in user_interactions:
-            similarities = self.item_similarity[interacted_vehicle_idx]
-            user_score = self.user_item_matrix[user_idx, interacted_vehicle_idx]
+        return self._format_recommendations(similar, similarities, "Similar Vehicles")
 
-            for vehicle_idx, similarity in enumerate(similarities):
-                if vehicle_idx not in user_interactions:
-                    vehicle_id = self.idx_to_vehicle[vehicle_idx]
+    def _build_session_model(self):
+        """세션 동시 출현 모델 구축 (상호작용 로그의 session_id, 이후 apply_interactions로 증분 갱신)"""
+        self.session_model = SessionCooccurrenceModel()
+        if self.interactions_df is not None and 'session_id' in self.interactions_df:
+            self.session_model.update(self.interactions_df)
 
-                    if vehicle_id not in vehicle_scores:
-                        vehicle_scores[vehicle_id] = 0
-
-                    vehicle_scores[vehicle_id] += similarity * user_score
-
-        sorted_recommendations = sorted(vehicle_scores.items(), key=lambda x: x[1], reverse=True)
-
-        return self._format_recommendations(sorted_recommendations[:n_recommendations], "Item-Based CF")
+    def get_also_viewed(self, vehicle_id: str, n_recommendations: int = 10):
+        """같은 세션에서 함께 조회된 차량 (차량 상세 페이지 '이 차를 본 사람들이 함께 본 차량')"""
+        if not self.is_trained:
+            return self._popularity_based_recommendations(n_recommendations)
 
-    def get_hybrid_recommendations(self, target_user_id: str, n_recommendations: int = 10):
-        """하이브리드 추천 (NCF 스타일)"""
+        also_viewed, counts = self.session_model.also_viewed(vehicle_id, n_recommendations)
+        vehicle_idx = _map_values(pd.Series(also_viewed, dtype=object), self.vehicle_to_idx)
+        known = ~np.isnan(vehicle_idx)
+        if not known.any():
+            return self.get_similar_vehicles(vehicle_id, n_recommendations)
+
+        # 점수 = 동시 출현 횟수 / 최다 횟수
+        counts = counts[known]
+        return self._format_recommendations(vehicle_idx[known].astype(np.int64), counts / counts.max(), "Also Viewed")
+
+    def _user_based_scores(self, user_idx: int, eligible: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """사용자 기반 CF 후보 점수 (희소 행렬-벡터 곱)
+
+        상위 N_SIMILAR_USERS명 이웃의 유사도를 가중치로 이웃들의 상호작용 행을 합산한다.
+        반환값은 점수가 정의된 후보 차량 인덱스와 점수이며, 이미 본 차량은 제외된다.
+        """
+        similar_users, similarities = self.user_neighbors.neighbors(user_idx)
+        similar_users, similarities = similar_users[:N_SIMILAR_USERS], similarities[:N_SIMILAR_USERS]
+
+        weights = csr_matrix(
+            (similarities, (np.zeros(len(similar_users), dtype=np.int32), np.arange(len(similar_users)))),
+            shape=(1, len(similar_users))
+        )
+        score_vector = (weights @ self.user_item_matrix[similar_users]).tocsr()
+
+        return self._exclude_seen(user_idx, score_vector.indices, score_vector.data * self.decay_factor, eligible)
+
+    def _item_based_scores(self, user_idx: int, eligible: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """아이템 기반 CF 후보 점수 (사용자 행 × 차량 이웃 행렬)"""
+        score_vector = (self.user_item_matrix[user_idx] @ self.item_neighbors.matrix).tocsr()
+
+        return self._exclude_seen(user_idx, score_vector.indices, score_vector.data * self.decay_factor, eligible)
+
+    def _exclude_seen(self, user_idx: int, candidates: np.ndarray, scores: np.ndarray,
+                      eligible: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        사용자가 이미 상호작용한 차량 (및 eligible 밖의 차량) 제외
+        - 점수가 있는 후보만 검사 (차량 수 길이 마스크 없이 eligible 이진 탐색)
+        """
+        keep = ~np.isin(candidates, self._user_interactions(user_idx)[0])
+        if eligible is not None:
+            keep &= _positions_in(eligible, candidates) >= 0
+
+        return candidates[keep], scores[keep]
+
+    def _top_k(self, candidates: np.ndarray, scores: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-K 선택 → (차량 인덱스, 점수) (점수 내림차순, 동점은 차량 인덱스 오름차순 - _top_k_rows와 같은 규칙)"""
+        if min(n, len(candidates)) <= 0:
+            return candidates[:0], scores[:0]
+
+        order = np.argsort(candidates, kind='stable')
+        top, _ = _top_k_rows(np.asarray(scores)[order][None, :], n)
+        top = order[top[0][top[0] >= 0]]
+
+        return candidates[top], scores[top]
+
+    def get_hybrid_recommendations(self, target_user_id: str, n_recommendations: int = 10,
+                                   eligible: Optional[np.ndarray] = None):
+        """하이브리드 추천 (NCF 스타일, eligible: select_candidates 결과로 후보 제한)"""
         if not self.is_trained:
             return self._fallback_recommendations(n_recommendations)
 
-        # 사용자 기반 + 아이템 기반 결합
-        user_based = self.get_user_based_recommendations(target_user_id, n_recommendations * 2)
-        item_based = self.get_item_based_recommendations(target_user_id, n_recommendations * 2)
+        # 사용자 기반 + 아이템 기반 결합 (후보 제한은 점수 계산 단계에서 적용)
+        user_based = self.get_user_based_recommendations(target_user_id, n_recommendations * 2, eligible)
+        item_based = self.get_item_based_recommendations(target_user_id, n_recommendations * 2, eligible)
 
-        # 점수 결합 (가중 평균)
+        # 점수 결합 (가중 평균) - 차량 인덱스 기준 (dict 순서: 사용자 기반 → 아이템 기반)
         combined_scores = {}
 
         for rec in user_based:
-            vehicle_id = rec['vehicle_id']
-            combined_scores[vehicle_id] = rec['score'] * 0.6  # User-based 가중치 60%
+            vehicle_idx = self.vehicle_store.lookup(rec['vehicle_id'])
+            combined_scores[vehicle_idx] = rec['score'] * 0.6  # User-based 가중치 60%
 
         for rec in item_based:
-            vehicle_id = rec['vehicle_id']
-            if vehicle_id in combined_scores:
-                combined_scores[vehicle_id] += rec['score'] * 0.4  # Item-based 가중치 40%
+            vehicle_idx = self.vehicle_store.lookup(rec['vehicle_id'])
+            if vehicle_idx in combined_scores:
+                combined_scores[vehicle_idx] += rec['score'] * 0.4  # Item-based 가중치 40%
             else:
-                combined_scores[vehicle_id] = rec['score'] * 0.4
+                combined_scores[vehicle_idx] = rec['score'] * 0.4
 
-        # 개인화 점수 추가 (사용자 프로필 기반)
-        user_profile = self._get_user_profile(target_user_id)
-        if user_profile is not None:
-            for vehicle_id in combined_scores:
-                vehicle_info = self._get_vehicle_info(vehicle_id)
-                if vehicle_info is not None:
-                    personalization_score = self._calculate_personalization_score(user_profile, vehicle_info)
-                    combined_scores[vehicle_id] += personalization_score * 0.3
+        candidates = np.fromiter(combined_scores.keys(), dtype=np.int64, count=len(combined_scores))
+        scores = np.fromiter(combined_scores.values(), dtype=np.float64, count=len(combined_scores))
 
-        # 최종 정렬
-        sorted_recommendations = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
+        # 개인화 점수 추가 (사용자 프로필 기반, 후보 전체에 대해 한 번에 계산)
+        user_row = self.user_store.lookup(target_user_id)
+        if user_row >= 0 and self.user_store.present[user_row]:
+            scores += self._personalization_scores(np.array([user_row]), candidates)[0] * 0.3
 
-        return self._format_recommendations(sorted_recommendations[:n_recommendations], "Hybrid NCF")
+        return self._format_recommendations(*self._top_k(candidates, scores, n_recommendations), "Hybrid NCF")
 
     def _get_user_profile(self, user_id: str):
         """사용자 프로필 조회"""
-        if self.users_df is None:
+        if self.user_store is None:
             return None
 
-        user_profile = self.users_df[self.users_df['user_id'] == user_id]
-        if len(user_profile) > 0:
-            return user_profile.iloc[0].to_dict()
-        return None
+        return self.user_store.row(self.user_store.lookup(user_id))
 
     def _get_vehicle_info(self, vehicle_id: str):
         """차량 정보 조회"""
-        if self.vehicles_df is None:
+        if self.vehicle_store is None:
             return None
 
-        vehicle_info = self.vehicles_df[self.vehicles_df['vehicle_id'] == vehicle_id]
-        if len(vehicle_info) > 0:
-            return vehicle_info.iloc[0].to_dict()
-        return None
-
-    def _calculate_personalization_score(self, user_profile: Dict, vehicle_info: Dict) -> float:
-        """개인화 점수 계산"""
-        score = 0.0
+        return self.vehicle_store.row(self.vehicle_store.lookup(vehicle_id))
+
+    def _personalization_scores(self, user_rows: np.ndarray, vehicle_idx: np.ndarray) -> np.ndarray:
+        """
+        개인화 점수 (사용자 × 차량) 벡터 계산
+        - 예산 매칭 0.3, 연령대별 브랜드 0.1, 연비 선호 0.2, 안전성 선호 0.2, 브랜드 선호 0.1
+        - 프로필이 없는 사용자(행 -1 포함)/카탈로그에 없는 차량은 0점
+        """
+        users = self.user_store
+        user_present = ((user_rows >= 0) & users.present[user_rows])[:, None]
+        budget_min = np.nan_to_num(users.column('budget_min')[user_rows].astype(np.float64), nan=0.0)[:, None]
+        budget_max = np.nan_to_num(users.column('budget_max')[user_rows].astype(np.float64), nan=np.inf)[:, None]
+        age = np.nan_to_num(users.column('age')[user_rows].astype(np.float64), nan=30.0)[:, None]
+        preference_mask = np.nan_to_num(users.column('preference_mask')[user_rows].astype(np.float64)).astype(np.int64)[:, None]
+
+        vehicles = self.vehicle_store
+        vehicle_present = vehicles.present[vehicle_idx][None, :]
+        price = np.nan_to_num(vehicles.column('price')[vehicle_idx].astype(np.float64))[None, :]
+        domestic = self.vehicle_flags['domestic'][vehicle_idx][None, :]
+        premium = self.vehicle_flags['premium'][vehicle_idx][None, :]
+        eco_fuel = self.vehicle_flags['eco_fuel'][vehicle_idx][None, :]
+        high_safety = self.vehicle_flags['high_safety'][vehicle_idx][None, :]
 
         # 예산 매칭
-        if user_profile.get('budget_min', 0) <= vehicle_info.get('price', 0) <= user_profile.get('budget_max', float('inf')):
-            score += 0.3
+        score = 0.3 * ((budget_min <= price) & (price <= budget_max))
 
         # 연령대별 선호도
-        age = user_profile.get('age', 30)
-        brand = vehicle_info.get('brand', '')
-
-        if age < 35 and brand in ['현대', '기아']:
-            score += 0.1
-        elif age >= 35 and brand in ['BMW', '벤츠', '아우디']:
-            score += 0.1
+        score = score + 0.1 * (((age < 35) & domestic) | ((age >= 35) & premium))
 
         # 선호도 매칭
-        preferences = user_profile.get('preferences', [])
-        if isinstance(preferences, str):
-            preferences = eval(preferences)  # 문자열로 저장된 리스트 파싱
-
-        if '연비' in preferences and vehicle_info.get('fuel_type') in ['hybrid', 'electric']:
-            score += 0.2
-        if '안전성' in preferences and vehicle_info.get('safety_rating', 0) >= 4.5:
-            score += 0.2
-        if '브랜드' in preferences and brand in ['BMW', '벤츠', '아우디']:
-            score += 0.1
-
-        return score
-
-    def _popularity_based_recommendations(self, n_recommendations: int):
+        score = score + 0.2 * (((preference_mask & PREFERENCE_FLAGS['연비']) != 0) & eco_fuel)
+        score = score + 0.2 * (((preference_mask & PREFERENCE_FLAGS['안전성']) != 0) & high_safety)
+        score = score + 0.1 * (((preference_mask & PREFERENCE_FLAGS['브랜드']) != 0) & premium)
+
+        return np.where(user_present & vehicle_present, score, 0.0)
+
+    def _compute_popularity(self):
+        """차량별 가중 상호작용 합계를 groupby 한 번으로 계산하고 내림차순 정렬"""
+        vehicle_idx = _map_values(self.interactions_df['vehicle_id'], self.vehicle_to_idx)
+        weights = _map_values(self.interactions_df['interaction_type'], INTERACTION_SCORES, default=1)
+        valid = ~np.isnan(vehicle_idx)
+
+        totals = pd.Series(weights[valid]).groupby(vehicle_idx[valid].astype(np.int64)).sum()
+
+        self.vehicle_popularity = np.zeros(len(self.vehicle_to_idx), dtype=np.float64)
+        self.vehicle_popularity[totals.index.to_numpy()] = totals.to_numpy()
+        self._sort_popularity()
+
+    def _sort_popularity(self):
+        """인기도 내림차순 인덱스 (동점은 차량 인덱스 순)"""
+        self.popularity_order = np.argsort(-self.vehicle_popularity, kind='stable')
+
+    def update_popularity(self, interactions: pd.DataFrame):
+        """
+        새 상호작용을 인기도에 누적 반영
+        - interactions: vehicle_id, interaction_type 컬럼을 가진 DataFrame
+        - 매핑에 없는 차량은 무시 (다음 train_model에서 반영)
+        """
+        if self.vehicle_popularity is None:
+            return
+        if not self.vehicle_popularity.flags.writeable:
+            # 아티팩트에서 mmap으로 로드된 경우 프로세스 로컬 복사본으로 전환
+            self.vehicle_popularity = np.array(self.vehicle_popularity)
+
+        vehicle_idx = _map_values(interactions['vehicle_id'], self.vehicle_to_idx)
+        weights = _map_values(interactions['interaction_type'], INTERACTION_SCORES, default=1)
+        valid = ~np.isnan(vehicle_idx)
+
+        np.add.at(self.vehicle_popularity, vehicle_idx[valid].astype(np.int64), weights[valid])
+        self._sort_popularity()
+
+    def _popular_vehicles(self, n: int, eligible: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """사전 정렬된 인기도 배열에서 상위 n개 (차량 인덱스, 점수), eligible이 있으면 그 안에서만 선택"""
+        if eligible is not None:
+            return self._top_k(eligible, self.vehicle_popularity[eligible], n)
+        top = self.popularity_order[:n]
+        return top, self.vehicle_popularity[top]
+
+    def _popularity_based_recommendations(self, n_recommendations: int, eligible: Optional[np.ndarray] = None):
         """인기도 기반 추천 (콜드 스타트 해결)"""
         if not self.is_trained:
             return self._fallback_recommendations(n_recommendations)
 
-        # 전체 상호작용 수가 많은 차량 추천
-        vehicle_popularity = {}
-
-        for _, interaction in self.interactions_df.iterrows():
-            vehicle_id = interaction['vehicle_id']
-            interaction_type = interaction['interaction_type']
-
-            # 상호작용 타입별 가중치
-            weights = {'view': 1, 'like': 2, 'inquiry': 3, 'favorite': 4, 'purchase': 5}
-
-            if vehicle_id not in vehicle_popularity:
-                vehicle_popularity[vehicle_id] = 0
-
-            vehicle_popularity[vehicle_id] += weights.get(interaction_type, 1)
+        # 전체 상호작용 가중합이 큰 차량 추천 (훈련 시 정렬된 배열 슬라이스)
+        top, popularity = self._popular_vehicles(n_recommendations, eligible)
 
-        sorted_popular = sorted(vehicle_popularity.items(), key=lambda x: x[1], reverse=True)
-
-        return self._format_recommendations(sorted_popular[:n_recommendations], "Popularity-Based")
+        return self._format_recommendations(top, popularity, "Popularity-Based")
 
     def _fallback_recommendations(self, n_recommendations: int):
         """폴백 추천 (데이터 없을 때)"""
@@ -355,24 +1296,27 @@ class RealNCFEngine:
 
         return fallback_recs
 
-    def _format_recommendations(self, recommendations: List[Tuple], algorithm: str):
-        """추천 결과 포맷팅"""
+    def _format_recommendations(self, vehicle_idx: np.ndarray, scores: np.ndarray, algorithm: str):
+        """추천 결과 포맷팅 (차량 인덱스 기반 속성 조회)"""
         formatted = []
 
-        for i, (vehicle_id, score) in enumerate(recommendations):
-            vehicle_info = self._get_vehicle_info(vehicle_id)
+        vehicle_idx = np.asarray(vehicle_idx, dtype=np.int64)
+        store = self.vehicle_store
+        high_safety = self.vehicle_flags['high_safety'][vehicle_idx]
+        eco_fuel = self.vehicle_flags['eco_fuel'][vehicle_idx]
+        domestic = self.vehicle_flags['domestic'][vehicle_idx]
 
+        for i, (idx, score) in enumerate(zip(vehicle_idx, scores)):
             reasons = ['데이터 기반 협업 필터링']
-            if vehicle_info:
-                if vehicle_info.get('safety_rating', 0) >= 4.5:
-                    reasons.append('높은 안전등급')
-                if vehicle_info.get('fuel_type') in ['hybrid', 'electric']:
-                    reasons.append('친환경 연료')
-                if vehicle_info.get('brand') in ['현대', '기아']:
-                    reasons.append('국산차 신뢰성')
+            if high_safety[i]:
+                reasons.append('높은 안전등급')
+            if eco_fuel[i]:
+                reasons.append('친환경 연료')
+            if domestic[i]:
+                reasons.append('국산차 신뢰성')
 
             formatted.append({
-                'vehicle_id': vehicle_id,
+                'vehicle_id': store.ids[idx],
                 'score': min(1.0, float(score)),
                 'confidence': 0.85,
                 'reasons': reasons,
@@ -383,17 +1327,265 @@ class RealNCFEngine:
         return formatted
 
     def get_recommendations(self, user_dict: Dict, n_recommendations: int = 10, algorithm: str = 'hybrid'):
-        """메인 추천 함수 (FastAPI 호환)"""
+        """
+        메인 추천 함수 (FastAPI 호환)
+        - user_dict의 budget_min/budget_max/fuel_types/body_types가 있으면 해당 후보만 점수 계산
+        """
         user_id = user_dict.get('user_id', 'unknown_user')
+        eligible = self._select_for_request(user_dict)
+
+        # 후보 조건이 없는 요청은 사전 계산 테이블 우선
+        if eligible is None and algorithm != 'popularity' and self.is_trained:
+            precomputed = self._precomputed_recommendations(user_id, n_recommendations, algorithm)
+            if precomputed is not None:
+                return precomputed
 
         if algorithm == 'user_based':
-            return self.get_user_based_recommendations(user_id, n_recommendations)
+            return self.get_user_based_recommendations(user_id, n_recommendations, eligible)
         elif algorithm == 'item_based':
-            return self.get_item_based_recommendations(user_id, n_recommendations)
+            return self.get_item_based_recommendations(user_id, n_recommendations, eligible)
         elif algorithm == 'popularity':
-            return self._popularity_based_recommendations(n_recommendations)
+            return self._popularity_based_recommendations(n_recommendations, eligible)
         else:  # hybrid (기본)
-            return self.get_hybrid_recommendations(user_id, n_recommendations)
+            return self.get_hybrid_recommendations(user_id, n_recommendations, eligible)
+
+    def get_recommendations_batch(self, user_ids: List[str], n: int = 10, algorithm: str = 'hybrid',
+                                  chunk_size: int = 1024,
+                                  eligible: Optional[List[Optional[np.ndarray]]] = None) -> Dict[str, np.ndarray]:
+        """
+        다수 사용자 일괄 추천 (피드/캠페인 사전 계산용)
+        - 청크마다 알고리즘별 희소 행렬곱 한 번으로 전체 사용자 점수 계산
+        - 이미 본 차량은 벡터화된 마스킹으로 제외
+        - eligible: 사용자별 select_candidates 결과 (None이면 전체 카탈로그)
+        - 메모리 사용량은 chunk_size × 차량 수로 제한
+
+        Returns:
+            {'user_ids': (B,), 'vehicle_ids': (B, n), 'scores': (B, n), 'algorithm': str}
+            후보가 부족한 칸은 vehicle_id None / score NaN. 점수는 알고리즘 원점수 (클리핑 없음).
+        """
+        user_ids = np.asarray(user_ids, dtype=object)
+        n_batch = len(user_ids)
+        vehicle_ids = np.full((n_batch, n), None, dtype=object)
+        scores = np.full((n_batch, n), np.nan, dtype=np.float32)
+
+        if not self.is_trained:
+            fallback = self._fallback_recommendations(n)
+            vehicle_ids[:, :len(fallback)] = [rec['vehicle_id'] for rec in fallback]
+            scores[:, :len(fallback)] = [rec['score'] for rec in fallback]
+            return {'user_ids': user_ids, 'vehicle_ids': vehicle_ids, 'scores': scores, 'algorithm': 'Fallback System'}
+
+        user_idx = np.array([self.user_to_idx.get(user_id, -1) for user_id in user_ids], dtype=np.int64)
+        known = user_idx >= 0
+
+        # 새로운 사용자 (또는 popularity 요청) - 인기도 기반 추천
+        cold_rows = np.arange(n_batch) if algorithm == 'popularity' else np.flatnonzero(~known)
+        if len(cold_rows) > 0:
+            top, popularity = self._popular_vehicles(n)
+            vehicle_ids[np.ix_(cold_rows, np.arange(len(top)))] = self.vehicle_ids[top]
+            scores[np.ix_(cold_rows, np.arange(len(top)))] = popularity
+
+            # 후보 조건이 있는 사용자는 조건 안에서 다시 선택
+            for row in cold_rows:
+                if eligible is not None and eligible[row] is not None:
+                    top, popularity = self._popular_vehicles(n, eligible[row])
+                    vehicle_ids[row], scores[row] = None, np.nan
+                    vehicle_ids[row, :len(top)] = self.vehicle_ids[top]
+                    scores[row, :len(top)] = popularity
+
+        if algorithm == 'popularity':
+            return {'user_ids': user_ids, 'vehicle_ids': vehicle_ids, 'scores': scores, 'algorithm': 'Popularity-Based'}
+
+        user_weights = self.user_neighbors.truncated(N_SIMILAR_USERS) if algorithm != 'item_based' else None
+        known_rows = np.flatnonzero(known)
+
+        for start in range(0, len(known_rows), chunk_size):
+            rows = known_rows[start:start + chunk_size]
+            columns, eligible_mask = None, None
+            if eligible is not None and all(eligible[row] is not None for row in rows):
+                # 청크 사용자 후보의 합집합 열만 점수 계산 (행별로 자기 후보 밖 열은 제외)
+                columns = np.unique(np.concatenate([eligible[row] for row in rows]))
+                eligible_mask = np.zeros((len(rows), len(columns)), dtype=bool)
+                for i, row in enumerate(rows):
+                    eligible_mask[i, _positions_in(columns, eligible[row])] = True
+            elif eligible is not None and any(eligible[row] is not None for row in rows):
+                eligible_mask = np.ones((len(rows), self.user_item_matrix.shape[1]), dtype=bool)
+                for i, row in enumerate(rows):
+                    if eligible[row] is not None:
+                        eligible_mask[i] = False
+                        eligible_mask[i, eligible[row]] = True
+            chunk_scores = self._score_users_chunk(user_idx[rows], algorithm, user_weights, n, columns, eligible_mask)
+
+            top, top_scores = _top_k_rows(chunk_scores, n)
+            found = top >= 0
+            if columns is not None:
+                top[found] = columns[top[found]]  # 후보 열 위치 → 차량 인덱스 (columns는 오름차순이라 동점 순서 유지)
+            chunk_vehicle_ids = np.full(top.shape, None, dtype=object)
+            chunk_vehicle_ids[found] = self.vehicle_ids[top[found]]
+
+            vehicle_ids[rows, :top.shape[1]] = chunk_vehicle_ids
+            scores[rows, :top.shape[1]] = top_scores
+
+        return {
+            'user_ids': user_ids,
+            'vehicle_ids': vehicle_ids,
+            'scores': scores,
+            'algorithm': ALGORITHM_NAMES.get(algorithm, 'Hybrid NCF')
+        }
+
+    def precompute_recommendations(self, n: int = 10, algorithms: Tuple[str, ...] = ('hybrid', 'user_based', 'item_based'),
+                                   chunk_size: int = 1024) -> TopNStore:
+        """
+        전체 사용자 Top-N 사전 계산 (train_model 이후 배치 작업)
+        - get_recommendations_batch와 같은 청크 점수 계산 경로를 사용
+        - 결과 테이블은 save_artifacts 시 버전 디렉토리에 함께 저장되고 load_artifacts에서 mmap으로 로드
+        """
+        n_users = len(self.user_ids)
+        store = TopNStore(n_users, n, algorithms, decay_clock=self.decay_clock)
+
+        for algorithm in algorithms:
+            user_weights = self.user_neighbors.truncated(N_SIMILAR_USERS) if algorithm != 'item_based' else None
+            for start in range(0, n_users, chunk_size):
+                rows = np.arange(start, min(start + chunk_size, n_users))
+                top, top_scores = _top_k_rows(self._score_users_chunk(rows, algorithm, user_weights, n), n)
+                store.write(algorithm, rows, top, top_scores)
+
+        self.topn_store = store
+        print(f"Top-{n} 사전 계산 완료: 사용자 {n_users}명 × {len(algorithms)}개 알고리즘")
+        return store
+
+    def _precomputed_recommendations(self, user_id: str, n_recommendations: int, algorithm: str) -> Optional[List[Dict]]:
+        """사전 계산 테이블에서 추천 조회 (테이블에 없거나 stale이거나 감쇠 기준 시각이 바뀌었으면 None → 실시간 계산)"""
+        if self.topn_store is None or user_id not in self.user_to_idx:
+            return None
+
+        algorithm = algorithm if algorithm in ALGORITHM_NAMES else 'hybrid'
+        hit = self.topn_store.lookup(self.user_to_idx[user_id], algorithm, n_recommendations, self.decay_clock,
+                                     exact=algorithm in N_DEPENDENT_ALGORITHMS)
+        if hit is None:
+            return None
+        return self._format_recommendations(*hit, ALGORITHM_NAMES[algorithm])
+
+    def get_recommendations_many(self, user_dicts: List[Dict], n_recommendations: int = 10,
+                                 algorithm: str = 'hybrid') -> List[List[Dict]]:
+        """
+        다수 요청을 한 번의 배치 점수 계산으로 처리 (API 마이크로배칭용)
+        - get_recommendations_batch로 점수를 계산하고 요청별로 get_recommendations와 같은 형식으로 변환
+        """
+        if not self.is_trained:
+            return [self._fallback_recommendations(n_recommendations) for _ in user_dicts]
+
+        user_ids = [user_dict.get('user_id', 'unknown_user') for user_dict in user_dicts]
+        eligible = [self._select_for_request(user_dict) for user_dict in user_dicts]
+
+        # 사전 계산 테이블에 있는 요청은 바로 반환, 나머지만 배치 점수 계산
+        results = [
+            self._precomputed_recommendations(user_id, n_recommendations, algorithm)
+            if candidates is None and algorithm != 'popularity' else None
+            for user_id, candidates in zip(user_ids, eligible)
+        ]
+        # 새로운 사용자의 하이브리드 추천은 단건 경로와 같은 결합 결과 (클리핑된 인기도 + 개인화)
+        if algorithm == 'hybrid':
+            for i, user_id in enumerate(user_ids):
+                if results[i] is None and user_id not in self.user_to_idx:
+                    results[i] = self.get_hybrid_recommendations(user_id, n_recommendations, eligible[i])
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        pending_eligible = [eligible[i] for i in pending]
+        if all(candidates is None for candidates in pending_eligible):
+            pending_eligible = None
+        batch = self.get_recommendations_batch([user_ids[i] for i in pending], n_recommendations, algorithm,
+                                               eligible=pending_eligible)
+
+        for i, row_ids, row_scores in zip(pending, batch['vehicle_ids'], batch['scores']):
+            found = ~np.isnan(row_scores)
+            vehicle_idx = np.array([self.vehicle_to_idx[vehicle_id] for vehicle_id in row_ids[found]], dtype=np.int64)
+            # 새로운 사용자는 인기도 기반 결과
+            cold = user_ids[i] not in self.user_to_idx
+            label = 'Popularity-Based' if cold or algorithm == 'popularity' else batch['algorithm']
+            results[i] = self._format_recommendations(vehicle_idx, row_scores[found], label)
+
+        return results
+
+    def _score_users_chunk(self, user_idx: np.ndarray, algorithm: str, user_weights: Optional[csr_matrix],
+                           n: int = 10, columns: Optional[np.ndarray] = None,
+                           eligible_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        사용자 청크의 (청크 크기 × 열 수) 밀집 점수 행렬 (점수 없음/이미 본 차량/후보 밖 차량은 -inf, hybrid는 float64)
+        - columns: 점수를 계산할 차량 인덱스 (오름차순, None이면 전체 차량) - 희소 곱의 비영 항목만 열 위치로 옮김
+        - eligible_mask: (청크 크기 × 열 수) 행별 후보 여부
+        """
+        interactions = self.user_item_matrix[user_idx]
+        seen = interactions.tocoo()
+        decay = self.decay_factor
+        n_columns = self.user_item_matrix.shape[1] if columns is None else len(columns)
+
+        def column_positions(coo):
+            """희소 행렬 항목 → (행, 열 위치, 값) (columns 밖 항목 제외)"""
+            if columns is None:
+                return coo.row, coo.col, coo.data
+            positions = _positions_in(columns, coo.col)
+            keep = positions >= 0
+            return coo.row[keep], positions[keep], coo.data[keep]
+
+        def densify(score_matrix):
+            dense = np.full((len(user_idx), n_columns), -np.inf, dtype=np.float32)
+            rows, cols, data = column_positions(score_matrix.tocoo())
+            dense[rows, cols] = data * decay
+            seen_rows, seen_cols, _ = column_positions(seen)
+            dense[seen_rows, seen_cols] = -np.inf  # 이미 본 차량 제외
+            if eligible_mask is not None:
+                dense[~eligible_mask] = -np.inf
+            return dense
+
+        def keep_top(dense, depth):
+            top, _ = _top_k_rows(dense, depth)
+            kept = np.full(dense.shape, -np.inf, dtype=np.float32)
+            rows, cols = np.nonzero(top >= 0)
+            kept[rows, top[rows, cols]] = dense[rows, top[rows, cols]]
+            return kept
+
+        if algorithm == 'user_based':
+            return densify(user_weights[user_idx] @ self.user_item_matrix)
+        if algorithm == 'item_based':
+            return densify(interactions @ self.item_neighbors.matrix)
+
+        # hybrid - 단건 하이브리드와 같이 방식별 상위 2n개 후보만 60:40 가중 결합 (점수는 1.0으로 클리핑) + 개인화
+        # 결합은 단건 경로와 같은 float64 연산 순서로 계산 (float32 반올림으로 동점/순위가 달라지지 않도록)
+        user_scores = keep_top(densify(user_weights[user_idx] @ self.user_item_matrix), n * 2).astype(np.float64)
+        item_scores = keep_top(densify(interactions @ self.item_neighbors.matrix), n * 2).astype(np.float64)
+        chunk_scores = (
+            np.where(np.isfinite(user_scores), np.minimum(user_scores, 1.0) * 0.6, 0.0) +
+            np.where(np.isfinite(item_scores), np.minimum(item_scores, 1.0) * 0.4, 0.0)
+        )
+        # 개인화 점수 (청크 사용자 × 점수 계산 열)
+        user_rows = np.array([self.user_store.lookup(user_id) for user_id in self.user_ids[user_idx]], dtype=np.int64)
+        vehicle_idx = np.arange(n_columns) if columns is None else columns
+        chunk_scores += self._personalization_scores(user_rows, vehicle_idx) * 0.3
+        chunk_scores[~(np.isfinite(user_scores) | np.isfinite(item_scores))] = -np.inf
+        return chunk_scores
+
+    def warmup(self, n_queries: int = 32, seed: int = 0) -> float:
+        """
+        샘플 질의로 서빙 경로 예열 (mmap 페이지 적재, 지연 구축 인덱스 생성)
+        - 기존 사용자 표본 + 새로운 사용자 1명을 단건/배치 경로로 조회
+        Returns: 소요 시간 (ms)
+        """
+        started = datetime.now()
+        if self.is_trained and len(self.user_ids) > 0:
+            rng = np.random.default_rng(seed)
+            sample = rng.choice(len(self.user_ids), min(n_queries, len(self.user_ids)), replace=False)
+            user_dicts = [{'user_id': user_id} for user_id in self.user_ids[sample]] + [{'user_id': '__warmup__'}]
+
+            for algorithm in ['hybrid', 'user_based', 'item_based']:
+                for user_dict in user_dicts[:4]:
+                    self.get_recommendations(user_dict, 10, algorithm)
+            self.get_recommendations_many(user_dicts, 10)
+            self.get_also_viewed(self.vehicle_ids[0], 10)
+
+        return (datetime.now() - started).total_seconds() * 1000.0
 
 # 전역 인스턴스
 _ncf_engine = None
@@ -0,0 +1,152 @@
+"""
+Session Co-occurrence Item-to-Item Model
+같은 세션에서 함께 조회된 차량 쌍의 횟수로 "이 차를 본 사람들이 함께 본 차량" 제공
+
+구조:
+1. 동시 출현 횟수 희소 행렬 C (차량 × 차량, 대칭, CSR)
+   - 세션 배치마다 새로 생긴 쌍만 delta 행렬로 만들어 누적
+   - 배치를 넘어 이어지는 세션은 최근 세션 목록(open_sessions)의 기존 차량과도 쌍을 만듦
+2. 차량별 Top-k 동시 출현 차량 테이블 (n × k 고정폭 배열)
+   - 배치에서 횟수가 바뀐 행만 다시 계산
+   - 조회는 배열 행 하나 → O(k)
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+
+class SessionCooccurrenceModel:
+    """
+    세션 기반 차량 동시 출현 모델
+    - update(sessions): session_id, vehicle_id 컬럼 배치로 횟수 누적
+    - also_viewed(vehicle_id, n): 동시 출현 횟수 상위 차량 (ids, counts)
+    """
+
+    def __init__(self, k: int = 20, max_session_items: int = 50, max_open_sessions: int = 100000):
+        self.k = k
+        self.max_session_items = max_session_items      # 세션당 쌍 생성에 쓰는 최대 차량 수 (쌍 수 폭증 방지)
+        self.max_open_sessions = max_open_sessions      # 다음 배치와 이어 붙일 최근 세션 수
+
+        self.item_ids: List = []
+        self.item_to_idx: Dict = {}
+        self.counts = csr_matrix((0, 0), dtype=np.float32)
+        self.top_items = np.empty((0, k), dtype=np.int32)     # 후보 부족 칸 -1
+        self.top_counts = np.empty((0, k), dtype=np.float32)
+        self.open_sessions: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def _index_items(self, vehicle_ids: np.ndarray) -> np.ndarray:
+        """차량 ID → 내부 인덱스 (처음 보는 차량은 추가하고 행렬/테이블 확장)"""
+        for vehicle_id in pd.unique(vehicle_ids):
+            if vehicle_id not in self.item_to_idx:
+                self.item_to_idx[vehicle_id] = len(self.item_ids)
+                self.item_ids.append(vehicle_id)
+
+        n_items = len(self.item_ids)
+        if n_items > self.counts.shape[0]:
+            self.counts.resize((n_items, n_items))
+            capacity = self.top_items.shape[0]
+            if n_items > capacity:
+                new_capacity = max(n_items, capacity * 2)
+                top_items = np.full((new_capacity, self.k), -1, dtype=np.int32)
+                top_counts = np.zeros((new_capacity, self.k), dtype=np.float32)
+                top_items[:capacity], top_counts[:capacity] = self.top_items, self.top_counts
+                self.top_items, self.top_counts = top_items, top_counts
+
+        return np.array([self.item_to_idx[vehicle_id] for vehicle_id in vehicle_ids], dtype=np.int64)
+
+    def update(self, sessions: pd.DataFrame) -> int:
+        """
+        세션 배치 반영
+        - sessions: session_id, vehicle_id 컬럼 (한 세션 안의 중복 조회는 한 번으로 취급)
+        Returns: 새로 누적된 (순서 있는) 쌍 수
+        """
+        events = sessions[['session_id', 'vehicle_id']].dropna().drop_duplicates()
+        if len(events) == 0:
+            return 0
+
+        events = pd.DataFrame({
+            'session': events['session_id'].astype(str).to_numpy(),
+            'item': self._index_items(events['vehicle_id'].to_numpy())
+        })
+
+        # 이전 배치에서 이미 본 (세션, 차량)은 제외하고 기존 차량 목록을 따로 모음
+        prior_rows = [
+            (session_id, item)
+            for session_id in pd.unique(events['session'])
+            if session_id in self.open_sessions
+            for item in self.open_sessions[session_id]
+        ]
+        prior = pd.DataFrame(prior_rows, columns=['session', 'item'])
+        if len(prior) > 0:
+            seen = events.merge(prior, on=['session', 'item'], how='left', indicator=True)['_merge'] == 'both'
+            events = events[~seen.to_numpy()]
+
+        # 세션당 최대 차량 수 제한 (기존 차량 포함)
+        prior_sizes = prior.groupby('session').size() if len(prior) > 0 else pd.Series(dtype=np.int64)
+        rank = events.groupby('session').cumcount() + events['session'].map(prior_sizes).fillna(0).to_numpy()
+        events = events[rank.to_numpy() < self.max_session_items]
+
+        # 새 차량끼리의 쌍 + 새 차량과 기존 차량의 쌍 (양방향)
+        within = events.merge(events, on='session')
+        within = within[within['item_x'] != within['item_y']]
+        cross = events.merge(prior, on='session') if len(prior) > 0 else within.iloc[:0]
+        rows = np.concatenate([within['item_x'].to_numpy(), cross['item_x'].to_numpy(), cross['item_y'].to_numpy()])
+        cols = np.concatenate([within['item_y'].to_numpy(), cross['item_y'].to_numpy(), cross['item_x'].to_numpy()])
+
+        self._remember_sessions(events)
+        if len(rows) == 0:
+            return 0
+
+        n_items = len(self.item_ids)
+        delta = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n_items, n_items))
+        self.counts = (self.counts + delta).tocsr()
+        self._refresh_top(np.unique(rows))
+        return len(rows)
+
+    def _remember_sessions(self, events: pd.DataFrame):
+        """배치의 세션별 차량 목록을 최근 세션에 추가 (오래된 세션부터 제거)"""
+        for session_id, items in events.groupby('session', sort=False)['item']:
+            previous = self.open_sessions.pop(session_id, None)
+            items = items.to_numpy()
+            self.open_sessions[session_id] = items if previous is None else np.concatenate([previous, items])
+
+        while len(self.open_sessions) > self.max_open_sessions:
+            self.open_sessions.popitem(last=False)
+
+    def _refresh_top(self, rows: np.ndarray):
+        """지정한 행의 Top-k 재계산 (횟수 내림차순, 동점은 차량 인덱스 순)"""
+        block = self.counts[rows].tocoo()
+        order = np.lexsort((block.col, -block.data, block.row))
+        block_rows, block_cols, block_counts = block.row[order], block.col[order], block.data[order]
+
+        # 행 안에서의 순위
+        starts = np.searchsorted(block_rows, np.arange(len(rows)))
+        rank = np.arange(len(block_rows)) - starts[block_rows]
+        keep = rank < self.k
+
+        self.top_items[rows] = -1
+        self.top_counts[rows] = 0
+        target = rows[block_rows[keep]]
+        self.top_items[target, rank[keep]] = block_cols[keep]
+        self.top_counts[target, rank[keep]] = block_counts[keep]
+
+    def also_viewed(self, vehicle_id, n: int = 10, exclude: Optional[List] = None) -> Tuple[List, np.ndarray]:
+        """같은 세션에서 함께 조회된 차량 상위 n개 (ids, 동시 출현 횟수), 모르는 차량이면 빈 결과"""
+        idx = self.item_to_idx.get(vehicle_id)
+        if idx is None:
+            return [], np.empty(0, dtype=np.float32)
+
+        top = self.top_items[idx]
+        found = top >= 0
+        items, counts = top[found], self.top_counts[idx][found]
+        if exclude:
+            keep = np.array([self.item_ids[item] not in exclude for item in items], dtype=bool)
+            items, counts = items[keep], counts[keep]
+
+        return [self.item_ids[item] for item in items[:n]], counts[:n]
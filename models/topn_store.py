@@ -0,0 +1,135 @@
+"""
+Precomputed Top-N Recommendation Store
+훈련 직후 배치로 계산한 사용자별·알고리즘별 Top-N 추천 테이블
+
+구조 ({artifact 버전 디렉토리}/topn/):
+- manifest.json            : n, 알고리즘 목록, 사용자 수, 감쇠 기준 시각, 생성 시각
+- {algorithm}_vehicle_idx.npy : (사용자 수 × n) int32 차량 인덱스 (후보 부족 칸 -1)
+- {algorithm}_scores.npy      : (사용자 수 × n) float32 원점수 (후보 부족 칸 NaN)
+- fresh.npy                 : (사용자 수,) bool 항목 유효 여부
+
+행 번호 = 엔진의 사용자 인덱스이므로 조회는 배열 슬라이스 한 번.
+재훈련 없이 상호작용이 반영된 사용자(apply_interactions)는 stale로 표시해 실시간 계산으로 넘긴다.
+시간 감쇠를 쓰면 점수가 계산 당시 기준 시각(decay_clock)에 묶이므로, 기준 시각이 바뀌면 테이블 전체가 stale.
+후보 풀이 n에 따라 달라지는 알고리즘(hybrid)은 앞 n개가 실시간 Top-n과 다를 수 있어 n이 테이블 폭과 같을 때만 조회(exact).
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 저장 포맷 버전
+TOPN_FORMAT_VERSION = 1
+
+
+class TopNStore:
+    """
+    사용자 인덱스 기반 Top-N 추천 테이블
+    - write: 배치 계산 결과를 사용자 행 단위로 기록
+    - lookup: 신선한 항목이면 (차량 인덱스, 점수), 아니면 None (실시간 계산 폴백)
+    - invalidate: 상호작용이 바뀐 사용자 항목을 stale로 표시
+    - decay_clock: 계산 당시 엔진의 감쇠 기준 시각 (감쇠 미사용 시 None)
+    """
+
+    def __init__(self, n_users: int, n: int, algorithms: List[str], decay_clock: Optional[float] = None):
+        self.n = n
+        self.decay_clock = decay_clock
+        self.algorithms = list(algorithms)
+        self.vehicle_idx: Dict[str, np.ndarray] = {
+            algorithm: np.full((n_users, n), -1, dtype=np.int32) for algorithm in self.algorithms
+        }
+        self.scores: Dict[str, np.ndarray] = {
+            algorithm: np.full((n_users, n), np.nan, dtype=np.float32) for algorithm in self.algorithms
+        }
+        self.fresh = np.ones(n_users, dtype=bool)
+        self.created_at = datetime.now().isoformat()
+
+    def __len__(self):
+        return len(self.fresh)
+
+    def write(self, algorithm: str, rows: np.ndarray, vehicle_idx: np.ndarray, scores: np.ndarray):
+        """사용자 행들의 Top-N 기록 (vehicle_idx/scores는 (len(rows), ≤n), 부족한 칸은 -1/NaN)"""
+        width = vehicle_idx.shape[1]
+        self.vehicle_idx[algorithm][rows, :width] = vehicle_idx
+        self.scores[algorithm][rows, :width] = scores
+
+    def invalidate(self, rows: np.ndarray):
+        """지정한 사용자 항목을 stale로 표시 (테이블 범위 밖 사용자는 원래 조회 대상이 아님)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        self.fresh[rows[rows < len(self.fresh)]] = False
+
+    def lookup(self, user_idx: int, algorithm: str, n: int,
+               decay_clock: Optional[float] = None, exact: bool = False) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        사전 계산된 Top-n (점수 내림차순)
+        - 알고리즘이 없거나, n이 테이블 폭보다 크거나, 항목이 없거나/stale이면 None
+        - decay_clock: 현재 감쇠 기준 시각 (계산 당시와 다르면 None)
+        - exact: True이면 n이 테이블 폭과 같을 때만 조회 (앞 n개가 Top-n과 같다는 보장이 없는 알고리즘)
+        """
+        if algorithm not in self.vehicle_idx or n > self.n or decay_clock != self.decay_clock:
+            return None
+        if exact and n != self.n:
+            return None
+        if user_idx < 0 or user_idx >= len(self.fresh) or not self.fresh[user_idx]:
+            return None
+
+        top = self.vehicle_idx[algorithm][user_idx, :n]
+        found = top >= 0
+        if not found.any():
+            return None
+        return top[found], self.scores[algorithm][user_idx, :n][found]
+
+    def save(self, path: str):
+        """디렉토리에 .npy + manifest 저장 (임시 디렉토리에 쓴 뒤 교체)"""
+        tmp_dir = path + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for algorithm in self.algorithms:
+            np.save(os.path.join(tmp_dir, f'{algorithm}_vehicle_idx.npy'), self.vehicle_idx[algorithm])
+            np.save(os.path.join(tmp_dir, f'{algorithm}_scores.npy'), self.scores[algorithm])
+        np.save(os.path.join(tmp_dir, 'fresh.npy'), self.fresh)
+
+        manifest = {
+            'format_version': TOPN_FORMAT_VERSION,
+            'n': self.n,
+            'algorithms': self.algorithms,
+            'n_users': len(self.fresh),
+            'decay_clock': self.decay_clock,
+            'created_at': self.created_at
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp_dir, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['TopNStore']:
+        """저장된 테이블을 mmap으로 로드 (없거나 포맷이 다르면 None)"""
+        try:
+            with open(os.path.join(path, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get('format_version') != TOPN_FORMAT_VERSION:
+            return None
+
+        store = cls.__new__(cls)
+        store.n = manifest['n']
+        store.algorithms = manifest['algorithms']
+        store.vehicle_idx = {
+            algorithm: np.load(os.path.join(path, f'{algorithm}_vehicle_idx.npy'), mmap_mode='r')
+            for algorithm in store.algorithms
+        }
+        store.scores = {
+            algorithm: np.load(os.path.join(path, f'{algorithm}_scores.npy'), mmap_mode='r')
+            for algorithm in store.algorithms
+        }
+        store.fresh = np.load(os.path.join(path, 'fresh.npy'))  # 프로세스 로컬 복사본 (stale 표시용)
+        store.decay_clock = manifest.get('decay_clock')
+        store.created_at = manifest['created_at']
+        return store
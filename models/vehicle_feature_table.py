@@ -0,0 +1,162 @@
+"""
+Vehicle Feature Table
+CarRecommendationNCF 추론용 차량 피처 행렬 (vehicles 카탈로그 → 훈련과 같은 인코더)
+
+- 행 번호 = 모델 차량 임베딩 인덱스, 모든 배열이 같은 행 순서로 정렬
+  - vehicle_index(훈련 시 저장한 인덱스별 차량 ID)를 주면 그 행에 고정, 매핑에 없는 차량은 임베딩 범위 밖 행에 추가
+  - features   : (capacity, 15) float32 인코딩된 차량 피처
+  - vehicle_ids: 카탈로그 차량 ID, price: 예산 필터용 원 가격(만원), active: 판매 중 여부
+- refresh(catalog): updated_at이 바뀐 행과 신규 차량만 한 번에 인코딩해 해당 행 덮어쓰기
+- refresh_from_db(engine): 마지막 반영 시각(watermark) 이후 변경분만 조회해 refresh
+- refresh는 lock을 잡고 배열을 갱신 - 파생 캐시(차량 타워)는 같은 lock 안에서 features와 version을 함께 읽음
+"""
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .ncf_feature_encoder import FeatureEncoder, catalog_to_vehicle_features
+except ImportError:  # models/ 디렉토리를 sys.path에 추가해 직접 import한 경우
+    from ncf_feature_encoder import FeatureEncoder, catalog_to_vehicle_features
+
+# 변경분 조회 쿼리 (vehicles 테이블, data/create_tables.sql)
+VEHICLE_CATALOG_QUERY = """
+    SELECT vehicle_id, price, year, mileage, engine_size, fuel_efficiency, safety_rating,
+           body_type, fuel_type, transmission, accident_history, owner_count, is_active, updated_at
+    FROM vehicles
+"""
+
+
+class VehicleFeatureTable:
+    """
+    정렬된 NumPy 배열 기반 차량 피처 테이블
+    - rows(vehicle_ids): 카탈로그 ID → 행 번호 (-1은 미등록)
+    - candidate_rows(budget_max): 판매 중인 차량 행 (예산 이하)
+    """
+
+    def __init__(self, encoder: FeatureEncoder, capacity: int = 1024, vehicle_index: Optional[List] = None):
+        self.encoder = encoder
+        capacity = max(capacity, len(vehicle_index or []), 1)
+        self.vehicle_ids = np.empty(capacity, dtype=object)
+        self.features = np.zeros((capacity, encoder.dim), dtype=np.float32)
+        self.price = np.full(capacity, np.nan, dtype=np.float32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.updated_at = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.id_to_row: Dict = {}
+        self.size = 0
+        self.watermark: Optional[pd.Timestamp] = None  # 지금까지 반영한 가장 최근 updated_at
+        self.version = 0  # 내용이 바뀔 때마다 증가 (파생 캐시 무효화용)
+        self.lock = threading.Lock()  # refresh 중 배열을 읽지 않도록 (요청 스레드 ↔ 갱신 스레드)
+
+        # 임베딩이 있는 행 수 (None이면 매핑 없이 도착 순서로 행 배정)
+        self.embedding_rows: Optional[int] = None
+        if vehicle_index is not None:
+            for row, vehicle_id in enumerate(vehicle_index):
+                if vehicle_id is not None:
+                    self.id_to_row[vehicle_id] = row
+                    self.vehicle_ids[row] = vehicle_id
+            self.size = self.embedding_rows = len(vehicle_index)
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, needed: int):
+        """배열 용량 확장 (2배씩, 새 배열로 교체해 읽는 쪽은 이전 배열을 그대로 사용)"""
+        capacity = len(self.vehicle_ids)
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2)
+
+        def grown(array, fill):
+            out = np.full((new_capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            out[:capacity] = array
+            return out
+
+        self.vehicle_ids = grown(self.vehicle_ids, None)
+        self.features = grown(self.features, 0)
+        self.price = grown(self.price, np.nan)
+        self.active = grown(self.active, False)
+        self.updated_at = grown(self.updated_at, np.datetime64('NaT'))
+
+    def refresh(self, catalog: pd.DataFrame) -> int:
+        """
+        카탈로그(전체 또는 변경분) 반영
+        - 신규 차량은 뒤에 추가, updated_at이 더 최신인 기존 차량만 다시 인코딩 (updated_at 없으면 모두 갱신)
+        - is_active=false 차량은 후보에서 제외
+        Returns: 갱신된 행 수
+        """
+        if len(catalog) == 0:
+            return 0
+
+        with self.lock:
+            return self._refresh(catalog)
+
+    def _refresh(self, catalog: pd.DataFrame) -> int:
+        catalog = catalog.drop_duplicates('vehicle_id', keep='last').reset_index(drop=True)
+        existing = catalog['vehicle_id'].map(self.id_to_row)
+        updated_at = pd.to_datetime(catalog['updated_at']) if 'updated_at' in catalog else pd.Series(pd.NaT, index=catalog.index)
+
+        changed = existing.isna().to_numpy().copy()
+        known = ~changed
+        if known.any():
+            stored = self.updated_at[existing[known].to_numpy(dtype=np.int64)]
+            incoming = updated_at[known].to_numpy(dtype='datetime64[ns]')
+            changed[known] = np.isnat(incoming) | np.isnat(stored) | (incoming > stored)
+        if not changed.any():
+            return 0
+
+        catalog, updated_at, existing = catalog[changed], updated_at[changed], existing[changed]
+
+        # 행 번호 배정 (신규 차량은 뒤에 추가 - vehicle_index가 있으면 임베딩 범위 밖)
+        new_ids = catalog.loc[existing.isna(), 'vehicle_id'].tolist()
+        self._grow(self.size + len(new_ids))
+        for vehicle_id in new_ids:
+            self.id_to_row[vehicle_id] = self.size
+            self.vehicle_ids[self.size] = vehicle_id
+            self.size += 1
+        rows = catalog['vehicle_id'].map(self.id_to_row).to_numpy(dtype=np.int64)
+
+        # 변경된 행만 한 번에 인코딩
+        self.features[rows] = self.encoder.transform(catalog_to_vehicle_features(catalog))
+        if 'price' in catalog:
+            self.price[rows] = pd.to_numeric(catalog['price'], errors='coerce').to_numpy(dtype=np.float32)
+        self.active[rows] = catalog['is_active'].fillna(True).astype(bool).to_numpy() if 'is_active' in catalog else True
+        self.updated_at[rows] = updated_at.to_numpy(dtype='datetime64[ns]')
+
+        if updated_at.notna().any():
+            latest = updated_at.max()
+            self.watermark = latest if self.watermark is None else max(self.watermark, latest)
+
+        self.version += 1
+        return len(rows)
+
+    def refresh_from_db(self, engine) -> int:
+        """SQLAlchemy 엔진으로 watermark 이후 변경된 차량만 조회해 반영 (최초 호출은 전체)"""
+        from sqlalchemy import text
+
+        query, params = VEHICLE_CATALOG_QUERY, {}
+        if self.watermark is not None:
+            query += " WHERE updated_at > :since"
+            params['since'] = self.watermark.to_pydatetime()
+        query += " ORDER BY vehicle_id"  # 매핑에 없는 신규 차량의 행 배정 순서를 실행마다 같게
+
+        with engine.connect() as connection:
+            catalog = pd.read_sql(text(query), connection, params=params)
+        return self.refresh(catalog)
+
+    def rows(self, vehicle_ids: List) -> np.ndarray:
+        return np.array([self.id_to_row.get(vehicle_id, -1) for vehicle_id in vehicle_ids], dtype=np.int64)
+
+    def candidate_rows(self, budget_max: Optional[float] = None, max_row: Optional[int] = None) -> np.ndarray:
+        """판매 중인 차량 행 (budget_max 이하, 임베딩이 있는 행 중 max_row 미만)"""
+        with self.lock:
+            size = self.size if self.embedding_rows is None else self.embedding_rows
+            if max_row is not None:
+                size = min(size, max_row)
+            eligible = self.active[:size].copy()
+            if budget_max is not None:
+                eligible &= ~(self.price[:size] > budget_max)  # 가격 미상은 포함
+        return np.flatnonzero(eligible)
@@ -25,10 +25,21 @@ def main():
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", 8000))
     reload = os.environ.get("ENVIRONMENT", "development") == "development"
+    workers = int(os.environ.get("WORKERS", 1))
 
     logger.info(f"Starting CarFin AI Backend Server on {host}:{port}")
     logger.info(f"Reload mode: {reload}")
 
+    if workers > 1:
+        # 앱과 NumPy 추론 상태(분해 추론기 가중치, 차량 피처 테이블, 차량 타워 캐시)를 부모에서 한 번 구성한 뒤 fork
+        # 워커는 이 상태로만 서빙하고 Keras 모델을 만들지 않음 - 가중치는 워커 수와 무관하게 한 벌 (copy-on-write 공유)
+        from services.prefork_server import serve_prefork
+        from backend.main import app, preload_ncf_serving_state
+
+        logger.info(f"Pre-fork mode: {workers} workers")
+        serve_prefork(app, host=host, port=port, workers=workers, preload=preload_ncf_serving_state)
+        return
+
     # Start server
     uvicorn.run(
         "backend.main:app",
@@ -0,0 +1,201 @@
+"""
+서빙 프로세스 모델 레지스트리 (무중단 버전 교체)
+
+- 새 아티팩트 버전을 백그라운드 스레드에서 로드하고 샘플 질의로 예열한 뒤 승격
+- 승격은 (버전, 모델) 튜플 참조 하나를 교체하는 원자적 연산
+  → 요청은 시작 시 registry.current를 한 번 읽어 끝까지 사용하므로 진행 중인 요청은 이전 버전으로 완료
+- 이전 버전은 메모리에 보관해 rollback() 한 번으로 즉시 되돌림 (다시 로드하지 않음)
+- pre-fork 멀티 워커: 워커마다 레지스트리가 따로 있으므로 목표 버전을 ServingVersionFile에 기록하고
+  모든 워커가 follow()로 폴링해 sync() (관리 API를 받은 워커뿐 아니라 전체가 같은 버전으로 수렴)
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ServingVersionFile:
+    """
+    pre-fork 워커들이 공유하는 목표 서빙 버전 파일
+    - write: 임시 파일에 쓴 뒤 os.replace (읽는 쪽은 항상 완전한 버전 이름만 봄)
+    - read: 파일이 없거나 비어 있으면 None
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self) -> Optional[str]:
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def write(self, version: str):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, self.path)
+
+
+class ModelRegistry:
+    """
+    버전 관리 모델 레지스트리
+    - loader(version) -> model: 버전 None이면 최신 버전
+    - warmup(model): 승격 전 예열 (선택)
+    - current / version: 현재 서빙 중인 모델과 버전 (둘 다 필요하면 snapshot())
+    """
+
+    def __init__(self,
+                 loader: Callable[[Optional[str]], Any],
+                 warmup: Optional[Callable[[Any], Any]] = None,
+                 max_history: int = 2):
+        self.loader = loader
+        self.warmup = warmup
+        self.max_history = max_history
+
+        self._active: Optional[Tuple[str, Any]] = None
+        self._history: List[Tuple[str, Any]] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+        self.loading: Optional[str] = None     # 백그라운드 로드 중인 버전 ('latest' 포함)
+        self.load_attempted = False            # 로드 시도가 한 번이라도 끝났는지 (실패 포함)
+        self.last_error: Optional[str] = None
+        self.last_load_ms: Optional[float] = None
+        self._failed_sync: Optional[str] = None  # sync() 로드에 실패한 버전 (폴링마다 재시도하지 않음)
+
+    @property
+    def current(self) -> Any:
+        """현재 모델 (요청 처리 시작 시 한 번만 읽어서 사용)"""
+        active = self._active
+        return active[1] if active is not None else None
+
+    @property
+    def version(self) -> Optional[str]:
+        active = self._active
+        return active[0] if active is not None else None
+
+    def snapshot(self) -> Tuple[Optional[str], Any]:
+        """(버전, 모델)을 한 번에 읽음 - current와 version을 따로 읽으면 그 사이 승격/롤백으로 짝이 어긋날 수 있음"""
+        with self._lock:
+            active = self._active
+        return active if active is not None else (None, None)
+
+    def _load_and_warm(self, version: Optional[str]) -> Tuple[str, Any]:
+        started = time.perf_counter()
+        model = self.loader(version)
+        if self.warmup is not None:
+            self.warmup(model)
+        self.last_load_ms = (time.perf_counter() - started) * 1000.0
+
+        resolved = getattr(model, 'artifact_version', None) or version or 'unversioned'
+        return resolved, model
+
+    def load(self, version: Optional[str] = None, promote: bool = True) -> Any:
+        """동기 로드 + 예열 (+ 승격). 서버 시작 시 사용"""
+        try:
+            resolved, model = self._load_and_warm(version)
+            if promote:
+                self.promote(model, resolved)
+        except Exception as e:
+            self.last_error = f"{version or 'latest'}: {e}"
+            raise
+        finally:
+            self.load_attempted = True
+        return model
+
+    def load_async(self, version: Optional[str] = None, promote: bool = True) -> Future:
+        """백그라운드 로드 + 예열 후 승격. 실패하면 현재 버전 유지하고 last_error 기록"""
+        self.loading = version or 'latest'
+
+        def run():
+            try:
+                return self.load(version, promote)
+            except Exception as e:
+                logger.error(f"모델 로드 실패 ({version or 'latest'}): {e}")
+                raise
+            finally:
+                self.loading = None
+
+        return self._executor.submit(run)
+
+    def promote(self, model: Any, version: str):
+        """원자적 참조 교체로 새 모델 승격 (이전 모델은 롤백용으로 보관)"""
+        with self._lock:
+            if self._active is not None:
+                self._history.append(self._active)
+                del self._history[:-self.max_history]
+            self._active = (version, model)
+            self.last_error = None
+        logger.info(f"모델 버전 승격: {version}")
+
+    def rollback(self) -> Optional[str]:
+        """직전 버전으로 되돌림. Returns: 되돌린 버전 (이전 버전이 없으면 None)"""
+        with self._lock:
+            if not self._history:
+                return None
+            self._active = self._history.pop()
+            version = self._active[0]
+        logger.info(f"모델 버전 롤백: {version}")
+        return version
+
+    def sync(self, version: str) -> bool:
+        """
+        목표 버전으로 맞춤 (ServingVersionFile 폴링용)
+        - 이미 서빙 중이거나 로드 중/로드 실패한 버전이면 아무것도 하지 않음
+        - 보관 중인 이전 버전이면 즉시 교체, 아니면 백그라운드 로드·예열 후 승격
+        Returns: 교체 또는 로드를 시작했으면 True
+        """
+        with self._lock:
+            if self._active is not None and self._active[0] == version:
+                return False
+            kept = next((entry for entry in self._history if entry[0] == version), None)
+            if kept is not None:
+                self._history.remove(kept)
+                if self._active is not None:
+                    self._history.append(self._active)
+                self._active = kept
+        if kept is not None:
+            logger.info(f"모델 버전 전환 (보관 버전): {version}")
+            return True
+        if self.loading == version or self._failed_sync == version:
+            return False
+
+        def remember_failure(future: Future):
+            if future.exception() is not None:
+                self._failed_sync = version
+
+        self.load_async(version).add_done_callback(remember_failure)
+        return True
+
+    def follow(self, version_file: ServingVersionFile, interval: float = 2.0) -> threading.Thread:
+        """목표 버전 파일을 interval초마다 읽어 sync() (fork 이후 각 워커에서 시작하는 데몬 스레드)"""
+        def poll():
+            while True:
+                version = version_file.read()
+                if version is not None:
+                    try:
+                        self.sync(version)
+                    except Exception as e:
+                        logger.error(f"서빙 버전 동기화 실패 ({version}): {e}")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=poll, name="model-version-follower", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'previous_versions': [version for version, _ in reversed(self._history)],
+            'loading': self.loading,
+            'load_attempted': self.load_attempted,
+            'last_error': self.last_error,
+            'last_load_ms': round(self.last_load_ms, 1) if self.last_load_ms is not None else None
+        }
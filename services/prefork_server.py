@@ -0,0 +1,156 @@
+"""
+Pre-fork 멀티 워커 서빙
+부모 프로세스에서 모델을 한 번 로드한 뒤 fork해 워커들이 같은 메모리 페이지를 공유
+
+- 모델 배열은 아티팩트 .npy mmap(페이지 캐시) 또는 fork 이전 힙에 있어 워커 수가 늘어도 한 벌만 존재
+- fork 직전 gc.freeze()로 기존 객체를 GC 추적에서 빼 참조 카운트/GC 스캔으로 인한 copy-on-write 최소화
+- 부모는 소켓을 한 번 바인드하고 워커들이 같은 소켓에서 accept (uvicorn workers 옵션은 spawn이라 공유 불가)
+- 워커가 비정상 종료되면 부모가 지수 백오프 후 다시 fork, 짧은 시간에 반복되면(결정적 실패) 부모도 종료
+
+uvicorn --workers 대신: serve_prefork(app, preload=load_model, workers=4)
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+
+class RestartPolicy:
+    """
+    워커 재시작 정책
+    - 재시작 지연: 연속 종료마다 base_delay부터 2배씩 증가 (max_delay 상한), healthy_uptime 이상 살아 있던 워커면 초기화
+    - 종료율 제한: window초 안에 max_crashes회를 넘으면 재시작 중단 (import/시작 단계의 결정적 실패로 간주)
+    """
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0, max_crashes: int = 10,
+                 window: float = 60.0, healthy_uptime: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_crashes = max_crashes
+        self.window = window
+        self.healthy_uptime = healthy_uptime
+        self._consecutive = 0
+        self._crashes = deque()
+
+    def record_exit(self, uptime: float, now: Optional[float] = None) -> Optional[float]:
+        """워커 종료 기록 → 재시작 전 대기 시간(초), 종료율 제한을 넘으면 None"""
+        now = time.monotonic() if now is None else now
+        self._crashes.append(now)
+        while now - self._crashes[0] > self.window:
+            self._crashes.popleft()
+        if len(self._crashes) > self.max_crashes:
+            return None
+
+        self._consecutive = 1 if uptime >= self.healthy_uptime else self._consecutive + 1
+        return min(self.max_delay, self.base_delay * 2 ** (self._consecutive - 1))
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    """자식 프로세스: 공유 소켓으로 uvicorn 실행"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_prefork(app, host: str = "0.0.0.0", port: int = 8000, workers: int = 2,
+                  preload: Optional[Callable[[], object]] = None, log_level: str = "info",
+                  restart_policy: Optional[RestartPolicy] = None):
+    """
+    모델을 부모에서 미리 로드한 뒤 workers개 프로세스로 fork해 서빙
+    - preload: fork 전에 호출할 모델 로드 함수 (앱 startup 훅은 이미 로드된 모델을 재사용해야 함)
+    - restart_policy: 워커 재시작 지연/종료율 제한 (기본 RestartPolicy())
+    - 종료율 제한을 넘으면 남은 워커를 정리하고 SystemExit(1) (프로세스 관리자가 재시작 판단)
+    """
+    restart_policy = restart_policy or RestartPolicy()
+    if preload is not None:
+        preload()
+
+    sock = _bind_socket(host, port)
+    gc.collect()
+    gc.freeze()
+
+    children = {}  # pid → 시작 시각 (monotonic)
+    shutting_down = False
+    gave_up = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                _run_worker(app, sock, log_level)
+                exit_code = 0
+            except Exception:
+                logger.exception("워커 실행 실패")
+            finally:
+                os._exit(exit_code)
+        children[pid] = time.monotonic()
+        logger.info(f"워커 시작: pid {pid}")
+
+    def wait_before_restart(delay: float):
+        """재시작 지연 (종료 신호가 오면 즉시 중단)"""
+        deadline = time.monotonic() + delay
+        while not shutting_down and time.monotonic() < deadline:
+            time.sleep(min(0.1, deadline - time.monotonic()))
+
+    def stop(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    logger.info(f"Pre-fork 서빙 시작: {host}:{port}, 워커 {workers}개 (부모 pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or shutting_down:
+            continue
+
+        delay = restart_policy.record_exit(time.monotonic() - started)
+        if delay is None:
+            logger.error(f"워커가 {restart_policy.window:.0f}초 안에 {restart_policy.max_crashes}회 넘게 종료되어 "
+                         f"재시작을 중단하고 서버를 종료합니다 (마지막 워커 {pid}, status {status})")
+            gave_up = True
+            stop(None, None)
+            continue
+
+        logger.warning(f"워커 {pid} 종료 (status {status}) - {delay:.1f}초 후 재시작")
+        wait_before_restart(delay)
+        if not shutting_down:
+            spawn()
+
+    sock.close()
+    if gave_up:
+        raise SystemExit(1)
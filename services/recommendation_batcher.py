@@ -0,0 +1,118 @@
+"""
+추천 요청 마이크로배칭
+짧은 시간 안에 들어온 요청을 모아 전용 스레드에서 한 번의 배치 점수 계산으로 처리
+
+- 이벤트 루프는 CPU 연산을 직접 하지 않으므로 느린 점수 계산이 다른 요청을 막지 않음
+- 전용 executor(기본 스레드 1개)에서 배치를 순차 실행, 실행 중 들어온 요청은 다음 배치로 합쳐짐
+- 요청별로 실제 대기 시간(queue_wait_ms)과 배치 계산 시간(compute_ms)을 함께 반환
+- run_grouped: 결과를 바꾸는 파라미터(limit 등)가 같은 요청끼리만 묶어 계산
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def run_grouped(items: List[Any],
+                key: Callable[[Any], Hashable],
+                batch_fn: Callable[[Hashable, List[Any]], List[Any]]) -> List[Any]:
+    """
+    key가 같은 요청끼리 batch_fn(key, group)을 한 번씩 호출하고 원래 순서로 결과 반환
+    - 요청 결과가 같은 배치에 섞인 다른 요청의 파라미터에 따라 달라지지 않도록 함
+    """
+    groups: Dict[Hashable, List[int]] = {}
+    for position, item in enumerate(items):
+        groups.setdefault(key(item), []).append(position)
+
+    results: List[Any] = [None] * len(items)
+    for group_key, positions in groups.items():
+        group_results = batch_fn(group_key, [items[position] for position in positions])
+        for position, result in zip(positions, group_results):
+            results[position] = result
+    return results
+
+
+class RecommendationBatcher:
+    """
+    비동기 마이크로배처
+    - batch_fn(items) -> results: 요청 리스트를 받아 같은 순서의 결과 리스트 반환 (executor 스레드에서 실행)
+    - submit(item): 결과와 타이밍 dict를 await
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="ncf-scoring")
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        """현재 이벤트 루프에서 배치 수집 태스크 시작 (최초 요청 시)"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, item: Any) -> Tuple[Any, Dict[str, float]]:
+        """요청 하나를 큐에 넣고 배치 처리 결과를 기다림"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """첫 요청 후 max_wait_ms 동안(또는 max_batch_size까지) 모아서 실행"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._execute(batch)
+
+    def _run_batch(self, items: List[Any]) -> Tuple[List[Any], float, float]:
+        """executor 스레드에서 실행: (결과, 계산 시작 시각, 계산 시간 ms)"""
+        started = time.perf_counter()
+        results = self.batch_fn(items)
+        return results, started, (time.perf_counter() - started) * 1000.0
+
+    async def _execute(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        items = [item for item, _, _ in batch]
+        try:
+            results, started, compute_ms = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run_batch, items
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, enqueued), result in zip(batch, results):
+            if future.done():  # 요청이 취소된 경우
+                continue
+            future.set_result((result, {
+                'queue_wait_ms': round((started - enqueued) * 1000.0, 3),
+                'compute_ms': round(compute_ms, 3),
+                'batch_size': len(batch)
+            }))
+
+    def shutdown(self):
+        """수집 태스크 종료 및 executor 정리"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self.executor.shutdown(wait=False)
@@ -9,6 +9,8 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
+from services.model_registry import ModelRegistry, ServingVersionFile
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +40,8 @@ class UserProfile(BaseModel):
     preferences: List[str] = []
     purpose: Optional[str] = None
     budget_range: Optional[Dict[str, int]] = None
+    fuel_types: List[str] = []   # 예: ["hybrid", "electric"] (비어 있으면 제한 없음)
+    body_types: List[str] = []   # 예: ["suv", "sedan"]
 
 class RecommendationRequest(BaseModel):
     user_profile: UserProfile
@@ -56,23 +60,80 @@ class RecommendationResponse(BaseModel):
     recommendations: List[VehicleRecommendation]
     metadata: Dict[str, Any]
 
-# Global NCF model instance
-ncf_model = None
+class ModelPromoteRequest(BaseModel):
+    version: Optional[str] = None  # 생략 시 LATEST 아티팩트
+
+NCF_ARTIFACT_PATH = os.environ.get("NCF_ARTIFACT_PATH", "data/ncf_artifacts")
+
+def _load_ncf_engine(version: Optional[str] = None):
+    """아티팩트 버전으로 NCF 엔진 생성 (version None이면 LATEST, 없으면 훈련 후 저장)"""
+    # Add models path
+    models_path = os.path.join(os.path.dirname(__file__), 'models')
+    if models_path not in sys.path:
+        sys.path.append(models_path)
+
+    from real_ncf_engine import RealNCFEngine
+    # 저장된 아티팩트가 있으면 재훈련 없이 로드 (없거나 데이터가 바뀌면 훈련 후 저장)
+    # 기존 사용자 Top-N은 훈련 직후 미리 계산해 아티팩트와 함께 저장 (0이면 비활성)
+    # NCF_DECAY_HALF_LIFE_DAYS를 주면 상호작용 점수에 시간 감쇠 적용 (예: 30)
+    decay_half_life = os.environ.get("NCF_DECAY_HALF_LIFE_DAYS")
+    return RealNCFEngine(
+        artifact_path=NCF_ARTIFACT_PATH,
+        precompute_top_n=int(os.environ.get("NCF_PRECOMPUTE_TOP_N", 10)),
+        artifact_version=version,
+        decay_half_life_days=float(decay_half_life) if decay_half_life else None
+    )
+
+# NCF 모델 레지스트리 - 요청은 시작 시 ncf_registry.current를 한 번 읽어 끝까지 같은 버전 사용
+ncf_registry = ModelRegistry(_load_ncf_engine, warmup=lambda engine: engine.warmup())
+
+# pre-fork 멀티 워커(WORKERS>1)에서는 워커마다 레지스트리가 따로 있으므로 승격/롤백을 공유 파일로 전파
+# 관리 API를 받은 워커가 목표 버전을 기록하고 모든 워커(재시작된 워커 포함)가 폴링해 같은 버전으로 전환
+PREFORK_WORKERS = int(os.environ.get("WORKERS", 1))
+serving_version_file = (
+    ServingVersionFile(os.path.join(NCF_ARTIFACT_PATH, "SERVING")) if PREFORK_WORKERS > 1 else None
+)
+
+# 추천 점수 계산 마이크로배처 (전용 스레드에서 실행, 수 ms 안에 들어온 요청을 한 번에 계산)
+recommendation_batcher = None
+
+def _score_recommendation_batch(items: List[Dict[str, Any]]) -> List[List[Dict]]:
+    """배치 점수 계산 (executor 스레드에서 실행) - limit이 같은 요청끼리 묶어 계산"""
+    from services.recommendation_batcher import run_grouped
+    version, ncf_model = ncf_registry.snapshot()  # 배치 전체를 같은 모델 버전으로 계산
+
+    # 하이브리드 후보 풀이 n에 따라 달라지므로 최대 limit으로 계산 후 자르면 안 됨
+    def score(limit, group):
+        results = ncf_model.get_recommendations_many(
+            [item["user_dict"] for item in group],
+            n_recommendations=limit
+        )
+        return [(result, version) for result in results]
+
+    return run_grouped(items, lambda item: item["limit"], score)
+
+def get_recommendation_batcher():
+    """마이크로배처 인스턴스 반환 (최초 호출 시 생성)"""
+    global recommendation_batcher
+    if recommendation_batcher is None:
+        from services.recommendation_batcher import RecommendationBatcher
+        recommendation_batcher = RecommendationBatcher(
+            _score_recommendation_batch,
+            max_batch_size=int(os.environ.get("NCF_BATCH_MAX_SIZE", 64)),
+            max_wait_ms=float(os.environ.get("NCF_BATCH_WAIT_MS", 5))
+        )
+    return recommendation_batcher
 
 def load_ncf_model():
-    """NCF 모델 로드"""
-    global ncf_model
+    """NCF 모델 로드 (pre-fork 서빙에서 부모가 이미 로드했으면 그대로 사용)"""
+    if ncf_registry.current is not None:
+        return True
     try:
-        # Add models path
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'models'))
-
-        from real_ncf_engine import RealNCFEngine
-        ncf_model = RealNCFEngine()
-        logger.info("✅ NCF 모델 로드 성공")
+        ncf_registry.load()
+        logger.info(f"✅ NCF 모델 로드 성공 (버전 {ncf_registry.version})")
         return True
     except Exception as e:
         logger.warning(f"⚠️ NCF 모델 로드 실패: {e}")
-        ncf_model = None
         return False
 
 @app.get("/")
@@ -82,17 +143,19 @@ async def root():
         "message": "CarFin AI Backend is running",
         "status": "healthy",
         "version": "1.0.0",
-        "ncf_model": "loaded" if ncf_model else "not loaded"
+        "ncf_model": "loaded" if ncf_registry.current else "not loaded"
     }
 
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    version, ncf_model = ncf_registry.snapshot()
     ncf_status = "available" if ncf_model else "unavailable"
 
     return {
         "status": "healthy",
         "ncf_model": ncf_status,
+        "ncf_model_version": version,
         "recommendation_engine": "ready"
     }
 
@@ -103,23 +166,29 @@ async def get_ncf_recommendations(request: RecommendationRequest):
         logger.info(f"NCF 추천 요청: 사용자 {request.user_profile.user_id}")
 
         # NCF 모델이 로드되지 않았으면 로드 시도
-        if ncf_model is None:
+        if ncf_registry.current is None:
             load_ncf_model()
+        ncf_model = ncf_registry.current
 
         # NCF 모델 사용 또는 Mock 시스템
         if ncf_model is not None:
+            budget_range = request.user_profile.budget_range or {}
             # NCF 모델을 통한 추천
             user_dict = {
                 "user_id": request.user_profile.user_id,
                 "age": request.user_profile.age or 30,
                 "income": request.user_profile.income or 5000,
                 "preferences": request.user_profile.preferences,
-                "budget_max": request.user_profile.budget_range.get("max", 5000) if request.user_profile.budget_range else 5000
+                # 후보 생성 조건 - 조건에 맞는 차량만 점수 계산
+                "budget_min": budget_range.get("min"),
+                "budget_max": budget_range.get("max"),
+                "fuel_types": request.user_profile.fuel_types,
+                "body_types": request.user_profile.body_types
             }
 
-            ncf_results = ncf_model.get_recommendations(
-                user_dict,
-                n_recommendations=request.limit
+            # 이벤트 루프를 막지 않도록 전용 스레드에서 배치로 계산
+            (ncf_results, model_version), timings = await get_recommendation_batcher().submit(
+                {"user_dict": user_dict, "limit": request.limit}
             )
 
             # NCF 결과를 API 형식으로 변환
@@ -141,7 +210,12 @@ async def get_ncf_recommendations(request: RecommendationRequest):
                     "paper": "He et al. 2017 - Neural Collaborative Filtering",
                     "model_type": "GMF + MLP Hybrid",
                     "mode": "ncf_mock" if not hasattr(ncf_model, 'model') or ncf_model.model is None else "ncf_trained",
-                    "processing_time_ms": 75,
+                    "model_version": model_version,
+                    "processing_time_ms": round(timings["queue_wait_ms"] + timings["compute_ms"], 3),
+                    "queue_wait_ms": timings["queue_wait_ms"],
+                    "compute_ms": timings["compute_ms"],
+                    "batch_size": timings["batch_size"],
+                    "budget_filter": f"~{budget_range['max']}만원" if "max" in budget_range else None,
                     "user_preferences": request.user_profile.preferences
                 }
             )
@@ -230,23 +304,104 @@ async def get_ncf_recommendations(request: RecommendationRequest):
         logger.error(f"추천 시스템 오류: {e}")
         raise HTTPException(status_code=500, detail=f"추천 시스템 오류: {str(e)}")
 
+@app.get("/api/vehicles/{vehicle_id}/also-viewed")
+async def get_also_viewed(vehicle_id: str, limit: int = 10):
+    """이 차량을 본 사용자들이 같은 세션에서 함께 본 차량 (세션 동시 출현 Top-k 조회)"""
+    version, engine = ncf_registry.snapshot()
+    if engine is None:
+        raise HTTPException(status_code=503, detail="NCF 모델이 로드되지 않았습니다")
+    return {
+        "vehicle_id": vehicle_id,
+        "recommendations": engine.get_also_viewed(vehicle_id, limit),
+        "model_version": version
+    }
+
+@app.get("/admin/models")
+async def model_status():
+    """NCF 모델 레지스트리 상태 (현재/이전 버전, 백그라운드 로드 진행 여부, pre-fork면 전체 워커의 목표 버전)"""
+    status = ncf_registry.status()
+    if serving_version_file is not None:
+        status["target_version"] = serving_version_file.read()
+    return status
+
+def _resolve_artifact_version(version: Optional[str]) -> str:
+    """승격할 아티팩트 버전 이름 (None이면 LATEST) - 워커마다 LATEST를 따로 읽지 않도록 먼저 확정"""
+    if version is None:
+        try:
+            with open(os.path.join(NCF_ARTIFACT_PATH, "LATEST")) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="저장된 아티팩트가 없습니다")
+    if not os.path.isdir(os.path.join(NCF_ARTIFACT_PATH, version)):
+        raise HTTPException(status_code=404, detail=f"아티팩트 버전이 없습니다: {version}")
+    return version
+
+@app.post("/admin/models/promote", status_code=202)
+async def promote_model(request: ModelPromoteRequest):
+    """아티팩트 버전을 백그라운드에서 로드·예열 후 승격 (현재 버전은 그동안 계속 서빙, pre-fork면 전체 워커에 전파)"""
+    if ncf_registry.loading is not None:
+        raise HTTPException(status_code=409, detail=f"이미 로드 중입니다: {ncf_registry.loading}")
+    if serving_version_file is not None:
+        version = _resolve_artifact_version(request.version)
+        serving_version_file.write(version)
+        ncf_registry.sync(version)
+    else:
+        ncf_registry.load_async(request.version)
+    return ncf_registry.status()
+
+@app.post("/admin/models/rollback")
+async def rollback_model():
+    """직전 모델 버전으로 즉시 되돌림 (pre-fork면 전체 워커에 전파)"""
+    if serving_version_file is not None:
+        previous = ncf_registry.status()["previous_versions"]
+        if not previous:
+            raise HTTPException(status_code=409, detail="되돌릴 이전 버전이 없습니다")
+        serving_version_file.write(previous[0])
+        ncf_registry.sync(previous[0])
+        return ncf_registry.status()
+
+    version = ncf_registry.rollback()
+    if version is None:
+        raise HTTPException(status_code=409, detail="되돌릴 이전 버전이 없습니다")
+    return ncf_registry.status()
+
 # 애플리케이션 시작 시 NCF 모델 로드 시도
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 NCF 모델 로드"""
     logger.info("🚀 CarFin AI Backend 시작")
     load_ncf_model()
+    if serving_version_file is not None:
+        ncf_registry.follow(serving_version_file)  # fork 이후 워커마다 시작 (스레드는 fork로 복제되지 않음)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """추천 배처 executor 정리"""
+    if recommendation_batcher is not None:
+        recommendation_batcher.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
 
     port = int(os.environ.get("PORT", 8000))
+    workers = int(os.environ.get("WORKERS", 1))
     logger.info(f"Starting CarFin AI server on port {port}")
 
-    uvicorn.run(
-        "simple_main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    if workers > 1:
+        # 모델을 부모에서 한 번 로드한 뒤 fork - 워커들이 모델 메모리를 공유
+        from services.prefork_server import serve_prefork
+
+        def preload():
+            # 이전 실행에서 남은 목표 버전 대신 부모가 로드한 버전으로 시작
+            if load_ncf_model() and ncf_registry.version:
+                serving_version_file.write(ncf_registry.version)
+
+        serve_prefork(app, host="0.0.0.0", port=port, workers=workers, preload=preload)
+    else:
+        uvicorn.run(
+            "simple_main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=True,
+            log_level="info"
+        )
\ No newline at end of file
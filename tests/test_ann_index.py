@@ -0,0 +1,109 @@
+"""
+IVF 근사 최근접 이웃 인덱스 테스트
+전수 검색 결과와 비교해 recall, 증분 추가, 제외 조건, 증분 추가 후 재학습을 확인
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.ann_index import IVFIndex
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    """군집 구조가 있는 임베딩 (중심 20개 주변에 2000개)"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 32))
+    return (centers[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 32))).astype(np.float32)
+
+
+def _exact_top_k(vectors, queries, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    return np.argsort(-sims, axis=1, kind='stable')[:, :k]
+
+
+def test_full_probe_matches_exact_search(vectors):
+    """n_probe = n_lists면 전수 검색과 같은 Top-k"""
+    index = IVFIndex(n_lists=16).build(vectors)
+    queries = vectors[:50]
+
+    positions, sims = index.query_batch(queries, k=10, n_probe=16)
+
+    np.testing.assert_array_equal(np.sort(positions, axis=1), np.sort(_exact_top_k(vectors, queries, 10), axis=1))
+    assert np.all(np.diff(sims, axis=1) <= 1e-6)
+
+
+def test_recall_grows_with_n_probe(vectors):
+    index = IVFIndex(n_lists=32).build(vectors)
+
+    low, high = index.estimate_recall(k=10, n_probe=1), index.estimate_recall(k=10, n_probe=8)
+
+    assert low <= high
+    assert high >= 0.9
+
+
+def test_query_matches_query_batch(vectors):
+    index = IVFIndex(n_lists=16, n_probe=4).build(vectors, ids=np.array([f"car_{i}" for i in range(len(vectors))]))
+
+    ids, sims = index.query(vectors[7], k=5)
+    positions, batch_sims = index.query_batch(vectors[7:8], k=5)
+
+    assert list(ids) == [f"car_{p}" for p in positions[0]]
+    np.testing.assert_allclose(sims, batch_sims[0], rtol=1e-5)
+
+
+def test_add_updates_existing_and_new_ids(vectors):
+    """add()는 기존 ID 벡터를 교체(리스트 이동 포함)하고 새 ID는 뒤에 추가"""
+    index = IVFIndex(n_lists=16).build(vectors[:1000])
+
+    index.add(vectors[1500:1502], ids=np.array([3, 5000]))
+
+    assert len(index) == 1001
+    for item_id, vector in [(3, vectors[1500]), (5000, vectors[1501])]:
+        ids, sims = index.query(vector, k=1, n_probe=16)
+        assert ids[0] == item_id
+        assert sims[0] == pytest.approx(1.0, abs=1e-5)
+    assert sum(len(members) for members in index.lists) == len(index)
+
+
+def test_query_excludes_ids(vectors):
+    index = IVFIndex(n_lists=16).build(vectors)
+
+    ids, _ = index.query(vectors[0], k=5, n_probe=16, exclude=[0])
+
+    assert 0 not in ids
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_retrain_after_growth_restores_list_count_and_recall(vectors, quantize):
+    """작은 초기 인덱스에 add()로 크게 늘리면 needs_retrain, retrain()은 sqrt(N) 리스트로 다시 학습"""
+    index = IVFIndex(n_probe=4, quantize=quantize).build(vectors[:50])
+    assert index.n_lists == 7 and not index.needs_retrain()
+
+    index.add(vectors[50:100], ids=np.arange(50, 100))
+    assert not index.needs_retrain()
+    index.add(vectors[100:], ids=np.arange(100, len(vectors)))
+    assert index.needs_retrain()
+
+    index.retrain()
+
+    assert not index.needs_retrain()
+    assert index.n_lists == int(np.sqrt(len(vectors))) and index.trained_size == len(index) == len(vectors)
+    ids, sims = index.query(vectors[1234], k=1, n_probe=index.n_lists)
+    assert ids[0] == 1234 and sims[0] == pytest.approx(1.0, abs=1e-3)
+    assert index.estimate_recall(k=10, n_probe=8) >= 0.9
+
+
+def test_fixed_list_count_is_kept_on_retrain(vectors):
+    index = IVFIndex(n_lists=16).build(vectors[:500])
+    index.add(vectors[500:], ids=np.arange(500, len(vectors)))
+
+    assert index.needs_retrain()
+    assert index.retrain().n_lists == 16
@@ -0,0 +1,88 @@
+"""
+NCF CSV 바이너리 캐시 테스트
+read_csv와 같은 값, 캐시 재사용, 수정시각/내용 변경과 손상된 manifest 처리 확인
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models import dataset_cache
+from models.dataset_cache import load_csv_cached
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "ncf_interactions.csv"
+    shutil.copy(project_root / "data" / "ncf_interactions.csv", path)
+    return str(path)
+
+
+@pytest.fixture
+def checksum_calls(monkeypatch):
+    """_file_checksum 호출 횟수 기록"""
+    calls = []
+    original = dataset_cache._file_checksum
+
+    def counting(path, *args, **kwargs):
+        calls.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(dataset_cache, '_file_checksum', counting)
+    return calls
+
+
+def _fail_read_csv(*args, **kwargs):
+    raise AssertionError("캐시가 유효하면 CSV를 다시 파싱하지 않아야 함")
+
+
+def test_cached_frame_matches_read_csv(csv_path, monkeypatch):
+    expected = pd.read_csv(csv_path, parse_dates=['timestamp'])
+    load_csv_cached(csv_path, parse_dates=['timestamp'])
+
+    monkeypatch.setattr(pd, 'read_csv', _fail_read_csv)
+    cached = load_csv_cached(csv_path, parse_dates=['timestamp'])
+
+    assert list(cached.columns) == list(expected.columns)
+    assert isinstance(cached['user_id'].dtype, pd.CategoricalDtype)
+    for name in expected.columns:
+        pd.testing.assert_series_equal(cached[name].astype(expected[name].dtype), expected[name], check_dtype=False)
+
+
+def test_touched_csv_is_rehashed_once(csv_path, checksum_calls, monkeypatch):
+    """내용은 같고 수정시각만 바뀌면 체크섬 한 번으로 재사용, 이후 시작에서는 체크섬 생략"""
+    load_csv_cached(csv_path)
+    os.utime(csv_path, ns=(0, 10 ** 18))
+    checksum_calls.clear()
+
+    monkeypatch.setattr(pd, 'read_csv', _fail_read_csv)
+    load_csv_cached(csv_path)
+    load_csv_cached(csv_path)
+
+    assert len(checksum_calls) == 1
+
+
+def test_changed_csv_rebuilds_cache(csv_path):
+    load_csv_cached(csv_path)
+    df = pd.read_csv(csv_path)
+    df.iloc[:10].to_csv(csv_path, index=False)
+
+    assert len(load_csv_cached(csv_path)) == 10
+
+
+def test_corrupt_manifest_rebuilds_cache(csv_path):
+    expected = load_csv_cached(csv_path)
+    manifest_path = os.path.join(os.path.dirname(csv_path), '.ncf_cache', 'ncf_interactions.csv', 'manifest.json')
+    with open(manifest_path, 'w') as f:
+        f.write('{"format_version": 1, "sour')
+
+    rebuilt = load_csv_cached(csv_path)
+
+    pd.testing.assert_frame_equal(rebuilt, expected)
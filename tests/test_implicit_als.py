@@ -0,0 +1,62 @@
+"""
+Implicit ALS-CG 테스트
+fold-in 해가 정규방정식의 정확해와 같은지, 학습 요인이 상호작용을 재현하는지 확인
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, random as sparse_random
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.implicit_als import ImplicitALS
+
+
+@pytest.fixture(scope="module")
+def user_items():
+    matrix = sparse_random(200, 80, density=0.05, format='csr', random_state=0, dtype=np.float32)
+    matrix.data = np.ceil(matrix.data * 5)  # 1~5점 상호작용
+    return matrix
+
+
+def _exact_user_factors(model, user_rows, item_factors):
+    """(YᵀY + Yᵀ(Cᵤ-I)Y + λI) xᵤ = YᵀCᵤpᵤ 직접 풀이"""
+    y = item_factors.astype(np.float64)
+    solutions = []
+    for row in user_rows.toarray():
+        confidence = 1.0 + model.alpha * row
+        preference = (row > 0).astype(np.float64)
+        a = y.T @ (confidence[:, None] * y) + model.regularization * np.eye(y.shape[1])
+        solutions.append(np.linalg.solve(a, y.T @ (confidence * preference)))
+    return np.array(solutions)
+
+
+def test_fold_in_matches_normal_equation(user_items):
+    """처음부터 푸는 fold-in (CG 단계 = 요인 수)은 정확해에 수렴"""
+    model = ImplicitALS(n_factors=8, iterations=5).fit(user_items)
+    new_users = user_items[:5]
+
+    folded = model.recalculate_users(new_users, model.item_factors)
+
+    np.testing.assert_allclose(folded, _exact_user_factors(model, new_users, model.item_factors), rtol=1e-3, atol=1e-3)
+
+
+def test_fit_ranks_interacted_items_higher(user_items):
+    model = ImplicitALS(n_factors=16, iterations=10).fit(user_items)
+    scores = model.user_factors @ model.item_factors.T
+    interacted = user_items.toarray() > 0
+
+    assert model.user_factors.shape == (200, 16) and model.item_factors.shape == (80, 16)
+    assert scores[interacted].mean() > scores[~interacted].mean() + 0.3
+
+
+def test_empty_user_folds_in_to_zero(user_items):
+    model = ImplicitALS(n_factors=8, iterations=3).fit(user_items)
+
+    folded = model.recalculate_users(csr_matrix((1, user_items.shape[1]), dtype=np.float32), model.item_factors)
+
+    np.testing.assert_allclose(folded, 0.0, atol=1e-6)
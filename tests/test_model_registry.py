@@ -0,0 +1,132 @@
+"""
+모델 레지스트리 테스트
+로드·예열 후 승격, 롤백, 실패 시 현재 버전 유지, snapshot 일관성 확인
+pre-fork 워커 간 목표 버전 파일 동기화(sync/follow) 확인
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.model_registry import ModelRegistry, ServingVersionFile
+
+
+class FakeModel:
+    def __init__(self, version):
+        self.artifact_version = version
+        self.warmed = False
+
+
+def _loader(version):
+    if version == 'broken':
+        raise RuntimeError("artifact missing")
+    return FakeModel(version or 'v-latest')
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry(_loader, warmup=lambda model: setattr(model, 'warmed', True))
+
+
+def test_load_warms_and_promotes(registry):
+    assert registry.snapshot() == (None, None)
+
+    model = registry.load('v1')
+
+    assert model.warmed
+    assert registry.snapshot() == ('v1', model)
+    assert registry.status()['load_attempted'] is True
+
+
+def test_promote_and_rollback(registry):
+    first = registry.load('v1')
+    second = registry.load('v2')
+    assert registry.status()['previous_versions'] == ['v1']
+
+    assert registry.rollback() == 'v1'
+    assert registry.snapshot() == ('v1', first)
+    assert registry.rollback() is None
+    assert second.warmed
+
+
+def test_history_is_bounded(registry):
+    for version in ['v1', 'v2', 'v3', 'v4']:
+        registry.load(version)
+
+    assert registry.status()['previous_versions'] == ['v3', 'v2']
+
+
+def test_failed_load_keeps_current_version(registry):
+    current = registry.load('v1')
+
+    with pytest.raises(RuntimeError):
+        registry.load('broken')
+
+    assert registry.snapshot() == ('v1', current)
+    assert registry.last_error.startswith('broken')
+
+
+def test_load_async_promotes_in_background(registry):
+    registry.load_async().result(timeout=5)
+
+    assert registry.version == 'v-latest'
+    assert registry.loading is None
+
+    with pytest.raises(RuntimeError):
+        registry.load_async('broken').result(timeout=5)
+    assert registry.version == 'v-latest' and registry.load_attempted
+
+
+def test_load_without_promote_returns_candidate(registry):
+    registry.load('v1')
+
+    candidate = registry.load('v2', promote=False)
+
+    assert candidate.warmed and registry.version == 'v1'
+
+
+def test_sync_swaps_kept_versions_and_loads_new_ones(registry):
+    first = registry.load('v1')
+    registry.load('v2')
+
+    assert registry.sync('v2') is False                  # 이미 서빙 중
+    assert registry.sync('v1') is True                   # 보관 버전은 즉시 교체
+    assert registry.snapshot() == ('v1', first)
+    assert registry.status()['previous_versions'] == ['v2']
+
+    assert registry.sync('v3') is True                   # 새 버전은 백그라운드 로드 후 승격
+    registry._executor.submit(lambda: None).result(timeout=5)
+    assert registry.version == 'v3'
+
+
+def test_sync_does_not_retry_a_failed_version(registry):
+    registry.load('v1')
+
+    assert registry.sync('broken') is True
+    registry._executor.submit(lambda: None).result(timeout=5)
+
+    assert registry.version == 'v1' and registry.last_error.startswith('broken')
+    assert registry.sync('broken') is False
+
+
+def test_workers_follow_the_serving_version_file(tmp_path):
+    """관리 API가 기록한 목표 버전을 모든 워커 레지스트리가 폴링해 따라감"""
+    version_file = ServingVersionFile(str(tmp_path / "SERVING"))
+    assert version_file.read() is None
+
+    workers = [ModelRegistry(_loader) for _ in range(3)]
+    for worker in workers:
+        worker.load('v1')
+        worker.follow(version_file, interval=0.01)
+
+    version_file.write('v2')
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and any(worker.version != 'v2' for worker in workers):
+        time.sleep(0.01)
+    assert [worker.version for worker in workers] == ['v2'] * 3
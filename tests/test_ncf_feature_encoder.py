@@ -0,0 +1,114 @@
+"""
+NCF 피처 인코더 테스트
+인코딩 종류별 변환, 미등록 라벨/결측 컬럼 처리, 상태 저장·복원, 카탈로그 → 차량 피처 변환 확인
+"""
+import json
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.ncf_feature_encoder import (
+    VEHICLE_FEATURE_SPECS, FeatureEncoder, FeatureSpec, catalog_to_vehicle_features
+)
+
+SPECS = [
+    FeatureSpec('price', 3000),
+    FeatureSpec('body_type', 0, 'label'),
+    FeatureSpec('hour', 12, 'bucket', edges=(6, 12, 18)),
+    FeatureSpec('auto', 1, 'binary'),
+    FeatureSpec('index', 0.5, 'passthrough'),
+]
+
+
+@pytest.fixture
+def train_df():
+    return pd.DataFrame({
+        'price': [1000, 2000, 3000, np.nan],
+        'body_type': ['suv', 'sedan', 'suv', 'hatchback'],
+        'hour': [0, 7, 13, 23],
+        'auto': [1, 0, 1, 1],
+        'index': [0.1, 0.2, 0.3, 0.4]
+    })
+
+
+def test_transform_encodes_each_kind(train_df):
+    encoder = FeatureEncoder(SPECS).fit(train_df)
+
+    out = encoder.transform(train_df)
+
+    prices = np.array([1000, 2000, 3000, 3000], dtype=np.float64)  # 결측은 기본값
+    assert out.dtype == np.float32 and out.flags['C_CONTIGUOUS'] and out.shape == (4, 5)
+    np.testing.assert_allclose(out[:, 0], (prices - prices.mean()) / prices.std(), rtol=1e-5)
+    np.testing.assert_allclose(out[:, 1], [3 / 3, 2 / 3, 3 / 3, 1 / 3])  # 어휘 정렬: hatchback, sedan, suv
+    np.testing.assert_allclose(out[:, 2], [0, 1 / 3, 2 / 3, 1])
+    np.testing.assert_allclose(out[:, 3:], train_df[['auto', 'index']].to_numpy(), rtol=1e-6)
+
+
+def test_unknown_labels_and_missing_columns_use_defaults(train_df):
+    """미등록 라벨은 경고 없이 0, 없는 컬럼은 기본값"""
+    encoder = FeatureEncoder(SPECS).fit(train_df)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        out = encoder.transform(pd.DataFrame({'body_type': ['truck', 'sedan', None]}))
+
+    np.testing.assert_allclose(out[:, 1], [0, 2 / 3, 0])
+    prices = np.array([1000, 2000, 3000, 3000], dtype=np.float64)
+    np.testing.assert_allclose(out[:, 0], (3000 - prices.mean()) / prices.std(), rtol=1e-5)
+    np.testing.assert_allclose(out[:, 3:], [[1, 0.5]] * 3)
+    np.testing.assert_allclose(out[:, 2], 2 / 3)
+
+
+def test_state_round_trip_through_json(train_df):
+    encoder = FeatureEncoder(SPECS).fit(train_df)
+
+    restored = FeatureEncoder.from_state(SPECS, json.loads(json.dumps(encoder.state())))
+
+    assert restored.fitted
+    np.testing.assert_array_equal(restored.transform(train_df), encoder.transform(train_df))
+    assert not FeatureEncoder.from_state(SPECS[:2], encoder.state()).fitted
+
+
+def test_unfitted_encoder_scales_by_defaults():
+    out = FeatureEncoder(SPECS).transform(pd.DataFrame({'price': [6000], 'body_type': ['suv']}))
+
+    assert out[0, 0] == pytest.approx(1.0) and out[0, 1] == 0.0
+
+
+def test_catalog_to_vehicle_features():
+    catalog = pd.read_csv(project_root / "data" / "ncf_vehicles.csv").iloc[:20]
+
+    features = catalog_to_vehicle_features(catalog)
+    encoded = FeatureEncoder(VEHICLE_FEATURE_SPECS).fit(features).transform(features)
+
+    assert features['vehicle_price'].tolist() == catalog['price'].tolist()
+    assert features['vehicle_body_type_code'].tolist() == catalog['body_type'].tolist()
+    assert features['vehicle_transmission_auto'].tolist() == catalog['transmission'].isin(['auto']).astype(float).tolist()
+    assert np.all(encoded[:, [spec.column for spec in VEHICLE_FEATURE_SPECS].index('vehicle_body_type_code')] > 0)
+
+
+def test_training_join_uses_catalog_vocabulary():
+    """vehicle_catalog로 훈련하면 차량 피처 테이블과 같은 어휘·인코딩"""
+    pytest.importorskip("tensorflow")
+    from models.ncf_car_recommendation import CarRecommendationNCF
+
+    catalog = pd.read_csv(project_root / "data" / "ncf_vehicles.csv")
+    interactions = pd.read_csv(project_root / "data" / "ncf_interactions.csv")
+    ncf = CarRecommendationNCF(num_users=200, num_vehicles=len(catalog))
+
+    training_data = ncf.prepare_training_data(interactions.assign(rating=interactions['rating'].fillna(0)),
+                                              vehicle_catalog=catalog)
+    table = ncf.load_vehicle_catalog(catalog)
+
+    body_types = ncf.vehicle_encoder.state()['stats']['vehicle_body_type_code']['vocabulary']
+    assert set(body_types) <= set(catalog['body_type'])
+    rows = training_data['vehicle_ids']
+    np.testing.assert_allclose(training_data['vehicle_features'], table.features[rows], rtol=1e-6)
@@ -0,0 +1,103 @@
+"""
+Keras NCF 추론 구성요소 테스트
+- 분해 추론기: .npz 왕복, Keras 모델(build_model)과의 점수 일치 (TensorFlow 필요)
+- 분해 추론기만 로드한 모델(pre-fork 워커)의 추천이 Keras 모델과 같은지 확인 (TensorFlow 필요)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.ncf_two_tower import TwoTowerScorer
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_csv(project_root / "data" / "ncf_vehicles.csv")
+
+
+def test_two_tower_only_model_matches_keras_model(catalog, tmp_path):
+    """load_two_tower_model은 Keras 모델 없이 load_model과 같은 추천을 반환"""
+    pytest.importorskip("tensorflow")
+    from models.ncf_car_recommendation import CarRecommendationNCF
+
+    ncf = CarRecommendationNCF(num_users=20, num_vehicles=len(catalog), embedding_dim=8, mlp_layers=[16, 8],
+                               vehicle_index=catalog['vehicle_id'].tolist())
+    ncf.build_model()
+    path = str(tmp_path / "model.weights.h5")
+    ncf.save_model(path)
+
+    keras_model, scorer_only = CarRecommendationNCF(), CarRecommendationNCF()
+    keras_model.load_model(path)
+    scorer_only.load_two_tower_model(path)
+    for model in (keras_model, scorer_only):
+        model.load_vehicle_catalog(catalog)
+        model.warmup()
+
+    assert scorer_only.model is None and scorer_only.is_loaded
+    user_dict = {'user_id': 'user_001', 'age': 35, 'income': 6000, 'budget_max': 4000}
+    expected = keras_model.get_recommendations(user_dict, 10)
+    served = scorer_only.get_recommendations(user_dict, 10)
+    assert [rec['vehicle_id'] for rec in served] == [rec['vehicle_id'] for rec in expected]
+    assert set(rec['vehicle_id'] for rec in served) <= set(catalog['vehicle_id'])
+    np.testing.assert_allclose([rec['score'] for rec in served], [rec['score'] for rec in expected], rtol=1e-5)
+
+
+def _random_scorer(rng, n_users=20, n_vehicles=30, embedding_dim=8, user_dim=10, vehicle_dim=15, context_dim=5):
+    layer_sizes = [2 * embedding_dim + user_dim + vehicle_dim + context_dim, 16, 8]
+    mlp_layers = [(rng.standard_normal((a, b)), rng.standard_normal(b)) for a, b in zip(layer_sizes, layer_sizes[1:])]
+    return TwoTowerScorer(
+        user_gmf=rng.standard_normal((n_users, embedding_dim)), vehicle_gmf=rng.standard_normal((n_vehicles, embedding_dim)),
+        user_mlp=rng.standard_normal((n_users, embedding_dim)), vehicle_mlp=rng.standard_normal((n_vehicles, embedding_dim)),
+        mlp_layers=mlp_layers, prediction=(rng.standard_normal((embedding_dim + 8, 1)), rng.standard_normal(1)),
+        user_feature_dim=user_dim, vehicle_feature_dim=vehicle_dim
+    )
+
+
+def test_two_tower_save_load_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    scorer = _random_scorer(rng)
+    features = rng.standard_normal((30, 15))
+    user_features, context = rng.standard_normal(10), rng.standard_normal(5)
+
+    scorer.save(str(tmp_path / "model_two_tower.npz"))
+    loaded = TwoTowerScorer.load(str(tmp_path / "model_two_tower.npz"))
+    for model in (scorer, loaded):
+        model.cache_vehicles(np.arange(30), features, cache_key=1)
+
+    np.testing.assert_array_equal(loaded.score(3, user_features, context), scorer.score(3, user_features, context))
+    np.testing.assert_array_equal(loaded.score(3, user_features, context, np.array([4, 2])),
+                                  scorer.score(3, user_features, context)[[4, 2]])
+
+
+def test_two_tower_matches_keras_model():
+    """분해 추론 점수 = build_model로 만든 Keras 모델 점수 (추론 시 Dropout 비활성)"""
+    pytest.importorskip("tensorflow")
+    from models.ncf_car_recommendation import CarRecommendationNCF
+
+    ncf = CarRecommendationNCF(num_users=20, num_vehicles=30, embedding_dim=8, mlp_layers=[16, 8])
+    ncf.build_model()
+    scorer = ncf.build_two_tower()
+
+    rng = np.random.default_rng(0)
+    vehicle_ids = np.arange(30)
+    vehicle_features = rng.standard_normal((30, ncf.vehicle_feature_dim)).astype(np.float32)
+    user_features = rng.standard_normal(ncf.user_feature_dim).astype(np.float32)
+    context = rng.standard_normal(ncf.context_feature_dim).astype(np.float32)
+    scorer.cache_vehicles(vehicle_ids, vehicle_features)
+
+    keras_scores = ncf.model({
+        'user_id': np.full(30, 7, dtype=np.int32),
+        'vehicle_id': vehicle_ids.astype(np.int32),
+        'user_features': np.tile(user_features, (30, 1)),
+        'vehicle_features': vehicle_features,
+        'context_features': np.tile(context, (30, 1))
+    }, training=False).numpy().ravel()
+
+    np.testing.assert_allclose(scorer.score(7, user_features, context), keras_scores, rtol=1e-4, atol=1e-5)
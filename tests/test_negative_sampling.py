@@ -0,0 +1,56 @@
+"""
+부정 샘플링 테스트
+긍정 차량 회피, 행 내 중복 없음, 부정 후보가 부족한 사용자 제외, alias 테이블 분포 확인
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.negative_sampling import NegativeSampler, build_alias_table
+
+
+def test_samples_avoid_positives_and_repeat_within_row():
+    np.random.seed(0)
+    rng = np.random.default_rng(0)
+    user_idx = rng.integers(0, 50, 2000)
+    item_idx = rng.integers(0, 30, 2000)
+    sampler = NegativeSampler(user_idx, item_idx, n_items=30)
+
+    rows, items = sampler.sample(user_idx, ratio=4)
+
+    positives = set(zip(user_idx.tolist(), item_idx.tolist()))
+    assert not any((user, item) in positives for user, item in zip(user_idx[rows].tolist(), items.tolist()))
+    per_row = items.reshape(-1, 4)
+    assert all(len(set(row)) == 4 for row in per_row.tolist())
+
+
+def test_users_without_enough_negatives_are_skipped():
+    """긍정 차량을 빼고 ratio개가 안 남는 사용자 행은 제외, 거의 다 본 사용자는 여집합에서 추출"""
+    np.random.seed(0)
+    n_items = 10
+    user_idx = np.array([0] * 9 + [1] * 6 + [2])
+    item_idx = np.concatenate([np.arange(9), np.arange(6), [0]])
+    sampler = NegativeSampler(user_idx, item_idx, n_items)
+
+    rows, items = sampler.sample(np.array([0, 1, 2]), ratio=4)
+
+    assert sorted(set(rows.tolist())) == [1, 2]
+    assert sorted(items[rows == 1].tolist()) == [6, 7, 8, 9]
+    assert 0 not in items[rows == 2]
+
+
+def test_alias_table_follows_weights():
+    np.random.seed(0)
+    weights = np.array([1.0, 2.0, 3.0, 4.0])
+    prob, alias = build_alias_table(weights)
+    sampler = NegativeSampler(np.array([], dtype=np.int64), np.array([], dtype=np.int64), 4, weights)
+
+    draws = sampler._draw(200000)
+
+    np.testing.assert_allclose(np.bincount(draws, minlength=4) / len(draws), weights / weights.sum(), atol=0.01)
+    assert np.all((prob >= 0) & (prob <= 1)) and np.all((alias >= 0) & (alias < 4))
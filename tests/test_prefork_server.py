@@ -0,0 +1,71 @@
+"""
+Pre-fork 서빙 워커 재시작 정책 테스트
+재시작 지연 지수 백오프, 정상 가동 후 초기화, 종료율 제한 시 부모 종료 확인
+"""
+import gc
+import signal
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("uvicorn")
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services import prefork_server
+from services.prefork_server import RestartPolicy, serve_prefork
+
+
+def test_restart_delay_backs_off_and_resets_after_healthy_uptime():
+    policy = RestartPolicy(base_delay=0.5, max_delay=3.0, max_crashes=100, window=60.0, healthy_uptime=30.0)
+
+    delays = [policy.record_exit(uptime=1.0, now=float(t)) for t in range(5)]
+    assert delays == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+    assert policy.record_exit(uptime=120.0, now=10.0) == 0.5
+    assert policy.record_exit(uptime=1.0, now=11.0) == 1.0
+
+
+def test_crash_rate_limit_counts_only_recent_exits():
+    policy = RestartPolicy(max_crashes=3, window=10.0)
+
+    assert all(policy.record_exit(uptime=0.0, now=t) is not None for t in [0.0, 1.0, 2.0])
+    assert policy.record_exit(uptime=0.0, now=3.0) is None
+    assert policy.record_exit(uptime=0.0, now=30.0) is not None
+
+
+def test_serve_prefork_gives_up_on_crashing_workers(monkeypatch):
+    """시작하자마자 실패하는 워커는 종료율 제한까지만 재시작하고 부모는 SystemExit(1)"""
+    spawned = []
+
+    def failing_worker(app, sock, log_level):
+        raise RuntimeError("bad artifact path")
+
+    monkeypatch.setattr(prefork_server, "_run_worker", failing_worker)
+    monkeypatch.setattr(prefork_server.os, "fork", _counting_fork(spawned))
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        with pytest.raises(SystemExit) as exc_info:
+            serve_prefork(None, host="127.0.0.1", port=0, workers=2,
+                          restart_policy=RestartPolicy(base_delay=0.01, max_delay=0.05, max_crashes=3, window=60.0))
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+        gc.unfreeze()
+
+    assert exc_info.value.code == 1
+    assert len(spawned) == 2 + 3  # 최초 2개 + 제한(3회)까지의 재시작
+
+
+def _counting_fork(spawned):
+    real_fork = prefork_server.os.fork
+
+    def fork():
+        pid = real_fork()
+        if pid:
+            spawned.append(pid)
+        return pid
+    return fork
@@ -0,0 +1,105 @@
+"""
+int8 양자화 임베딩 테스트
+근사 내적 오차, 정확한 벡터 재순위, 양자화 IVF / Top-k 이웃 인덱스가 전수 검색과 같은 결과를 내는지 확인
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.ann_index import IVFIndex
+from models.quantization import Int8Embeddings, rerank
+from models.real_ncf_engine import TopKNeighborIndex
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    """군집 구조가 있는 임베딩 (중심 20개 주변에 2000개)"""
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 32))
+    return (centers[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 32))).astype(np.float32)
+
+
+def test_int8_scores_approximate_inner_products(vectors):
+    codes = Int8Embeddings.quantize(vectors)
+    queries = vectors[:10]
+
+    approx = codes.scores(queries)
+    exact = queries @ vectors.T
+
+    assert codes.codes.dtype == np.int8
+    assert np.abs(approx - exact).max() <= 0.02 * np.abs(exact).max()
+
+
+def test_quantize_rows_matches_quantize(vectors):
+    expected = Int8Embeddings.quantize(vectors)
+
+    codes = Int8Embeddings.quantize_rows(lambda rows: vectors[rows], len(vectors), vectors.shape[1], block_rows=300)
+
+    np.testing.assert_array_equal(codes.scale, expected.scale)
+    np.testing.assert_array_equal(codes.codes, expected.codes)
+
+
+def test_rerank_uses_exact_vectors_and_marks_empty_slots(vectors):
+    queries = vectors[:2]
+    candidates = np.array([[5, 1, 0, -1], [9, 8, -1, -1]])
+
+    positions, sims = rerank(queries, candidates, lambda rows: vectors[rows], k=3)
+
+    for q, row in enumerate(candidates):
+        valid = row[row >= 0]
+        expected = valid[np.argsort(-(vectors[valid] @ queries[q]), kind='stable')][:3]
+        np.testing.assert_array_equal(positions[q, :len(expected)], expected)
+    assert positions[1, 2] == -1 and np.isneginf(sims[1, 2])
+
+
+def test_quantized_ivf_full_probe_matches_exact_search(vectors):
+    """n_probe = n_lists면 재순위로 전수 검색과 같은 Top-k"""
+    index = IVFIndex(n_lists=16, quantize=True).build(vectors)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized[:50] @ normalized.T), axis=1, kind='stable')[:, :10]
+
+    positions, sims = index.query_batch(vectors[:50], k=10, n_probe=16)
+
+    np.testing.assert_array_equal(np.sort(positions, axis=1), np.sort(expected, axis=1))
+    assert np.all(np.diff(sims, axis=1) <= 1e-6)
+    assert index.estimate_recall(k=10, n_probe=8) >= 0.9
+
+
+def test_quantized_neighbor_index_matches_exact_build(vectors):
+    """TopKNeighborIndex(quantize=True)는 정확한 유사도로 재순위한 이웃 (전수 계산과 거의 같은 집합)"""
+    exact = TopKNeighborIndex(k=20).build(vectors)
+    quantized = TopKNeighborIndex(k=20, quantize=True, memory_budget_mb=1).build(vectors)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    overlap = []
+    for row in range(len(vectors)):
+        exact_ids, _ = exact.neighbors(row)
+        ids, sims = quantized.neighbors(row)
+        assert row not in ids and len(ids) == 20
+        np.testing.assert_allclose(sims, normalized[ids] @ normalized[row], rtol=1e-4, atol=1e-5)
+        assert np.all(np.diff(sims) <= 1e-6)
+        overlap.append(len(set(ids) & set(exact_ids)) / 20)
+
+    assert np.mean(overlap) >= 0.99
+
+
+def test_quantized_neighbor_query_does_not_copy_normalized_embeddings():
+    """int8 이웃 계산의 최대 메모리는 int8 코드 + 블록 버퍼 수준 (정규화 float32 전체 사본 한 벌보다 작음)"""
+    embeddings = np.random.default_rng(1).standard_normal((200000, 16)).astype(np.float32)
+    index = TopKNeighborIndex(k=10, quantize=True, memory_budget_mb=1)
+
+    tracemalloc.start()
+    try:
+        index._query_quantized(embeddings, np.arange(10))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < embeddings.nbytes
@@ -0,0 +1,309 @@
+"""
+RealNCFEngine 동작 테스트
+data/ncf_*.csv 복사본으로 엔진을 훈련해 단건/배치 경로 결과를 비교
+"""
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.real_ncf_engine import INTERACTION_SCORES, RealNCFEngine
+
+DATA_FILES = ['ncf_vehicles.csv', 'ncf_users.csv', 'ncf_interactions.csv']
+
+
+@pytest.fixture(scope="module")
+def data_path(tmp_path_factory):
+    """원본 데이터를 임시 디렉토리로 복사 (캐시/아티팩트가 저장소에 남지 않도록)"""
+    path = tmp_path_factory.mktemp("ncf_data")
+    for name in DATA_FILES:
+        shutil.copy(project_root / "data" / name, path / name)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def engine(data_path):
+    return RealNCFEngine(data_path=data_path)
+
+
+def _summary(recommendations):
+    return [(rec['vehicle_id'], rec['algorithm']) for rec in recommendations]
+
+
+@pytest.mark.parametrize("algorithm", ['hybrid', 'user_based', 'item_based', 'popularity'])
+@pytest.mark.parametrize("request_filter", [{}, {'budget_max': 3000}, {'budget_min': 2000, 'fuel_types': ['gasoline', 'hybrid']}])
+def test_batch_matches_single_path(engine, algorithm, request_filter):
+    """get_recommendations_many는 요청별 get_recommendations와 같은 차량/순서/점수 (경계 동점 포함)"""
+    user_dicts = [{'user_id': user_id, **request_filter} for user_id in list(engine.user_ids) + ['unknown_user']]
+
+    batch = engine.get_recommendations_many(user_dicts, 10, algorithm)
+
+    for user_dict, batch_recs in zip(user_dicts, batch):
+        single_recs = engine.get_recommendations(user_dict, 10, algorithm)
+        assert _summary(batch_recs) == _summary(single_recs), user_dict['user_id']
+        assert [rec['score'] for rec in batch_recs] == pytest.approx([rec['score'] for rec in single_recs], abs=1e-6)
+
+
+CONSTRAINTS = [
+    {'budget_max': 2000},
+    {'budget_min': 2500, 'budget_max': 4000},
+    {'fuel_types': ['electric']},
+    {'body_types': ['suv', 'coupe']},
+    {'budget_min': 1500, 'fuel_types': ['hybrid', 'diesel'], 'body_types': ['sedan', 'wagon']},
+]
+NOTHING_ELIGIBLE = [{'fuel_types': ['hydrogen']}, {'budget_min': 5000, 'budget_max': 1000}]
+
+
+def _meets(vehicle, request_filter):
+    return (vehicle['price'] >= request_filter.get('budget_min', -np.inf)
+            and vehicle['price'] <= request_filter.get('budget_max', np.inf)
+            and vehicle['fuel_type'] in request_filter.get('fuel_types', [vehicle['fuel_type']])
+            and vehicle['body_type'] in request_filter.get('body_types', [vehicle['body_type']]))
+
+
+@pytest.mark.parametrize("algorithm", ['hybrid', 'user_based', 'item_based', 'popularity'])
+@pytest.mark.parametrize("path", ['single', 'many', 'batch'])
+@pytest.mark.parametrize("request_filter", CONSTRAINTS + NOTHING_ELIGIBLE)
+def test_recommendations_meet_request_constraints(engine, algorithm, path, request_filter):
+    """예산/연료/차종 조건이 있으면 조건을 만족하는 차량만 추천 (후보가 없으면 빈 결과)"""
+    vehicles = engine.vehicles_df.set_index('vehicle_id')
+    user_ids = list(engine.user_ids[:30]) + ['unknown_user']
+
+    if path == 'batch':
+        eligible = [engine.select_candidates(**request_filter)] * len(user_ids)
+        result = engine.get_recommendations_batch(user_ids, 10, algorithm, eligible=eligible)
+        served = [[vehicle_id for vehicle_id in row if vehicle_id is not None] for row in result['vehicle_ids']]
+    else:
+        user_dicts = [{'user_id': user_id, **request_filter} for user_id in user_ids]
+        if path == 'many':
+            recommendations = engine.get_recommendations_many(user_dicts, 10, algorithm)
+        else:
+            recommendations = [engine.get_recommendations(user_dict, 10, algorithm) for user_dict in user_dicts]
+        served = [[rec['vehicle_id'] for rec in recs] for recs in recommendations]
+
+    if request_filter in NOTHING_ELIGIBLE:
+        assert served == [[]] * len(user_ids)
+        return
+    assert any(served)
+    for vehicle_ids in served:
+        assert all(_meets(vehicles.loc[vehicle_id], request_filter) for vehicle_id in vehicle_ids), vehicle_ids
+
+
+def _live_recommendations(engine, user_ids, algorithm, n=10):
+    """사전 계산 테이블을 거치지 않은 실시간 추천"""
+    store, engine.topn_store = engine.topn_store, None
+    try:
+        return [engine.get_recommendations({'user_id': user_id}, n, algorithm) for user_id in user_ids]
+    finally:
+        engine.topn_store = store
+
+
+def test_precomputed_store_follows_decay_clock(data_path):
+    """사전 계산 Top-N은 모든 n ≤ 테이블 폭에서 실시간 결과와 같고, 감쇠 기준 시각이 바뀌면 실시간 계산으로 넘어감"""
+    engine = RealNCFEngine(data_path=data_path, precompute_top_n=10, decay_half_life_days=30)
+    user_ids = list(engine.user_ids[:20])
+
+    for algorithm in ['hybrid', 'user_based', 'item_based']:
+        for n in [1, 3, 5, 10]:
+            served = [engine.get_recommendations({'user_id': user_id}, n, algorithm) for user_id in user_ids]
+            live = _live_recommendations(engine, user_ids, algorithm, n)
+            assert [_summary(recs) for recs in served] == [_summary(recs) for recs in live], (algorithm, n)
+            served_many = engine.get_recommendations_many([{'user_id': user_id} for user_id in user_ids], n, algorithm)
+            assert [_summary(recs) for recs in served_many] == [_summary(recs) for recs in live], (algorithm, n)
+
+    # 한 사용자의 새 상호작용으로 기준 시각이 1년 이동 → 모든 사용자의 감쇠 점수가 바뀜
+    latest = engine.interactions_df['timestamp'].max() + pd.Timedelta(days=365)
+    engine.apply_interactions([{'user_id': user_ids[0], 'vehicle_id': engine.vehicle_ids[0],
+                                'interaction_type': 'view', 'timestamp': latest}])
+
+    assert engine.topn_store.lookup(1, 'hybrid', 10, engine.decay_clock) is None
+    served = [engine.get_recommendations({'user_id': user_id}, 10, 'hybrid') for user_id in user_ids]
+    assert served == _live_recommendations(engine, user_ids, 'hybrid')
+
+
+def test_interaction_matrix_matches_dense_construction(engine):
+    """CSR 상호작용 행렬 = 상호작용별 최대 점수를 채운 밀집 행렬 (감쇠 미사용)"""
+    scores = {'view': 1, 'like': 2, 'inquiry': 3, 'favorite': 4, 'purchase': 5}
+    dense = np.zeros(engine.user_item_matrix.shape)
+    for row in engine.interactions_df.itertuples():
+        user_idx, vehicle_idx = engine.user_to_idx.get(row.user_id), engine.vehicle_to_idx.get(row.vehicle_id)
+        if user_idx is not None and vehicle_idx is not None:
+            dense[user_idx, vehicle_idx] = max(dense[user_idx, vehicle_idx], scores.get(row.interaction_type, 1))
+
+    np.testing.assert_array_equal(engine.user_item_matrix.toarray(), dense)
+
+
+def test_artifact_reused_only_with_same_training_config(data_path, tmp_path):
+    """저장된 아티팩트는 같은 설정이면 재사용, 이웃 수(k)가 다르면 재훈련"""
+    artifact_path = str(tmp_path / "artifacts")
+    trained = RealNCFEngine(data_path=data_path, n_neighbors=10, artifact_path=artifact_path)
+
+    reused = RealNCFEngine(data_path=data_path, n_neighbors=10, artifact_path=artifact_path)
+    retrained = RealNCFEngine(data_path=data_path, n_neighbors=20, artifact_path=artifact_path)
+
+    assert reused.artifact_version == trained.artifact_version
+    assert retrained.artifact_version != trained.artifact_version
+    assert retrained.user_neighbors.k == retrained.item_neighbors.k == 20
+
+
+def _truncate(path):
+    with open(path, 'r+b') as f:
+        f.truncate(path.stat().st_size // 2)
+
+
+def _drop_manifest_key(path, key):
+    manifest = json.loads(path.read_text())
+    del manifest[key]
+    path.write_text(json.dumps(manifest))
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda version_dir: _truncate(version_dir / 'manifest.json'),            # 잘린 manifest (JSONDecodeError)
+    lambda version_dir: (version_dir / 'item_embeddings.npy').unlink(),      # 누락된 배열
+    lambda version_dir: _truncate(version_dir / 'user_neighbors_data.npy'),  # 잘린 배열
+    lambda version_dir: _drop_manifest_key(version_dir / 'manifest.json', 'n_neighbors'),
+], ids=['truncated_manifest', 'missing_npy', 'truncated_npy', 'missing_key'])
+def test_corrupt_artifact_falls_back_to_retraining(data_path, tmp_path, corrupt):
+    """손상된 아티팩트는 예외 없이 무시되고 재훈련 후 새 버전으로 저장"""
+    artifact_path = tmp_path / "artifacts"
+    trained = RealNCFEngine(data_path=data_path, artifact_path=str(artifact_path))
+    corrupt(artifact_path / trained.artifact_version)
+
+    assert not RealNCFEngine(data_path=data_path).load_artifacts(str(artifact_path))
+    retrained = RealNCFEngine(data_path=data_path, artifact_path=str(artifact_path))
+
+    assert retrained.is_trained
+    assert retrained.artifact_version != trained.artifact_version
+    assert _summary(retrained.get_recommendations({'user_id': retrained.user_ids[0]})) == \
+        _summary(trained.get_recommendations({'user_id': trained.user_ids[0]}))
+
+
+@pytest.mark.parametrize("factorization", ['nmf', 'als'])
+def test_fold_in_new_user(data_path, factorization):
+    """apply_interactions로 추가된 신규 사용자는 재훈련 없이 임베딩을 얻고 본 차량을 제외한 개인화 추천을 받음"""
+    engine = RealNCFEngine(data_path=data_path, factorization=factorization)
+    seen = list(engine.vehicle_ids[:3])
+
+    stats = engine.apply_interactions([{'user_id': 'new_user', 'vehicle_id': vehicle_id, 'interaction_type': 'purchase'}
+                                       for vehicle_id in seen])
+
+    assert stats == {'applied': 3, 'skipped': 0, 'new_users': 1, 'updated_users': 1}
+    user_idx = engine.user_to_idx['new_user']
+    assert engine.user_item_matrix.shape[0] == len(engine.user_ids) == len(engine.user_embeddings)
+    assert sorted(engine.user_item_matrix[user_idx].indices.tolist()) == sorted(engine.vehicle_to_idx[v] for v in seen)
+    assert np.abs(engine.user_embeddings[user_idx]).sum() > 0
+
+    for algorithm in ['hybrid', 'user_based', 'item_based']:
+        recommendations = engine.get_recommendations({'user_id': 'new_user'}, 10, algorithm)
+        cold = engine.get_recommendations({'user_id': 'unknown_user'}, 10, algorithm)
+        assert recommendations
+        assert not set(seen) & {rec['vehicle_id'] for rec in recommendations}
+        assert all(rec['algorithm'] != 'Popularity-Based' for rec in recommendations), algorithm
+        assert _summary(recommendations) != _summary(cold), algorithm
+
+
+def test_apply_interactions_updates_existing_user_and_skips_unknown_vehicles(data_path):
+    """기존 사용자는 더 높은 점수만 반영되고 나머지 사용자 임베딩은 그대로, 학습되지 않은 차량은 건너뜀"""
+    engine = RealNCFEngine(data_path=data_path)
+    user_id = engine.user_ids[0]
+    vehicle_id = engine.vehicle_ids[-1]
+    user_idx, vehicle_idx = engine.user_to_idx[user_id], engine.vehicle_to_idx[vehicle_id]
+    before = np.array(engine.user_embeddings)
+
+    stats = engine.apply_interactions(pd.DataFrame({
+        'user_id': [user_id, user_id, user_id],
+        'vehicle_id': [vehicle_id, vehicle_id, 'unknown_vehicle'],
+        'interaction_type': ['view', 'favorite', 'purchase']
+    }))
+
+    assert stats == {'applied': 2, 'skipped': 1, 'new_users': 0, 'updated_users': 1}
+    assert engine.user_item_matrix[user_idx, vehicle_idx] >= 4
+    np.testing.assert_array_equal(np.delete(engine.user_embeddings, user_idx, axis=0), np.delete(before, user_idx, axis=0))
+
+
+def test_apply_interactions_empty_batch(engine):
+    empty = {'applied': 0, 'skipped': 0, 'new_users': 0, 'updated_users': 0}
+
+    assert engine.apply_interactions([]) == empty
+    assert engine.apply_interactions(pd.DataFrame(columns=['user_id', 'vehicle_id', 'interaction_type'])) == empty
+
+
+@pytest.fixture(scope="module")
+def decayed_engine(data_path):
+    return RealNCFEngine(data_path=data_path, decay_half_life_days=30)
+
+
+def test_decayed_matrix_matches_per_event_weights(decayed_engine):
+    """저장값 × 전역 감쇠 계수 = 쌍별 최대 score · 2^(-(기준 시각 - t) / 반감기)"""
+    engine = decayed_engine
+    df = engine.interactions_df
+    seconds = df['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+    scores = np.array([INTERACTION_SCORES.get(t, 1) for t in df['interaction_type']])
+    expected = pd.DataFrame({
+        'u': [engine.user_to_idx[u] for u in df['user_id']],
+        'v': [engine.vehicle_to_idx[v] for v in df['vehicle_id']],
+        'w': scores * 0.5 ** ((engine.decay_clock - seconds) / (30 * 86400.0))
+    }).groupby(['u', 'v'])['w'].max()
+
+    actual = engine.user_item_matrix.tocoo()
+    actual = pd.Series(actual.data * engine.decay_factor, index=pd.MultiIndex.from_arrays([actual.row, actual.col]))
+
+    assert engine.decay_clock == seconds.max()
+    np.testing.assert_allclose(actual.sort_index().to_numpy(), expected.sort_index().to_numpy(), rtol=1e-5)
+
+
+def test_decay_clock_moves_lazily_and_rescales(data_path):
+    """새 이벤트는 전역 감쇠 계수만 바꾸고, 부풀림이 임계값을 넘으면 저장값을 한 번 재조정"""
+    engine = RealNCFEngine(data_path=data_path, decay_half_life_days=30)
+    user_id, vehicle_id = engine.user_ids[0], engine.vehicle_ids[0]
+    start = pd.Timestamp(engine.decay_clock, unit='s')
+    effective = engine.user_item_matrix.toarray() * engine.decay_factor
+    stored = engine.user_item_matrix.data.copy()
+
+    engine.apply_interactions([{'user_id': user_id, 'vehicle_id': vehicle_id, 'interaction_type': 'view',
+                                'timestamp': start + pd.Timedelta(days=30)}])
+
+    assert engine.decay_factor == pytest.approx(0.5)
+    # (0, 0) 쌍은 CSR 첫 항목 - 나머지 저장값은 그대로
+    np.testing.assert_array_equal(np.delete(engine.user_item_matrix.data, 0), np.delete(stored, 0))
+
+    engine.apply_interactions([{'user_id': user_id, 'vehicle_id': vehicle_id, 'interaction_type': 'view',
+                                'timestamp': start + pd.Timedelta(days=30 * 20)}])
+
+    assert engine.decay_epoch == engine.decay_clock and engine.decay_factor == 1.0
+    rescaled = engine.user_item_matrix.toarray()
+    mask = np.ones_like(rescaled, dtype=bool)
+    mask[engine.user_to_idx[user_id], engine.vehicle_to_idx[vehicle_id]] = False
+    np.testing.assert_allclose(rescaled[mask], effective[mask] * 0.5 ** 20, rtol=1e-4)
+
+
+def test_also_viewed_ready_after_training_and_artifact_load(data_path, tmp_path):
+    """세션 동시 출현 모델은 첫 요청 전에 (훈련 또는 아티팩트 로드 시) 구축됨"""
+    artifact_path = str(tmp_path / "artifacts")
+    trained = RealNCFEngine(data_path=data_path, artifact_path=artifact_path)
+    loaded = RealNCFEngine(data_path=data_path, artifact_path=artifact_path)
+    vehicle_id = next(v for v in trained.vehicle_ids if trained.session_model.also_viewed(v)[0])
+
+    for engine in (trained, loaded):
+        assert engine.session_model is not None and len(engine.session_model) > 0
+    assert loaded.artifact_version == trained.artifact_version
+    recommendations = loaded.get_also_viewed(vehicle_id, 5)
+    assert recommendations and all(rec['algorithm'] == 'Also Viewed' for rec in recommendations)
+    assert _summary(recommendations) == _summary(trained.get_also_viewed(vehicle_id, 5))
+
+
+def test_quantized_item_neighbors_below_ann_threshold(data_path, engine):
+    """quantize_embeddings는 IVF 임계값 미만 카탈로그의 차량 이웃 계산에도 적용"""
+    quantized = RealNCFEngine(data_path=data_path, quantize_embeddings=True)
+
+    assert len(quantized.vehicle_ids) < quantized.ann_threshold
+    assert quantized.item_neighbors.quantize and not engine.item_neighbors.quantize
+    assert quantized.get_recommendations({'user_id': quantized.user_ids[0]}, 10, 'item_based')
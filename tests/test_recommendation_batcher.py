@@ -0,0 +1,150 @@
+"""
+추천 마이크로배처 테스트
+동시 요청이 한 배치로 묶이는지, 결과 순서와 예외 전파, 최대 배치 크기 확인
+limit이 섞인 배치의 결과가 단건 요청과 같은지 확인 (data/ncf_*.csv로 엔진 훈련)
+"""
+import asyncio
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from services.recommendation_batcher import RecommendationBatcher, run_grouped
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_requests_share_one_batch():
+    batches = []
+
+    def batch_fn(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = RecommendationBatcher(batch_fn, max_batch_size=16, max_wait_ms=20)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            batcher.shutdown()
+
+    results = _run(scenario())
+
+    assert [result for result, _ in results] == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+    timing = results[0][1]
+    assert timing['batch_size'] == 5 and timing['queue_wait_ms'] >= 0 and timing['compute_ms'] >= 0
+
+
+def test_batches_are_capped_and_run_off_the_event_loop():
+    threads, sizes = set(), []
+
+    def batch_fn(items):
+        threads.add(threading.current_thread().name)
+        sizes.append(len(items))
+        return items
+
+    async def scenario():
+        batcher = RecommendationBatcher(batch_fn, max_batch_size=3, max_wait_ms=20)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        finally:
+            batcher.shutdown()
+
+    results = _run(scenario())
+
+    assert [result for result, _ in results] == list(range(7))
+    assert max(sizes) <= 3 and sum(sizes) == 7
+    assert threading.main_thread().name not in threads
+
+
+def test_batch_errors_reach_every_request():
+    def batch_fn(items):
+        raise ValueError("scoring failed")
+
+    async def scenario():
+        batcher = RecommendationBatcher(batch_fn, max_wait_ms=5)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            batcher.shutdown()
+
+    results = _run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_batcher_keeps_serving_after_an_error():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise ValueError("first batch fails")
+        return items
+
+    async def scenario():
+        batcher = RecommendationBatcher(batch_fn, max_wait_ms=1)
+        try:
+            with pytest.raises(ValueError):
+                await batcher.submit('a')
+            return await batcher.submit('b')
+        finally:
+            batcher.shutdown()
+
+    result, _ = _run(scenario())
+
+    assert result == 'b'
+
+
+def test_run_grouped_calls_once_per_key_in_request_order():
+    calls = []
+
+    def batch_fn(key, group):
+        calls.append((key, list(group)))
+        return [f"{key}:{item}" for item in group]
+
+    results = run_grouped(['a1', 'b1', 'a2', 'c1', 'b2'], lambda item: item[0], batch_fn)
+
+    assert results == ['a:a1', 'b:b1', 'a:a2', 'c:c1', 'b:b2']
+    assert calls == [('a', ['a1', 'a2']), ('b', ['b1', 'b2']), ('c', ['c1'])]
+
+
+def test_mixed_limits_match_single_requests(tmp_path):
+    """limit이 다른 요청이 같은 배치에 섞여도 각 결과는 단건 요청과 같음"""
+    from models.real_ncf_engine import RealNCFEngine
+
+    for name in ['ncf_vehicles.csv', 'ncf_users.csv', 'ncf_interactions.csv']:
+        shutil.copy(project_root / "data" / name, tmp_path / name)
+    engine = RealNCFEngine(data_path=str(tmp_path))
+
+    def batch_fn(items):
+        def score(limit, group):
+            return engine.get_recommendations_many([item['user_dict'] for item in group], n_recommendations=limit)
+        return run_grouped(items, lambda item: item['limit'], score)
+
+    items = [{'user_dict': {'user_id': user_id}, 'limit': limit}
+             for user_id in engine.user_ids[:12] for limit in (3, 20)]
+
+    async def scenario():
+        batcher = RecommendationBatcher(batch_fn, max_batch_size=len(items), max_wait_ms=20)
+        try:
+            return await asyncio.gather(*(batcher.submit(item) for item in items))
+        finally:
+            batcher.shutdown()
+
+    results = _run(scenario())
+
+    assert max(timing['batch_size'] for _, timing in results) > 1
+    for item, (result, _) in zip(items, results):
+        single = engine.get_recommendations(item['user_dict'], item['limit'])
+        assert [rec['vehicle_id'] for rec in result] == [rec['vehicle_id'] for rec in single]
+        assert [rec['score'] for rec in result] == pytest.approx([rec['score'] for rec in single], abs=1e-6)
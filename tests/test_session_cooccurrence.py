@@ -0,0 +1,89 @@
+"""
+세션 동시 출현 모델 테스트
+전수 계산과의 횟수 일치, 배치 분할(세션이 배치를 넘는 경우 포함), Top-k 순서와 조회 조건 확인
+"""
+import sys
+from itertools import permutations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.session_cooccurrence import SessionCooccurrenceModel
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'session_id': [f"s{i}" for i in rng.integers(0, 80, 600)],
+        'vehicle_id': [f"car_{i:03d}" for i in rng.integers(0, 40, 600)]
+    })
+
+
+def _pair_counts(sessions):
+    """세션별 서로 다른 차량 순서쌍 횟수 (전수 계산)"""
+    counts = {}
+    for _, items in sessions.drop_duplicates().groupby('session_id')['vehicle_id']:
+        for pair in permutations(items.unique(), 2):
+            counts[pair] = counts.get(pair, 0) + 1
+    return counts
+
+
+def _model_counts(model):
+    coo = model.counts.tocoo()
+    return {(model.item_ids[r], model.item_ids[c]): v for r, c, v in zip(coo.row, coo.col, coo.data)}
+
+
+def test_counts_match_brute_force(sessions):
+    model = SessionCooccurrenceModel()
+
+    model.update(sessions)
+
+    assert _model_counts(model) == _pair_counts(sessions)
+
+
+def test_batched_updates_match_single_update(sessions):
+    """배치를 나눠 넣어도 (같은 세션이 여러 배치에 걸쳐도) 한 번에 넣은 결과와 같음"""
+    single, batched = SessionCooccurrenceModel(k=5), SessionCooccurrenceModel(k=5)
+    single.update(sessions)
+
+    for batch in np.array_split(np.arange(len(sessions)), 7):
+        batched.update(sessions.iloc[batch])
+
+    assert _model_counts(batched) == _model_counts(single)
+    for vehicle_id in single.item_ids:
+        ids, counts = single.also_viewed(vehicle_id, 5)
+        batched_ids, batched_counts = batched.also_viewed(vehicle_id, 5)
+        assert batched_ids == ids and batched_counts.tolist() == counts.tolist()
+
+
+def test_also_viewed_orders_by_count_then_index():
+    model = SessionCooccurrenceModel(k=3)
+    model.update(pd.DataFrame({
+        'session_id': ['a', 'a', 'a', 'b', 'b', 'c', 'c', 'c'],
+        'vehicle_id': ['x', 'y', 'z', 'x', 'z', 'x', 'w', 'y']
+    }))
+
+    ids, counts = model.also_viewed('x', 10)
+
+    assert ids == ['y', 'z', 'w'] and counts.tolist() == [2, 2, 1]
+    assert model.also_viewed('x', 1)[0] == ['y']
+    assert model.also_viewed('x', 10, exclude=['y'])[0] == ['z', 'w']
+    assert model.also_viewed('unknown')[0] == []
+
+
+def test_session_item_cap_spans_batches():
+    """세션당 max_session_items개 이후의 차량은 이전 배치 차량을 포함해 세어 제외"""
+    model = SessionCooccurrenceModel(max_session_items=3)
+    model.update(pd.DataFrame({'session_id': ['s', 's'], 'vehicle_id': ['a', 'b']}))
+
+    model.update(pd.DataFrame({'session_id': ['s', 's'], 'vehicle_id': ['c', 'd']}))
+
+    assert set(model.also_viewed('a')[0]) == {'b', 'c'}
+    assert model.also_viewed('d')[0] == []
@@ -0,0 +1,67 @@
+"""
+사전 계산 Top-N 테이블 테스트
+조회 조건(알고리즘, 폭, stale, 감쇠 기준 시각)과 저장/로드 왕복 확인
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.topn_store import TopNStore
+
+
+@pytest.fixture
+def store():
+    store = TopNStore(n_users=3, n=4, algorithms=['hybrid', 'user_based'], decay_clock=100.0)
+    store.write('hybrid', np.array([0, 1]), np.array([[5, 2, 9, -1], [1, 3, 4, 7]]),
+                np.array([[0.9, 0.8, 0.7, np.nan], [0.6, 0.5, 0.4, 0.3]], dtype=np.float32))
+    return store
+
+
+def test_lookup_returns_filled_prefix(store):
+    vehicle_idx, scores = store.lookup(0, 'hybrid', 4, decay_clock=100.0)
+
+    assert vehicle_idx.tolist() == [5, 2, 9]
+    assert scores.tolist() == pytest.approx([0.9, 0.8, 0.7])
+    assert store.lookup(1, 'hybrid', 2, decay_clock=100.0)[0].tolist() == [1, 3]
+
+
+@pytest.mark.parametrize("user_idx, algorithm, n, decay_clock", [
+    (0, 'item_based', 4, 100.0),   # 계산하지 않은 알고리즘
+    (0, 'hybrid', 5, 100.0),       # 테이블 폭보다 큰 n
+    (2, 'hybrid', 4, 100.0),       # 기록되지 않은 사용자
+    (3, 'hybrid', 4, 100.0),       # 테이블 범위 밖 사용자 (fold-in 신규 사용자)
+    (0, 'hybrid', 4, 200.0),       # 감쇠 기준 시각 이동
+    (0, 'hybrid', 4, None),
+])
+def test_lookup_misses(store, user_idx, algorithm, n, decay_clock):
+    assert store.lookup(user_idx, algorithm, n, decay_clock) is None
+
+
+def test_exact_lookup_requires_full_width(store):
+    assert store.lookup(1, 'hybrid', 2, decay_clock=100.0, exact=True) is None
+    assert store.lookup(1, 'hybrid', 4, decay_clock=100.0, exact=True)[0].tolist() == [1, 3, 4, 7]
+
+
+def test_invalidate_marks_rows_stale(store):
+    store.invalidate(np.array([1, 10]))
+
+    assert store.lookup(1, 'hybrid', 4, decay_clock=100.0) is None
+    assert store.lookup(0, 'hybrid', 4, decay_clock=100.0) is not None
+
+
+def test_save_load_round_trip(store, tmp_path):
+    store.invalidate(np.array([1]))
+    store.save(str(tmp_path / "topn"))
+
+    loaded = TopNStore.load(str(tmp_path / "topn"))
+
+    assert loaded.n == 4 and loaded.algorithms == ['hybrid', 'user_based'] and loaded.decay_clock == 100.0
+    assert loaded.lookup(0, 'hybrid', 4, decay_clock=100.0)[0].tolist() == [5, 2, 9]
+    assert loaded.lookup(1, 'hybrid', 4, decay_clock=100.0) is None
+    assert TopNStore.load(str(tmp_path / "missing")) is None
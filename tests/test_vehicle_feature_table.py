@@ -0,0 +1,86 @@
+"""
+차량 피처 테이블 테스트
+훈련 시 차량 인덱스 매핑, 증분 갱신, 후보 필터, 갱신 중 읽기 잠금 확인
+"""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from models.ncf_feature_encoder import VEHICLE_FEATURE_SPECS, FeatureEncoder
+from models.vehicle_feature_table import VehicleFeatureTable
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_csv(project_root / "data" / "ncf_vehicles.csv")
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return FeatureEncoder.from_state(VEHICLE_FEATURE_SPECS, None)
+
+
+def test_table_rows_follow_training_index(catalog, encoder):
+    """카탈로그 순서와 무관하게 매핑된 차량은 임베딩 행에 고정, 매핑에 없는 차량은 후보에서 제외"""
+    vehicle_index = sorted(catalog['vehicle_id'])[::-1][:150]
+    table = VehicleFeatureTable(encoder, capacity=len(catalog), vehicle_index=vehicle_index)
+    table.refresh(catalog.sample(frac=1.0, random_state=0))
+
+    assert table.rows(vehicle_index[:3]).tolist() == [0, 1, 2]
+    assert table.vehicle_ids[:150].tolist() == vehicle_index
+    assert table.rows(['car_001'])[0] >= 150
+    assert table.candidate_rows().max() < 150
+
+    by_id = catalog.set_index('vehicle_id')
+    np.testing.assert_allclose(table.price[:150], by_id.loc[vehicle_index, 'price'].to_numpy(dtype=np.float32))
+
+
+def test_refresh_reencodes_only_newer_rows(catalog, encoder):
+    catalog = catalog.assign(updated_at=pd.Timestamp('2025-01-01'), is_active=True)
+    table = VehicleFeatureTable(encoder, capacity=8, vehicle_index=list(catalog['vehicle_id']))
+    assert table.refresh(catalog) == len(catalog)
+    version = table.version
+
+    changes = catalog.iloc[[4, 7]].assign(updated_at=pd.Timestamp('2025-02-01'), price=[99999, 1], is_active=[True, False])
+    stale = catalog.iloc[[10]].assign(price=5)
+
+    assert table.refresh(pd.concat([changes, stale])) == 2
+    assert table.version == version + 1
+    assert table.watermark == pd.Timestamp('2025-02-01')
+    assert table.price[4] == 99999 and table.price[10] == catalog['price'].iloc[10]
+    assert 7 not in table.candidate_rows()
+    assert 4 not in table.candidate_rows(budget_max=5000)
+
+
+def test_table_without_index_assigns_rows_in_arrival_order(catalog, encoder):
+    table = VehicleFeatureTable(encoder, capacity=4)
+    table.refresh(catalog.iloc[:10])
+
+    assert table.vehicle_ids[:10].tolist() == catalog['vehicle_id'].iloc[:10].tolist()
+    assert table.candidate_rows(max_row=5).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_refresh_waits_for_readers_holding_the_lock(catalog, encoder):
+    """lock을 잡은 동안 refresh는 배열/버전을 바꾸지 않음 (차량 타워 캐시 구성과 겹치지 않음)"""
+    table = VehicleFeatureTable(encoder, capacity=len(catalog), vehicle_index=list(catalog['vehicle_id']))
+    table.refresh(catalog)
+    version, features = table.version, table.features.copy()
+
+    with table.lock:
+        refresher = threading.Thread(target=table.refresh, args=(catalog.iloc[:5].assign(price=1),))
+        refresher.start()
+        refresher.join(timeout=0.2)
+        assert refresher.is_alive()
+        assert table.version == version
+        np.testing.assert_array_equal(table.features, features)
+
+    refresher.join(timeout=5)
+    assert table.version == version + 1 and table.price[:5].tolist() == [1] * 5